@@ -0,0 +1,214 @@
+"""Adaptive scheduled-scrape intervals from the history of slot releases.
+
+``ReleaseHistory`` records, per source, when the scheduler first saw new relevant slots
+(persisted to a small JSON file, ``retention_days`` kept). ``PollingPlanner`` turns that
+history into a time-of-week profile — ``bucket_minutes`` buckets in JST (the sites'
+time), each release weighted by ``0.5 ** (age / half_life_days)`` and spread over its
+neighbouring buckets, plus a uniform prior — and from the profile a per-bucket interval.
+
+Allocation: releases in bucket b occur with probability p_b and wait on average half an
+interval to be seen, so the expected detection delay is ∝ Σ p_b / r_b for scrape rates
+r_b. With the mean rate fixed at the weekly scrape budget, that is minimised by r_b ∝ √p_b;
+rates are then clamped to [1 / max_interval, 1 / min_interval] — and to the hard per-hour
+cap, when one is set — and rescaled until the clamped mean meets the budget again (or
+every hot bucket is at its cap). Hot windows are polled faster and quiet ones slower, with
+no more scrapes per week than a fixed interval at the budget and no hour above the cap.
+Until a source has ``min_releases`` recorded releases it keeps the flat budget interval.
+"""
+
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app_logging import BOT_LOGGER_NAME
+
+logger = logging.getLogger(BOT_LOGGER_NAME)
+
+JST = timezone(timedelta(hours=9))  # all monitored sites; Japan has no DST
+WEEK_MINUTES = 7 * 24 * 60
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+class ReleaseHistory:
+    """Per-source (epoch seconds, new slot count) release events, persisted as JSON."""
+
+    def __init__(self, path: Optional[str], retention_days: float = 90, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.retention = retention_days * 86400
+        self._clock = clock
+        self.version = 0  # bumped on every change (planner cache key)
+        self._events: Dict[str, List[Tuple[float, int]]] = self._load()
+
+    def _load(self) -> Dict[str, List[Tuple[float, int]]]:
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Invalid {self.path}, starting release history fresh: {e}")
+            return {}
+        return {source: [(float(t), int(n)) for t, n in events] for source, events in data.items()}
+
+    def _persist(self) -> None:
+        if not self.path:
+            return
+        target = os.path.abspath(self.path)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target) or '.', prefix='.release_history_', text=True)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({source: [list(e) for e in events] for source, events in self._events.items()}, f)
+                f.write('\n')
+            os.replace(temp_path, target)
+        except Exception:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def record(self, source: str, count: int = 1, when: Optional[float] = None) -> None:
+        """New relevant slots first seen for source at `when` (default now)."""
+        when = self._clock() if when is None else when
+        cutoff = when - self.retention
+        events = [e for e in self._events.get(source, []) if e[0] >= cutoff]
+        events.append((when, count))
+        self._events[source] = events
+        self.version += 1
+        try:
+            self._persist()
+        except Exception as e:
+            logger.error(f"Failed to persist release history: {e}")
+
+    def events(self, source: str) -> List[Tuple[float, int]]:
+        return list(self._events.get(source, []))
+
+
+def bucket_of(when: float, bucket_minutes: int) -> int:
+    """Time-of-week bucket (JST, Monday 00:00 = bucket 0) of an epoch time."""
+    local = datetime.fromtimestamp(when, JST)
+    return (local.weekday() * 1440 + local.hour * 60 + local.minute) // bucket_minutes
+
+
+def allocate_rates(weights: List[float], mean_rate: float, min_rate: float, max_rate: float) -> List[float]:
+    """Rates ∝ √weight with mean `mean_rate`, each clamped to [min_rate, max_rate]."""
+    n = len(weights)
+    if mean_rate <= min_rate:
+        return [min_rate] * n
+    if mean_rate >= max_rate:
+        return [max_rate] * n
+    roots = [math.sqrt(max(w, 0.0)) for w in weights]
+    if not any(roots):
+        return [mean_rate] * n
+
+    def clamped(scale):
+        return [min(max_rate, max(min_rate, scale * r)) for r in roots]
+
+    low, high = 0.0, max_rate / min(r for r in roots if r > 0)
+    for _ in range(60):
+        scale = (low + high) / 2
+        if sum(clamped(scale)) / n < mean_rate:
+            low = scale
+        else:
+            high = scale
+    return clamped(high)
+
+
+class PollingPlanner:
+    """Per-source, per-time-of-week scrape interval from a ReleaseHistory."""
+
+    def __init__(
+        self,
+        history: ReleaseHistory,
+        bucket_minutes: int = 30,
+        half_life_days: float = 28,
+        min_interval: float = 60,
+        max_interval: float = 900,
+        min_releases: int = 5,
+        prior: float = 2.0,
+    ):
+        if WEEK_MINUTES % bucket_minutes:
+            raise ValueError(f"bucket_minutes must divide a week, got {bucket_minutes}")
+        self.history = history
+        self.bucket_minutes = bucket_minutes
+        self.buckets = WEEK_MINUTES // bucket_minutes
+        self.half_life = half_life_days * 86400
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.min_releases = min_releases
+        self.prior = prior
+        # (source, budget, cap) → (history version, hour, intervals)
+        self._plans: Dict[Tuple[str, float, Optional[float]], Tuple[int, int, List[float]]] = {}
+
+    def profile(self, source: str, now: float) -> Optional[List[float]]:
+        """Release probability per bucket, or None while the history is too thin."""
+        events = self.history.events(source)
+        if sum(count for _t, count in events) < self.min_releases:
+            return None
+        weights = [self.prior / self.buckets] * self.buckets
+        for when, count in events:
+            weight = count * 0.5 ** (max(0.0, now - when) / self.half_life)
+            bucket = bucket_of(when, self.bucket_minutes)
+            for offset, share in ((-1, 0.25), (0, 0.5), (1, 0.25)):
+                weights[(bucket + offset) % self.buckets] += weight * share
+        total = sum(weights)
+        return [w / total for w in weights]
+
+    def intervals(
+        self, source: str, scrapes_per_hour: float, now: float, max_per_hour: Optional[float] = None
+    ) -> List[float]:
+        """Interval (seconds) per bucket averaging at most `scrapes_per_hour` over the week.
+
+        No bucket is polled faster than `max_per_hour` scrapes an hour (None = only
+        min_interval), so every hour of the week stays within that cap.
+        """
+        key = (source, scrapes_per_hour, max_per_hour)
+        hour = int(now // 3600)
+        cached = self._plans.get(key)
+        if cached and cached[0] == self.history.version and cached[1] == hour:
+            return cached[2]
+        profile = self.profile(source, now)
+        min_interval = self.min_interval if max_per_hour is None else max(self.min_interval, 3600 / max_per_hour)
+        flat = min(self.max_interval, max(min_interval, 3600 / scrapes_per_hour))
+        if profile is None:
+            plan = [flat] * self.buckets
+        else:
+            rates = allocate_rates(profile, 1 / flat, 1 / self.max_interval, 1 / min_interval)
+            plan = [1 / rate for rate in rates]
+        self._plans[key] = (self.history.version, hour, plan)
+        return plan
+
+    def interval_for(
+        self, source: str, scrapes_per_hour: float, now: Optional[float] = None,
+        max_per_hour: Optional[float] = None,
+    ) -> float:
+        now = time.time() if now is None else now
+        return self.intervals(source, scrapes_per_hour, now, max_per_hour)[bucket_of(now, self.bucket_minutes)]
+
+    def bucket_label(self, bucket: int) -> str:
+        start = bucket * self.bucket_minutes
+        day, minute = divmod(start, 1440)
+        return f"{WEEKDAYS[day]} {minute // 60:02d}:{minute % 60:02d}"
+
+    def status_line(
+        self, source: str, scrapes_per_hour: float, now: Optional[float] = None,
+        max_per_hour: Optional[float] = None,
+    ) -> str:
+        now = time.time() if now is None else now
+        releases = sum(count for _t, count in self.history.events(source))
+        profile = self.profile(source, now)
+        if profile is None:
+            return f"adaptive: {releases}/{self.min_releases} release(s) recorded, flat interval"
+        plan = self.intervals(source, scrapes_per_hour, now, max_per_hour)
+        hottest = max(range(self.buckets), key=profile.__getitem__)
+        return (
+            f"adaptive: {releases} release(s), {min(plan):.0f}–{max(plan):.0f}s, "
+            f"busiest {self.bucket_label(hottest)} JST"
+        )
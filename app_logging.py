@@ -10,6 +10,7 @@ BOT_LOGGER_NAME = 'run_bot'
 SCRAPER_LOGGER_NAME = 'reservation_checker_playwright'
 SCRAPER_LOGGER_NAMES = (
     SCRAPER_LOGGER_NAME,
+    'reservation_checker_http',
     'reservation_checker_requests',
 )
 
@@ -17,6 +18,7 @@ SCRAPER_LOGGER_NAMES = (
 _SCRIPT_LOGGER_MAP = {
     'run_bot.py': ('__main__', 'bot.log'),
     'reservation_checker_playwright.py': ('__main__', 'reservation_checker.log'),
+    'reservation_checker_http.py': ('__main__', 'reservation_checker.log'),
     'reservation_checker_requests.py': ('__main__', 'reservation_checker.log'),
 }
 
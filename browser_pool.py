@@ -0,0 +1,308 @@
+"""Long-lived Chromium shared by every ReservationChecker in the bot process.
+
+One ``async_playwright()`` driver and one browser stay up between scrapes; each
+scrape leases a fresh, isolated browser context. The browser is recycled after
+``BROWSER_POOL_MAX_SCRAPES`` leases or once the process tree crosses
+``BROWSER_POOL_MAX_RSS_MB``, and relaunched transparently if it crashed. Above
+``BROWSER_POOL_REFUSE_RSS_MB`` (checked after any recycle) leases are refused with
+``MemoryRefused``; ``check_memory()`` lets the scheduler release an idle, oversized browser
+between scrapes instead of waiting for the next lease.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+from playwright.async_api import async_playwright
+
+from app_logging import SCRAPER_LOGGER_NAME
+
+logger = logging.getLogger(SCRAPER_LOGGER_NAME)
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _read_proc_stat(pid: int) -> Optional[tuple]:
+    """(ppid, rss_pages) from /proc/<pid>/stat, or None if unreadable."""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            data = f.read()
+    except OSError:
+        return None
+    # comm may contain spaces/parentheses — fields resume after the last ')'
+    fields = data[data.rfind(')') + 2:].split()
+    try:
+        return int(fields[1]), int(fields[21])
+    except (IndexError, ValueError):
+        return None
+
+
+def process_tree_rss_mb(root_pid: Optional[int] = None) -> Optional[float]:
+    """Resident memory of root_pid plus all descendants (Linux /proc only)."""
+    memory = process_memory_mb(root_pid)
+    return memory[1] if memory else None
+
+
+def process_memory_mb(root_pid: Optional[int] = None) -> Optional[Tuple[float, float]]:
+    """(RSS of root_pid alone, RSS of root_pid plus all descendants) in MB (Linux /proc only).
+
+    For the bot process the difference is the Playwright driver and Chromium tree.
+    """
+    root_pid = root_pid or os.getpid()
+    if not os.path.isdir('/proc'):
+        return None
+
+    children: dict = {}
+    rss_pages: dict = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        stat = _read_proc_stat(int(entry))
+        if stat is None:
+            continue
+        ppid, rss = stat
+        children.setdefault(ppid, []).append(int(entry))
+        rss_pages[int(entry)] = rss
+
+    if root_pid not in rss_pages:
+        return None
+
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, ()))
+    to_mb = _PAGE_SIZE / (1024 * 1024)
+    return rss_pages[root_pid] * to_mb, total * to_mb
+
+
+class MemoryRefused(Exception):
+    """A lease was refused because the process tree is above the hard memory limit."""
+
+
+class BrowserPool:
+    """Shared Chromium; hands out one fresh context per scrape."""
+
+    def __init__(self, headless=True, max_scrapes=50, max_rss_mb=None, launch_timeout=None, refuse_rss_mb=None):
+        self.headless = headless
+        self.max_scrapes = max_scrapes
+        self.max_rss_mb = max_rss_mb
+        self.refuse_rss_mb = refuse_rss_mb
+        self.launch_timeout = launch_timeout
+
+        self._playwright_cm = None
+        self._playwright = None
+        self._browser = None
+        self._lock = asyncio.Lock()
+        self._active = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._recycle_pending = False
+        self._recycle_requested = False
+
+        # Reporting (see stats())
+        self.launches = 0
+        self.last_launch_seconds = None
+        self.total_launch_seconds = 0.0
+        self.pages_served = 0
+        self.scrapes_since_launch = 0
+        self.crashes = 0
+        self.memory: Dict[str, float] = {}  # last sample_memory(): bot_mb / browser_mb / total_mb
+        self.peak_rss_mb = 0.0
+        self.memory_recycles = 0
+        self.refusals = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def _launch(self):
+        start = time.monotonic()
+        if self._playwright is None:
+            self._playwright_cm = async_playwright()
+            self._playwright = await self._playwright_cm.__aenter__()
+        launch_kwargs = {'headless': self.headless}
+        if self.launch_timeout:
+            launch_kwargs['timeout'] = self.launch_timeout
+        self._browser = await self._playwright.chromium.launch(**launch_kwargs)
+        self._browser.on('disconnected', self._on_disconnected)
+
+        elapsed = time.monotonic() - start
+        self.launches += 1
+        self.last_launch_seconds = elapsed
+        self.total_launch_seconds += elapsed
+        self.scrapes_since_launch = 0
+        self._recycle_pending = False
+        self._recycle_requested = False
+        logger.info(f"🧭 Browser pool launched Chromium in {elapsed:.2f}s (launch #{self.launches})")
+
+    def _on_disconnected(self, _browser=None):
+        if self._browser is not None and not self._recycle_pending:
+            self.crashes += 1
+            logger.warning("⚠️ Pooled Chromium disconnected; will relaunch on next scrape")
+
+    async def _close_browser(self):
+        browser, self._browser = self._browser, None
+        if browser is None:
+            return
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled browser: {e}")
+
+    def _recycle_reason(self) -> Optional[str]:
+        if self._recycle_requested:
+            return "recycle requested"
+        if self.max_scrapes and self.scrapes_since_launch >= self.max_scrapes:
+            return f"served {self.scrapes_since_launch} scrapes"
+        if self.max_rss_mb:
+            rss = self.sample_memory().get('total_mb')
+            if rss is not None and rss >= self.max_rss_mb:
+                self.memory_recycles += 1
+                return f"process tree RSS {rss:.0f} MB >= {self.max_rss_mb} MB"
+        return None
+
+    def sample_memory(self) -> Dict[str, float]:
+        """RSS of the bot process and of its browser tree (Playwright driver + Chromium)."""
+        memory = process_memory_mb()
+        if memory is None:
+            return {}
+        bot_mb, total_mb = memory
+        self.memory = {'bot_mb': bot_mb, 'browser_mb': total_mb - bot_mb, 'total_mb': total_mb}
+        self.peak_rss_mb = max(self.peak_rss_mb, total_mb)
+        return self.memory
+
+    def _check_refusal(self):
+        if not self.refuse_rss_mb:
+            return
+        rss = self.sample_memory().get('total_mb')
+        if rss is not None and rss >= self.refuse_rss_mb:
+            self.refusals += 1
+            raise MemoryRefused(
+                f"Scrape refused: process tree RSS {rss:.0f} MB >= {self.refuse_rss_mb} MB"
+            )
+
+    async def check_memory(self) -> Dict[str, float]:
+        """Watchdog tick: sample RSS; close an idle browser above max_rss_mb right away.
+
+        The next lease relaunches it. Busy browsers are left to the usual recycle-on-lease.
+        """
+        memory = self.sample_memory()
+        rss = memory.get('total_mb')
+        if not self.max_rss_mb or rss is None or rss < self.max_rss_mb:
+            return memory
+        async with self._lock:
+            if self._browser is not None and not self._active:
+                self.memory_recycles += 1
+                self._recycle_pending = True
+                logger.info(
+                    f"🐶 Memory watchdog: RSS {rss:.0f} MB >= {self.max_rss_mb} MB; closing idle Chromium"
+                )
+                await self._close_browser()
+                memory = self.sample_memory()
+        return memory
+
+    async def _ensure_browser(self):
+        """Launch, relaunch after a crash, or recycle once no scrape is using the browser."""
+        if self._browser is not None and not self._browser.is_connected():
+            self._browser = None
+
+        if self._browser is not None:
+            reason = self._recycle_reason()
+            if reason:
+                self._recycle_pending = True
+                if self._active:
+                    # Let in-flight scrapes finish on the old browser first.
+                    self._lock.release()
+                    try:
+                        await self._idle.wait()
+                    finally:
+                        await self._lock.acquire()
+                if self._browser is not None and self._recycle_pending:
+                    logger.info(f"♻️ Recycling pooled Chromium ({reason})")
+                    await self._close_browser()
+
+        if self._browser is None:
+            await self._launch()
+
+    def request_recycle(self):
+        """Recycle the browser before the next lease (e.g. from a memory watchdog)."""
+        self._recycle_requested = True
+
+    @asynccontextmanager
+    async def context(self, **context_kwargs):
+        """Lease a fresh BrowserContext on the shared browser; closed on exit."""
+        async with self._lock:
+            await self._ensure_browser()
+            self._check_refusal()
+            browser = self._browser
+            self._active += 1
+            self._idle.clear()
+            self.scrapes_since_launch += 1
+            self.pages_served += 1
+
+        context = None
+        try:
+            context = await browser.new_context(**context_kwargs)
+            yield context
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.debug(f"Error closing pooled context: {e}")
+            self._active -= 1
+            if not self._active:
+                self._idle.set()
+
+    async def close(self):
+        """Shut down the browser and the Playwright driver."""
+        async with self._lock:
+            self._recycle_pending = True
+            await self._close_browser()
+            if self._playwright_cm is not None:
+                try:
+                    await self._playwright_cm.__aexit__(None, None, None)
+                except Exception as e:
+                    logger.warning(f"Error stopping Playwright driver: {e}")
+            self._playwright_cm = None
+            self._playwright = None
+
+    def stats(self) -> dict:
+        return {
+            'running': self.is_running,
+            'launches': self.launches,
+            'last_launch_seconds': self.last_launch_seconds,
+            'total_launch_seconds': self.total_launch_seconds,
+            'pages_served': self.pages_served,
+            'scrapes_since_launch': self.scrapes_since_launch,
+            'active': self._active,
+            'crashes': self.crashes,
+            'memory': dict(self.memory),
+            'peak_rss_mb': self.peak_rss_mb,
+            'memory_recycles': self.memory_recycles,
+            'refusals': self.refusals,
+        }
+
+    def memory_line(self) -> str:
+        if not self.memory:
+            return "RSS n/a"
+        return (
+            f"RSS bot {self.memory['bot_mb']:.0f} MB + browser {self.memory['browser_mb']:.0f} MB "
+            f"(peak {self.peak_rss_mb:.0f} MB), {self.memory_recycles} memory recycle(s), "
+            f"{self.refusals} refused"
+        )
+
+    def status_line(self) -> str:
+        if not self.launches:
+            return f"not launched yet, {self.memory_line()}" if self.memory else "not launched yet"
+        state = "up" if self.is_running else "down"
+        last = f"{self.last_launch_seconds:.1f}s" if self.last_launch_seconds is not None else "n/a"
+        return (
+            f"{state}, {self.launches} launch(es), last launch {last}, "
+            f"{self.pages_served} page(s) served, {self.crashes} crash(es); {self.memory_line()}"
+        )
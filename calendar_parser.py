@@ -0,0 +1,319 @@
+"""Browser-independent calendar parsing: table HTML or cell matrix → Slots.
+
+Every engine feeds the same cell matrix into ``slots_from_matrix``:
+
+- Playwright ``evaluate`` mode gets the matrix from ``CALENDAR_MATRIX_JS`` in-page.
+- ``CalendarParser`` builds it from raw HTML (``page.content()``, an HTTP response,
+  or a saved fixture) with lxml when installed, falling back to BeautifulSoup.
+
+``CalendarParser.page`` additionally returns the page title, forms and navigation buttons
+from the same parse, for engines that drive the site over plain HTTP.
+
+A matrix is a list of rows (every ``<tr>`` in document order); each row is a list of
+``[tag, textContent, svg aria-label or None, .sr-only text or None]`` for every
+``th``/``td`` descendant — the same elements the legacy DOM walk visits.
+"""
+
+import asyncio
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from domain import Slot
+
+try:
+    import lxml.html
+except ImportError:  # optional fast backend
+    lxml = None
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:  # optional fallback backend
+    BeautifulSoup = None
+
+DATE_MD_PATTERN = re.compile(r'\d{1,2}/\d{1,2}')
+FULL_DATE_PATTERN = re.compile(r'(\d{4})年(\d{2})月(\d{2})日')
+
+SLOT_AVAILABLE = "予約可能"
+SLOT_FULL = "空き無"
+SLOT_OUT_OF_HOURS = "時間外"
+
+_NON_FIELD_INPUT_TYPES = ('submit', 'button', 'image', 'reset')
+
+_SR_ONLY_XPATH = ".//*[contains(concat(' ', normalize-space(@class), ' '), ' sr-only ')]"
+
+
+def normalize_label(text: str) -> str:
+    return ' '.join(text.strip().split())
+
+
+def resolve_calendar_row(
+    first_text: str,
+    second_text: str,
+    current_facility: Optional[str],
+    target_facilities: Sequence[str],
+) -> Optional[Tuple[str, str, str, int]]:
+    """Map a table row to facility, slot type, and where date cells start.
+
+    Kanagawa (and similar layouts) use rowspan on the facility cell, so only the
+    first slot-type row includes the facility name; follow-on rows have slot type
+    in the first column.
+    """
+    first_text = normalize_label(first_text)
+    second_text = normalize_label(second_text)
+
+    for facility in target_facilities:
+        if normalize_label(facility) in first_text:
+            return facility, facility, second_text, 2
+
+    if current_facility:
+        return current_facility, current_facility, first_text, 1
+
+    return None
+
+
+def date_from_sr_text(sr_text: Optional[str], index: int) -> str:
+    """``MM/DD`` from screen-reader text like ``2026年08月13日``; placeholder otherwise."""
+    if sr_text:
+        date_match = FULL_DATE_PATTERN.search(sr_text)
+        if date_match:
+            _year, month, day = date_match.groups()
+            return f"{month}/{day}"
+    return f"Unknown date {index + 1}"
+
+
+def headers_from_matrix(rows: List[list]) -> List[str]:
+    """First row with at least three ``td`` cells that look like MM/DD."""
+    for row in rows:
+        td_texts = [cell[1] for cell in row if cell[0] == 'td']
+        if len(td_texts) < 3:
+            continue
+        headers = []
+        for date_text in td_texts:
+            if not date_text or not date_text.strip():
+                continue
+            clean_date = normalize_label(date_text)
+            if DATE_MD_PATTERN.search(clean_date):
+                headers.append(clean_date)
+        if len(headers) >= 3:
+            return headers
+    return []
+
+
+def matrix_fingerprint(rows: List[list]) -> str:
+    """Cheap identity of one calendar period: header dates plus every cell's slot marker.
+
+    Labelled cells contribute only their aria-label (their text carries inline SVG
+    styling that differs between backends); other cells contribute normalized text, so
+    facility / slot-type names and the header dates are covered too.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for row in rows:
+        for _tag, text, aria_label, sr_text in row:
+            if aria_label is not None:
+                digest.update(f"@{aria_label}|{normalize_label(sr_text or '')}".encode())
+            else:
+                digest.update(f"#{normalize_label(text or '')}".encode())
+            digest.update(b"\x1f")
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def slots_from_matrix(
+    rows: List[list],
+    target_facilities: Sequence[str],
+    on_cell: Optional[Callable[[str, str, str, str], None]] = None,
+) -> Tuple[List[Slot], List[str]]:
+    """Available Slots for target_facilities, plus the period's date headers.
+
+    on_cell(aria_label, date, facility, applicant_type) sees every labelled slot cell
+    (the Playwright checker uses it for per-cell logging).
+    """
+    date_headers = headers_from_matrix(rows)
+    slots: List[Slot] = []
+    current_facility = None
+    for row in rows:
+        if len(row) < 2:
+            continue
+        resolved = resolve_calendar_row(
+            row[0][1] or "", row[1][1] or "", current_facility, target_facilities
+        )
+        if not resolved:
+            continue
+
+        current_facility, target_facility, applicant_type, date_start = resolved
+        applicant_type = normalize_label(applicant_type) or "Unknown"
+        for i, (_tag, _text, aria_label, sr_text) in enumerate(row[date_start:]):
+            if aria_label is None:
+                continue
+            if i < len(date_headers):
+                date_text = date_headers[i]
+            else:
+                date_text = date_from_sr_text(sr_text, i)
+            if aria_label == SLOT_AVAILABLE:
+                slots.append(Slot(date=date_text, facility=target_facility, applicant_type=applicant_type))
+            if on_cell is not None:
+                on_cell(aria_label, date_text, target_facility, applicant_type)
+    return slots, date_headers
+
+
+@dataclass(frozen=True)
+class PageForm:
+    """One <form>: fields a submit would send (hidden/text inputs) and its button states."""
+    action: Optional[str]
+    fields: Dict[str, str]
+    buttons: Dict[str, bool]  # input value → enabled
+
+
+@dataclass(frozen=True)
+class CalendarPage:
+    """Everything an HTTP engine needs from one calendar page, from a single parse."""
+    title: str
+    matrix: List[list]
+    forms: Tuple[PageForm, ...]
+
+    def form_with_button(self, button_value: str) -> Optional[PageForm]:
+        for form in self.forms:
+            if button_value in form.buttons:
+                return form
+        return None
+
+    def button_enabled(self, button_value: str) -> bool:
+        form = self.form_with_button(button_value)
+        return bool(form and form.buttons[button_value])
+
+
+def _button_enabled(disabled, aria_disabled) -> bool:
+    return disabled is None and aria_disabled != 'true'
+
+
+def _matrix_lxml(html: str) -> List[list]:
+    return _matrix_from_lxml_root(lxml.html.fromstring(html))
+
+
+def _page_lxml(html: str) -> CalendarPage:
+    root = lxml.html.fromstring(html)
+    forms = []
+    for form in root.iter('form'):
+        fields, buttons = {}, {}
+        for inp in form.iter('input'):
+            input_type = (inp.get('type') or 'text').lower()
+            if input_type in _NON_FIELD_INPUT_TYPES:
+                if inp.get('value'):
+                    buttons[inp.get('value')] = _button_enabled(inp.get('disabled'), inp.get('aria-disabled'))
+            elif inp.get('name'):
+                fields[inp.get('name')] = inp.get('value', '')
+        forms.append(PageForm(action=form.get('action'), fields=fields, buttons=buttons))
+    title = root.findtext('.//title') or ''
+    return CalendarPage(title=title.strip(), matrix=_matrix_from_lxml_root(root), forms=tuple(forms))
+
+
+def _matrix_from_lxml_root(root) -> List[list]:
+    rows = []
+    for tr in root.iter('tr'):
+        row = []
+        for cell in tr.iterdescendants('th', 'td'):
+            svg = next(cell.iter('svg'), None)
+            sr_only = cell.xpath(_SR_ONLY_XPATH)
+            row.append([
+                cell.tag,
+                cell.text_content(),
+                svg.get('aria-label') if svg is not None else None,
+                sr_only[0].text_content() if sr_only else None,
+            ])
+        rows.append(row)
+    return rows
+
+
+def _matrix_bs4(html: str) -> List[list]:
+    return _matrix_from_soup(BeautifulSoup(html, 'html.parser'))
+
+
+def _page_bs4(html: str) -> CalendarPage:
+    soup = BeautifulSoup(html, 'html.parser')
+    forms = []
+    for form in soup.find_all('form'):
+        fields, buttons = {}, {}
+        for inp in form.find_all('input'):
+            input_type = (inp.get('type') or 'text').lower()
+            if input_type in _NON_FIELD_INPUT_TYPES:
+                if inp.get('value'):
+                    buttons[inp.get('value')] = _button_enabled(inp.get('disabled'), inp.get('aria-disabled'))
+            elif inp.get('name'):
+                fields[inp.get('name')] = inp.get('value', '')
+        forms.append(PageForm(action=form.get('action'), fields=fields, buttons=buttons))
+    title = soup.title.get_text() if soup.title else ''
+    return CalendarPage(title=title.strip(), matrix=_matrix_from_soup(soup), forms=tuple(forms))
+
+
+def _matrix_from_soup(soup) -> List[list]:
+    rows = []
+    for tr in soup.find_all('tr'):
+        row = []
+        for cell in tr.find_all(['th', 'td']):
+            svg = cell.find('svg')
+            sr_only = cell.find(class_='sr-only')
+            row.append([
+                cell.name,
+                cell.get_text(),
+                svg.get('aria-label') if svg else None,
+                sr_only.get_text() if sr_only else None,
+            ])
+        rows.append(row)
+    return rows
+
+
+# backend name → (matrix builder, page builder)
+_BACKENDS = {}
+if lxml is not None:
+    _BACKENDS['lxml'] = (_matrix_lxml, _page_lxml)
+if BeautifulSoup is not None:
+    _BACKENDS['bs4'] = (_matrix_bs4, _page_bs4)
+
+
+def available_backends() -> List[str]:
+    """Installed backends, fastest first."""
+    return list(_BACKENDS)
+
+
+class CalendarParser:
+    """Parse reservation calendar HTML into Slots without a browser."""
+
+    def __init__(self, target_facilities: Sequence[str], backend: Optional[str] = None):
+        self.target_facilities = list(target_facilities)
+        if backend is None:
+            if not _BACKENDS:
+                raise RuntimeError("CalendarParser needs lxml or beautifulsoup4 installed")
+            backend = next(iter(_BACKENDS))
+        if backend not in _BACKENDS:
+            raise ValueError(f"Unknown or unavailable parser backend: {backend}")
+        self.backend = backend
+        self._build_matrix, self._build_page = _BACKENDS[backend]
+
+    def matrix(self, html: str) -> List[list]:
+        return self._build_matrix(html)
+
+    def page(self, html: str) -> CalendarPage:
+        return self._build_page(html)
+
+    async def page_async(self, html: str) -> CalendarPage:
+        """page() on the default executor, keeping the event loop free."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.page, html)
+
+    def parse_with_headers(self, html: str) -> Tuple[List[Slot], List[str]]:
+        return slots_from_matrix(self.matrix(html), self.target_facilities)
+
+    def parse(self, html: str) -> List[Slot]:
+        return self.parse_with_headers(html)[0]
+
+    async def matrix_async(self, html: str) -> List[list]:
+        """matrix() on the default executor, keeping the event loop free."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.matrix, html)
+
+    async def parse_async(self, html: str) -> Tuple[List[Slot], List[str]]:
+        """parse_with_headers on the default executor, keeping the event loop free."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.parse_with_headers, html)
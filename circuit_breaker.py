@@ -0,0 +1,113 @@
+"""Per-source circuit breaker for scrapes (closed → open → half-open → closed).
+
+``failure_threshold`` consecutive failed scrapes (error ``CheckResult`` — navigation
+failures, waiting-room / deadline timeouts, blocks — or an exception) open the breaker:
+no scrape of that source runs until its back-off has passed. The back-off doubles with
+every consecutive opening, from ``base_backoff`` up to ``max_backoff`` seconds, and is
+scaled by a random factor in ``[1 - jitter, 1 + jitter]`` so retries do not line up.
+After the back-off, one probe scrape is let through (half-open): success closes the
+breaker and resets the back-off, failure re-opens it for the next, longer back-off.
+
+Outcomes in ``LOCAL_OUTCOMES`` failed on the bot's side (the memory watchdog refused the
+browser, a replay ran out of recordings) and say nothing about the site: they are neither
+failures nor successes, and a half-open breaker lets the next probe through.
+
+While it is open the bot answers /check and queued waiters with the last good cached
+result and its age instead of launching a browser against a failing site.
+"""
+
+import random
+import time
+from typing import Callable, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+LOCAL_OUTCOMES = frozenset({"refused", "exhausted"})
+
+
+class CircuitBreaker:
+    """Failure gate for one source's scrapes."""
+
+    def __init__(
+        self,
+        source: str,
+        failure_threshold: int = 3,
+        base_backoff: float = 60,
+        max_backoff: float = 1800,
+        jitter: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.source = source
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self._clock = clock
+        self._rng = rng
+        self.state = CLOSED
+        self.failures = 0  # consecutive failed scrapes
+        self.openings = 0  # consecutive openings (back-off exponent)
+        self.open_until: Optional[float] = None
+        self.last_reason: Optional[str] = None
+        self.rejected = 0  # scrapes refused while open
+
+    @property
+    def is_open(self) -> bool:
+        """Open and still backing off (a probe is not yet due)."""
+        return self.state == OPEN and self._clock() < self.open_until
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 unless backing off)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.open_until - self._clock())
+
+    def allow(self) -> bool:
+        """Whether a scrape may run now; an open breaker past its back-off lets one probe through."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and not self.is_open:
+            self.state = HALF_OPEN
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self.openings = 0
+        self.open_until = None
+
+    def record_inconclusive(self) -> None:
+        """A scrape that failed locally: no verdict on the site, so a half-open probe is retried."""
+        if self.state == HALF_OPEN:
+            self.state = OPEN  # back-off already over: the next allow() probes again
+
+    def record_failure(self, reason: str = "error") -> None:
+        self.failures += 1
+        self.last_reason = reason
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self.openings += 1
+        backoff = min(self.max_backoff, self.base_backoff * 2 ** (self.openings - 1))
+        backoff *= 1 + self.jitter * (2 * self._rng() - 1)
+        self.state = OPEN
+        self.open_until = self._clock() + backoff
+
+    def status_line(self) -> str:
+        if self.state == CLOSED:
+            suffix = f", {self.failures} recent failure(s) ({self.last_reason})" if self.failures else ""
+            return f"closed{suffix}"
+        if self.state == HALF_OPEN:
+            return f"half-open — probing after {self.failures} failure(s) ({self.last_reason})"
+        wait = self.retry_in()
+        return (
+            f"open — {self.failures} failure(s), last {self.last_reason}; "
+            f"retry in {int(wait // 60)}m {int(wait % 60)}s (back-off #{self.openings}, "
+            f"{self.rejected} scrape(s) refused)"
+        )
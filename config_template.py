@@ -30,6 +30,67 @@ SHOW_ONLY_RELEVANT_APPLICANTS = True
 # Check interval in seconds
 CHECK_INTERVAL = 300  # 5 minutes
 
+# Scheduler (scheduling.py): every source scrapes fixed-rate on its own grid, once at
+# startup and then at phase + k * interval. SCHEDULE_STAGGER spreads sources without an
+# explicit phase evenly over their interval; each run starts up to SCHEDULE_JITTER seconds
+# late at random. Per-source overrides: SOURCE_SCHEDULES (or interval / phase / jitter in
+# an EXTRA_SOURCES entry), e.g. {"saitama": {"interval": 600, "jitter": 30}}.
+SCHEDULE_STAGGER = True
+SCHEDULE_JITTER = 10
+SCHEDULE_LAG_WARNING = 30  # Log a warning when a scheduled run starts this many seconds late
+SOURCE_SCHEDULES = {}
+
+# Adaptive polling (adaptive_polling.py): record when new relevant slots first appear per
+# source (RELEASE_HISTORY_FILE) and, from that time-of-week profile (JST, in
+# ADAPTIVE_BUCKET_MINUTES buckets, releases decaying with ADAPTIVE_HALF_LIFE_DAYS), poll
+# likely release windows faster and quiet ones slower between ADAPTIVE_MIN_INTERVAL and
+# ADAPTIVE_MAX_INTERVAL seconds. The week's average stays at 3600 / the source's interval
+# (no more scrapes than fixed-rate), and no hour goes above ADAPTIVE_SCRAPES_PER_HOUR
+# scrapes per source (None = only ADAPTIVE_MIN_INTERVAL limits the busiest windows).
+# Sources with fewer than ADAPTIVE_MIN_RELEASES recorded releases keep their interval.
+ADAPTIVE_POLLING = True
+RELEASE_HISTORY_FILE = "release_history.json"  # None = keep the history in memory only
+ADAPTIVE_SCRAPES_PER_HOUR = 30
+ADAPTIVE_MIN_INTERVAL = 60
+ADAPTIVE_MAX_INTERVAL = 900
+ADAPTIVE_BUCKET_MINUTES = 30
+ADAPTIVE_HALF_LIFE_DAYS = 28
+ADAPTIVE_HISTORY_DAYS = 90
+ADAPTIVE_MIN_RELEASES = 5
+
+# Per-source circuit breaker: after BREAKER_FAILURE_THRESHOLD consecutive failed scrapes
+# (error results, navigation / waiting-room timeouts) a source is not scraped for
+# BREAKER_BASE_BACKOFF seconds, doubling per consecutive opening up to BREAKER_MAX_BACKOFF,
+# each scaled by ±BREAKER_JITTER. /check meanwhile answers with the last good cached result.
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_BASE_BACKOFF = 60
+BREAKER_MAX_BACKOFF = 1800
+BREAKER_JITTER = 0.2
+
+# Max scrapes running at once across all sources (each source has its own lock)
+MAX_CONCURRENT_SCRAPES = 3
+
+# Max /check requests attached to one shared scrape (per source and navigation mode); None = unlimited
+CHECK_MAX_WAITERS = 200
+
+# /check progress: the "Checking…" reply is edited with the slots found so far as calendar
+# periods are scanned, at most once per this many seconds, then into the final result.
+# None = no progress edits (the final result still replaces the "Checking…" message).
+CHECK_PROGRESS_EDIT_INTERVAL = 2
+
+# Telegram delivery queue (delivery_queue.py): alerts, /check answers and progress edits are
+# sent in that priority order, at most TELEGRAM_SEND_RATE messages/second overall (bursts of
+# TELEGRAM_SEND_BURST) and one per TELEGRAM_CHAT_INTERVAL seconds per chat. Telegram's
+# RetryAfter pauses the queue for the time it asks; network errors are retried up to
+# TELEGRAM_SEND_ATTEMPTS times, backing off from TELEGRAM_RETRY_BACKOFF seconds (doubling,
+# at most TELEGRAM_RETRY_MAX_BACKOFF).
+TELEGRAM_SEND_RATE = 25
+TELEGRAM_SEND_BURST = 25
+TELEGRAM_CHAT_INTERVAL = 1.0
+TELEGRAM_SEND_ATTEMPTS = 4
+TELEGRAM_RETRY_BACKOFF = 1
+TELEGRAM_RETRY_MAX_BACKOFF = 30
+
 # Cache duration in seconds
 CACHE_DURATION = 120  # 2 minutes
 
@@ -46,6 +107,83 @@ LOADING_INDICATOR_TIMEOUT = 5000  # 5 seconds for loading indicators
 PAGE_TRANSITION_WAIT = 3000  # 3 seconds wait after page transitions
 DYNAMIC_CONTENT_WAIT = 2000  # 2 seconds wait for dynamic content
 
+# Page readiness: "event" = continue as soon as the calendar is parsable / has changed
+# after navigation (the waits above become ceilings); "fixed" = always sleep the full waits
+READINESS_MODE = "event"
+
+# Calendar extraction: "evaluate" = one in-page script per period (default),
+# "html" = one page.content() snapshot parsed by calendar_parser off the event loop,
+# "dom" = legacy per-cell query_selector walk (thousands of round trips per period)
+CALENDAR_EXTRACTION_MODE = "evaluate"
+
+# Period navigation: "sequential" = one page walks every period in turn;
+# "sliced" = PERIOD_SLICES pages/sessions in parallel, slice k seeded k * PERIOD_SLICE_MONTHS
+# "1か月後＞" hops ahead (the sites only page relatively), results merged with dedupe_slots
+PERIOD_NAVIGATION = "sequential"
+PERIOD_SLICES = 3
+PERIOD_SLICE_MONTHS = 1
+
+# Walk limit per scrape: learned from recent complete walks (largest horizon seen in the
+# last PERIOD_HORIZON_HISTORY walks + PERIOD_HORIZON_MARGIN); PERIOD_LIMIT until learned.
+# A calendar still going at the limit extends it, never beyond PERIOD_MAX_LIMIT periods.
+PERIOD_LIMIT = 20
+PERIOD_HORIZON_MARGIN = 2
+PERIOD_HORIZON_HISTORY = 5
+PERIOD_MAX_LIMIT = 60
+
+# Scrape deadlines: a whole scrape gets SCRAPE_DEADLINE_SECONDS (None = unlimited) and each
+# step its phase budget; the step is cancelled when either runs out. Periods scanned before
+# that are returned as a partial result. Phases: launch (browser/context), goto (first page
+# load), waiting_room (first calendar load, incl. Cloudflare queue), period (one period's
+# probe + extraction), navigation (next-period click/POST until the new dates show).
+SCRAPE_DEADLINE_SECONDS = 240
+SCRAPE_PHASE_BUDGETS = {"launch": 60, "goto": 60, "waiting_room": 180, "period": 45, "navigation": 40}
+PARTIAL_RESULTS_NOTIFY = True  # Scheduler: alert on new slots found by a partial scrape
+
+# Scheduler early alerts: notify subscribers as soon as a scanned calendar period shows
+# relevant slots not yet notified, instead of after the whole walk. The final result then
+# only alerts on slots the early alerts did not cover.
+EARLY_ALERTS = True
+
+# Per-source Playwright storage state (cookies + localStorage, incl. Cloudflare clearance)
+# reused between scrapes. Kept in memory only by default; to keep it across restarts, set a
+# directory in config.py, e.g. STORAGE_STATE_DIR = "session_state" (gitignored), and it is
+# written to <dir>/<source>.json with owner-only permissions.
+STORAGE_STATE_DIR = None
+
+# Shared browser pool (run_bot.py): one long-lived Chromium, fresh context per scrape
+BROWSER_POOL_ENABLED = True
+BROWSER_POOL_MAX_SCRAPES = 50  # Relaunch Chromium after this many scrapes
+BROWSER_POOL_MAX_RSS_MB = 700  # Relaunch when bot + Chromium RSS exceeds this (None = off)
+BROWSER_POOL_REFUSE_RSS_MB = 1000  # Refuse Playwright scrapes while RSS stays above this even after a recycle (None = off)
+
+# Raw calendar snapshots (snapshot_archive.py): every period's HTML, zlib-compressed into
+# append-only pack files per source under <dir>/<source>/; unchanged periods are stored once
+# per segment and the oldest of SNAPSHOT_ARCHIVE_SEGMENTS segments is dropped once a source
+# exceeds SNAPSHOT_ARCHIVE_MAX_MB. Off by default; to enable it, set a directory in config.py,
+# e.g. SNAPSHOT_ARCHIVE_DIR = "snapshots" (needed by scripts/replay_bot.py and offline re-parsing).
+SNAPSHOT_ARCHIVE_DIR = None
+SNAPSHOT_ARCHIVE_MAX_MB = 200
+SNAPSHOT_ARCHIVE_SEGMENTS = 8
+
+# Scrape engine per source: "playwright" (Chromium), "http" (reservation_checker_http.py),
+# or "auto" (HTTP first, Playwright fallback on challenge / empty calendar / error; then
+# prefer whichever engine is healthy and faster). KANAGAWA_/SAITAMA_ None = follow SCRAPE_ENGINE.
+SCRAPE_ENGINE = "playwright"
+ENGINE_SCORE_ALPHA = 0.3  # EWMA weight of the latest scrape in an engine's score
+ENGINE_MIN_SUCCESS = 0.5  # Below this rolling success rate an engine is tried last
+ENGINE_PROBE_INTERVAL = 10  # auto: retry a demoted engine first every N scrapes
+
+# Replay engine (reservation_checker_replay.py): SCRAPE_ENGINE = "replay" serves the scrapes
+# recorded in the snapshot archive under REPLAY_ARCHIVE_DIR instead of the live sites.
+# REPLAY_SPEED None = one recorded scrape per run_check, in order; N = recorded time N× faster.
+REPLAY_ARCHIVE_DIR = "snapshots"
+REPLAY_SPEED = None
+
+# HTTP engine (reservation_checker_http.py): keep-alive client per host, no browser
+HTTP_MAX_KEEPALIVE = 4  # Pooled connections per host
+HTTP_WAITING_ROOM_MAX_WAIT = 180  # Seconds to keep re-polling Cloudflare's waiting room
+
 # =====================
 # Kanagawa Config
 # =====================
@@ -58,6 +196,8 @@ KANAGAWA_TARGET_FACILITIES = ["外国免許四輪車"]
 # Level-2 rows to monitor within that group
 KANAGAWA_TARGET_SLOT_TYPES = ["普通車ＡＭ", "普通車ＰＭ"]
 
+KANAGAWA_SCRAPE_ENGINE = None  # None = SCRAPE_ENGINE
+
 # =====================
 # Saitama Config
 # =====================
@@ -69,3 +209,21 @@ SAITAMA_TARGET_FACILITIES = ["外免　書類審査"]
 
 # Level-2 rows to monitor within that group (default relevant = first-time only)
 SAITAMA_TARGET_SLOT_TYPES = ["【１】１回目（初めて）"]
+
+SAITAMA_SCRAPE_ENGINE = None  # None = SCRAPE_ENGINE
+
+# =====================
+# Additional sources (sources.py)
+# =====================
+
+# Further calendars to monitor, each a dict; Kanagawa and Saitama above run on the same
+# offerList_detail?tempSeq= platform, so another offer there only needs its URL and rows.
+# Required: key, url, facilities. Optional: label, slot_types (default "relevant" rows;
+# empty = all), emoji, description, aliases ({keyword: facility or None}; default
+# {key: None}), type_filters ({subscription type: [slot types]}), type_keywords,
+# default_subscribe (False = opt-in like Saitama), engine (None = SCRAPE_ENGINE),
+# interval / phase / jitter (scheduler; None = defaults above).
+# Example:
+#   {"key": "chiba", "label": "Chiba", "url": "https://.../offerList_detail?tempSeq=...",
+#    "facilities": ["外国免許切替"], "slot_types": ["知識確認"]}
+EXTRA_SOURCES = []
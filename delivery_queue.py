@@ -0,0 +1,272 @@
+"""Outbound Telegram delivery queue.
+
+Every message the bot sends or edits outside a command reply goes through one
+``DeliveryQueue``. Deliveries are taken in priority order (``ALERT`` before ``REPLY``
+before ``PROGRESS``; first in, first out within a priority) and paced for Telegram's
+limits: a global token bucket (``rate`` messages per second, bursts of ``burst``), one
+delivery in flight per chat and ``chat_interval`` seconds between two to the same chat.
+
+A failed delivery is retried: after the wait Telegram asks for with ``RetryAfter`` (which
+pauses the whole queue, since flood control is per bot), or with exponential back-off for
+transient network errors, up to ``max_attempts`` in all. Other errors (bad request, bot blocked)
+fail at once. ``submit`` returns once the delivery is done and raises its last error, so
+callers keep their own fallbacks. A delivery with a ``key`` (e.g. one message being
+edited) supersedes a queued delivery with the same key; the superseded one returns None.
+
+Per priority the queue keeps metrics: sent, failed, retried and superseded deliveries,
+peak depth and latency (submit → delivered).
+"""
+
+import asyncio
+import logging
+import time
+import warnings
+from collections import deque
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+from telegram.error import BadRequest, NetworkError, RetryAfter
+
+from app_logging import BOT_LOGGER_NAME
+
+logger = logging.getLogger(BOT_LOGGER_NAME)
+
+ALERT = 0  # Subscriber slot alerts
+REPLY = 1  # /check answers
+PROGRESS = 2  # "Still checking…" edits
+PRIORITY_NAMES = {ALERT: "alerts", REPLY: "replies", PROGRESS: "progress"}
+
+
+class Delivery:
+    """One queued send or edit: ``send`` is called (again on retry) to perform it."""
+
+    def __init__(self, seq: int, chat_id: int, send: Callable[[], Awaitable], priority: int,
+                 key: Optional[Hashable], enqueued_at: float):
+        self.seq = seq
+        self.chat_id = chat_id
+        self.send = send
+        self.priority = priority
+        self.key = key
+        self.enqueued_at = enqueued_at
+        self.attempts = 0
+        self.not_before = 0.0
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+@dataclass
+class DeliveryStats:
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    superseded: int = 0
+    peak: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    """RetryAfter.retry_after is seconds or a timedelta depending on the library settings."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # PTB's notice that it will become a timedelta
+        wait = error.retry_after
+    return wait.total_seconds() if isinstance(wait, timedelta) else float(wait)
+
+
+def _settle(future: asyncio.Future, result=None, error: Optional[Exception] = None) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class DeliveryQueue:
+    """Priority queue of Telegram deliveries paced for the Bot API limits, with retries."""
+
+    def __init__(
+        self,
+        rate: float = 25,
+        burst: int = 25,
+        chat_interval: float = 1.0,
+        max_attempts: int = 4,
+        base_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.chat_interval = chat_interval
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._queues: Dict[int, deque] = {priority: deque() for priority in PRIORITY_NAMES}
+        self._tokens = float(burst)
+        self._refilled_at = clock()
+        self._chat_ready: Dict[int, float] = {}
+        self._in_flight: Dict[int, asyncio.Task] = {}  # chat_id -> running attempt
+        self._latest: Dict[Hashable, int] = {}  # key -> seq of its newest delivery
+        self._paused_until = 0.0
+        self._seq = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.stats: Dict[int, DeliveryStats] = {priority: DeliveryStats() for priority in PRIORITY_NAMES}
+
+    async def submit(self, chat_id: int, send: Callable[[], Awaitable], priority: int = REPLY,
+                     key: Optional[Hashable] = None):
+        """Queue send for chat_id and wait until it is delivered (its result), failed or superseded."""
+        self._seq += 1
+        delivery = Delivery(self._seq, chat_id, send, priority, key, self._clock())
+        if key is not None:
+            self._supersede(key)
+            self._latest[key] = delivery.seq
+        self._enqueue(delivery)
+        return await delivery.future
+
+    def depth(self, priority: Optional[int] = None) -> int:
+        if priority is not None:
+            return len(self._queues[priority])
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def close(self) -> None:
+        """Stop dispatching; deliveries still queued or in flight are cancelled."""
+        tasks = [task for task in (self._dispatcher, *self._in_flight.values()) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for queue in self._queues.values():
+            for delivery in queue:
+                if not delivery.future.done():
+                    delivery.future.cancel()
+            queue.clear()
+
+    def _enqueue(self, delivery: Delivery, front: bool = False) -> None:
+        queue = self._queues[delivery.priority]
+        queue.appendleft(delivery) if front else queue.append(delivery)
+        stats = self.stats[delivery.priority]
+        stats.peak = max(stats.peak, len(queue))
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    def _supersede(self, key: Hashable) -> None:
+        for priority, queue in self._queues.items():
+            for delivery in [d for d in queue if d.key == key]:
+                queue.remove(delivery)
+                self.stats[priority].superseded += 1
+                _settle(delivery.future, None)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _next(self, now: float):
+        """(delivery to send now, None) or (None, seconds until one may be ready / None = idle)."""
+        waits = []
+        if now < self._paused_until:
+            return None, self._paused_until - now
+        self._refill(now)
+        if self._tokens < 1:
+            return None, (1 - self._tokens) / self.rate
+        for priority in sorted(self._queues):
+            queue = self._queues[priority]
+            for delivery in [d for d in queue if d.future.done()]:
+                queue.remove(delivery)  # its caller stopped waiting (cancelled): nothing to send
+            for delivery in queue:
+                if delivery.chat_id in self._in_flight:
+                    continue  # answered by the wakeup when that attempt ends
+                ready = max(delivery.not_before, self._chat_ready.get(delivery.chat_id, 0.0))
+                if ready <= now:
+                    return delivery, None
+                waits.append(ready - now)
+        return None, min(waits) if waits else None
+
+    async def _dispatch(self) -> None:
+        """Start deliveries as limits allow; exits once nothing is queued or in flight."""
+        while self.depth() or self._in_flight:
+            self._wakeup.clear()
+            delivery, wait = self._next(self._clock())
+            if delivery is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._queues[delivery.priority].remove(delivery)
+            self._tokens -= 1
+            self._in_flight[delivery.chat_id] = asyncio.create_task(self._attempt(delivery))
+
+    async def _attempt(self, delivery: Delivery) -> None:
+        delivery.attempts += 1
+        stats = self.stats[delivery.priority]
+        try:
+            result = await delivery.send()
+        except Exception as e:
+            retry_in = self._retry_delay(e, delivery)
+            if retry_in is None:
+                stats.failed += 1
+                logger.warning(
+                    f"📮 Delivery to {delivery.chat_id} failed after {delivery.attempts} attempt(s): {e}"
+                )
+                _settle(delivery.future, error=e)
+            elif delivery.future.done():
+                pass  # the caller gave up waiting
+            elif delivery.key is not None and self._latest.get(delivery.key) != delivery.seq:
+                stats.superseded += 1
+                _settle(delivery.future, None)
+            else:
+                stats.retried += 1
+                logger.info(f"📮 Delivery to {delivery.chat_id} failed ({e}); retrying in {retry_in:.1f}s")
+                delivery.not_before = self._clock() + retry_in
+                self._enqueue(delivery, front=True)
+        else:
+            latency = self._clock() - delivery.enqueued_at
+            stats.sent += 1
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+            _settle(delivery.future, result)
+        finally:
+            self._chat_ready[delivery.chat_id] = self._clock() + self.chat_interval
+            del self._in_flight[delivery.chat_id]
+            if delivery.key is not None and self._latest.get(delivery.key) == delivery.seq \
+                    and delivery.future.done():
+                del self._latest[delivery.key]
+            self._wakeup.set()
+
+    def _retry_delay(self, error: Exception, delivery: Delivery) -> Optional[float]:
+        """Seconds before retrying delivery after error, or None to give up.
+
+        Flood-control waits count against max_attempts like any retry, so a chat that keeps
+        being limited cannot hold its priority lane forever.
+        """
+        if isinstance(error, RetryAfter):
+            wait = retry_after_seconds(error)
+            self._paused_until = max(self._paused_until, self._clock() + wait)
+            return wait if delivery.attempts < self.max_attempts else None
+        if delivery.attempts >= self.max_attempts:
+            return None
+        if isinstance(error, NetworkError) and not isinstance(error, BadRequest):
+            return min(self.max_backoff, self.base_backoff * 2 ** (delivery.attempts - 1))
+        return None
+
+    def status_line(self) -> str:
+        parts = []
+        for priority, name in PRIORITY_NAMES.items():
+            stats = self.stats[priority]
+            done = stats.sent + stats.failed
+            if not done and not self._queues[priority]:
+                continue
+            mean = stats.total_latency / stats.sent if stats.sent else 0.0
+            parts.append(
+                f"{name} {len(self._queues[priority])} queued (peak {stats.peak}), {stats.sent} sent, "
+                f"{stats.failed} failed, {stats.retried} retried, latency {mean:.1f}s mean / "
+                f"{stats.max_latency:.1f}s max"
+            )
+        pause = self._paused_until - self._clock()
+        if pause > 0:
+            parts.append(f"paused {pause:.0f}s by Telegram flood control")
+        return "; ".join(parts) if parts else "nothing sent yet"
@@ -34,6 +34,17 @@ class CheckResult:
     error: Optional[str] = None
     target_url: str = ""
     facilities_label: Tuple[str, ...] = field(default_factory=tuple)
+    # Calendar periods whose content differed from the previous scrape (None = not tracked)
+    periods_changed: Optional[int] = None
+    # Hash of every period walked; equal fingerprints mean an identical calendar
+    fingerprint: Optional[str] = None
+    # True when the scrape deadline stopped the walk early; slots cover periods_scanned periods
+    partial: bool = False
+    periods_scanned: Optional[int] = None
+    # Last calendar date the walk reached; calendar_complete = it was the calendar's end, so
+    # the result answers any request regardless of week/month navigation
+    covered_through: Optional[str] = None
+    calendar_complete: bool = False
 
     @property
     def is_error(self) -> bool:
@@ -202,6 +213,17 @@ def render_slots_message(
     return message
 
 
+def partial_result_note(check: CheckResult) -> str:
+    """Footer for a deadline-truncated result (empty for a complete one)."""
+    if not check.partial:
+        return ""
+    scanned = check.periods_scanned or 0
+    return (
+        f"⏱️ Partial result: the site was too slow, only the first {scanned} "
+        f"calendar period(s) were checked. Later dates may have slots."
+    )
+
+
 def format_check_message(
     check: CheckResult,
     *,
@@ -210,6 +232,23 @@ def format_check_message(
     apply_default_types: Optional[Sequence[str]] = None,
 ) -> str:
     """Render a CheckResult with optional filters (errors and no-slots pass through)."""
+    message = _format_check_body(
+        check,
+        keep_types=keep_types,
+        keep_facilities=keep_facilities,
+        apply_default_types=apply_default_types,
+    )
+    note = partial_result_note(check)
+    return f"{message}\n\n{note}" if note and not check.is_error else message
+
+
+def _format_check_body(
+    check: CheckResult,
+    *,
+    keep_types: Optional[Sequence[str]] = None,
+    keep_facilities: Optional[Sequence[str]] = None,
+    apply_default_types: Optional[Sequence[str]] = None,
+) -> str:
     if check.is_error:
         return check.error or NO_SLOTS_MESSAGE
     if not check.has_slots:
@@ -0,0 +1,184 @@
+"""Per-source scrape engine selection: ``http``, ``playwright``, or ``auto`` with fallback.
+
+(``replay`` serves recorded calendars instead of the live sites; see reservation_checker_replay.py.)
+
+``EngineRouter`` stands in for a ReservationChecker in run_bot.py: same ``run_check()``
+contract, and any other attribute (``target_url``, ``process_available_slots``, ...) is
+read from its primary engine. In ``auto`` it keeps a rolling (EWMA) success rate and
+latency per engine, tries the cheapest healthy engine first, and falls back to the next
+one when the first reports a challenge, a missing calendar, or an error (not after a
+timeout: the scrape deadline covers the whole check).
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional
+
+from app_logging import SCRAPER_LOGGER_NAME
+
+logger = logging.getLogger(SCRAPER_LOGGER_NAME)
+
+ENGINE_MODES = ("http", "playwright", "auto", "replay")
+# Tie-break when scores are equal or unknown: cheapest engine first
+ENGINE_PREFERENCE = ("http", "playwright")
+
+
+class EngineScore:
+    """Rolling success rate and successful-scrape latency for one engine."""
+
+    def __init__(self, alpha: float = 0.3, min_success: float = 0.5):
+        self.alpha = alpha
+        self.min_success = min_success
+        self.success: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.attempts = 0
+        self.failures = 0
+
+    def record(self, ok: bool, seconds: float) -> None:
+        self.attempts += 1
+        sample = 1.0 if ok else 0.0
+        self.success = sample if self.success is None else self.success + self.alpha * (sample - self.success)
+        if ok:
+            self.latency = seconds if self.latency is None else self.latency + self.alpha * (seconds - self.latency)
+        else:
+            self.failures += 1
+
+    @property
+    def healthy(self) -> bool:
+        return self.success is None or self.success >= self.min_success
+
+    def summary(self) -> str:
+        if not self.attempts:
+            return "untried"
+        latency = f"~{self.latency:.1f}s" if self.latency is not None else "no successes"
+        return f"{self.success:.0%} ok, {latency} ({self.attempts} run(s))"
+
+
+class EngineRouter:
+    """Run one source's scrapes on the configured engine(s)."""
+
+    def __init__(
+        self,
+        engines: Dict[str, object],
+        mode: str = "auto",
+        alpha: float = 0.3,
+        min_success: float = 0.5,
+        probe_interval: int = 10,
+    ):
+        if mode not in ENGINE_MODES:
+            raise ValueError(f"Unknown scrape engine mode: {mode}")
+        if mode != "auto" and mode not in engines:
+            raise ValueError(f"Scrape engine {mode!r} not configured")
+        self.engines = dict(engines)
+        self.mode = mode
+        self.probe_interval = probe_interval
+        self.scores = {name: EngineScore(alpha=alpha, min_success=min_success) for name in self.engines}
+        self._runs_since_probe = 0
+
+        self.last_engine: Optional[str] = None
+        self.last_seconds: Optional[float] = None
+        self.last_outcome: Optional[str] = None
+        self.last_fallback = False
+        # Forwarded to the engine running each scrape (see PeriodStream)
+        self.period_listener = None
+
+    @property
+    def primary(self):
+        """Engine whose attributes the router exposes (Playwright when configured)."""
+        if "playwright" in self.engines:
+            return self.engines["playwright"]
+        return next(iter(self.engines.values()))
+
+    def __getattr__(self, name):
+        # Only reached for attributes the router does not define itself.
+        if name.startswith('__') or name in ('engines',):
+            raise AttributeError(name)
+        return getattr(self.primary, name)
+
+    def engine_order(self) -> List[str]:
+        """Engines to try for the next scrape, best first."""
+        if self.mode != "auto":
+            return [self.mode]
+
+        def rank(name):
+            score = self.scores[name]
+            preference = ENGINE_PREFERENCE.index(name) if name in ENGINE_PREFERENCE else len(ENGINE_PREFERENCE)
+            # Measured healthy engines by latency, then untried ones by preference
+            untried = score.latency is None
+            return (not score.healthy, untried, 0.0 if untried else score.latency, preference)
+
+        order = sorted(self.engines, key=rank)
+        probes = [
+            name for name in order[1:]
+            if not self.scores[name].healthy or self.scores[name].latency is None
+        ]
+        self._runs_since_probe += 1
+        if probes and self._runs_since_probe >= self.probe_interval:
+            # Give a demoted or untried engine a chance to (re)earn its score.
+            order.remove(probes[0])
+            order.insert(0, probes[0])
+            self._runs_since_probe = 0
+        return order
+
+    async def run_check(self, send_notifications=False, use_month_navigation=False, show_all=False):
+        order = self.engine_order()
+        check = None
+        check_started = time.monotonic()
+        for attempt, name in enumerate(order):
+            engine = self.engines[name]
+            engine.last_outcome = None
+            engine.period_listener = self.period_listener
+            started = time.monotonic()
+            try:
+                check = await engine.run_check(
+                    send_notifications=send_notifications,
+                    use_month_navigation=use_month_navigation,
+                    show_all=show_all,
+                )
+            finally:
+                engine.period_listener = None
+            elapsed = time.monotonic() - started
+            # A fallback is scored from the check's start: its latency includes the failed attempts
+            spent = time.monotonic() - check_started
+            outcome = engine.last_outcome or ("error" if check.is_error else "ok")
+            self.scores[name].record(outcome == "ok", spent)
+            self.last_engine, self.last_seconds, self.last_outcome = name, spent, outcome
+            self.last_fallback = attempt > 0
+            total = f", {spent:.1f}s since the check started" if attempt else ""
+            logger.info(
+                f"🧰 {self.source_name}: {name} engine {outcome} in {elapsed:.1f}s{total} "
+                f"({self.scores[name].summary()})"
+            )
+            if outcome == "ok":
+                break
+            if outcome == "timeout":
+                # SCRAPE_DEADLINE_SECONDS bounds the whole check, not each engine's attempt
+                logger.warning(f"⏱️ {self.source_name}: {name} scrape timed out; not falling back")
+                break
+            if attempt + 1 < len(order):
+                logger.warning(
+                    f"↪️ {self.source_name}: {name} scrape {outcome}; falling back to {order[attempt + 1]}"
+                )
+        return check
+
+    def resource_status_line(self) -> str:
+        engine = self.engines[self.last_engine] if self.last_engine else self.primary
+        return engine.resource_status_line()
+
+    def session_status_line(self) -> str:
+        if len(self.engines) == 1:
+            return self.primary.session_status_line()
+        return "; ".join(
+            f"{name} {engine.session_status_line()}" for name, engine in self.engines.items()
+        )
+
+    def status_line(self) -> str:
+        if self.last_engine is None:
+            last = "no scrape yet"
+        else:
+            fallback = ", fallback" if self.last_fallback else ""
+            last = f"last {self.last_engine} {self.last_seconds:.1f}s ({self.last_outcome}{fallback})"
+        if self.mode != "auto":
+            return f"{self.mode}, {last}"
+        scores = ", ".join(f"{name} {score.summary()}" for name, score in self.scores.items())
+        return f"auto, {last}; {scores}"
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Browser-free scrape engine: ReservationChecker's run_check() contract over plain HTTP.
+
+The reservation sites render the calendar server-side. Paging is a form POST to
+``facilitySelect_dateTrans?movePage=next|oneMonthLater`` (relative to the calendar URL)
+carrying the page's hidden fields. One keep-alive ``httpx.AsyncClient`` per host
+(``HttpClientPool``) is shared across scrapes; its cookie jar plays the role of the
+Playwright storage state. Parsing runs through ``calendar_parser`` off the event loop.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from calendar_parser import CalendarPage
+from domain import Slot, dedupe_slots
+from reservation_checker_playwright import ReservationChecker
+from scrape_deadline import ScrapeDeadlineExceeded
+
+# Import all template values as defaults
+from config_template import *
+
+# Try to override with config values if they exist
+try:
+    import config
+    # Override template values with config values (if they exist)
+    for var in dir(config):
+        if not var.startswith('_') and var.isupper():
+            globals()[var] = getattr(config, var)
+except ImportError:
+    pass  # Use template values only
+
+logger = logging.getLogger('reservation_checker_http')
+
+NAV_PATH = "facilitySelect_dateTrans?movePage={move}"
+
+# navigation_type → (movePage value, label of the "next" button on the calendar page)
+NAVIGATION = {
+    'week': ('next', '2週後＞'),
+    'month': ('oneMonthLater', '1か月後＞'),
+}
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'ja,en;q=0.9',
+}
+
+# e.g. "予想待機時間は 2 分です" / "estimated wait time is 2 minutes"
+WAITING_ROOM_ESTIMATE_PATTERN = re.compile(r'(\d+)\s*(?:分|minute)')
+WAITING_ROOM_POLL_SECONDS = 5
+WAITING_ROOM_MAX_POLL_SECONDS = 60
+
+# Interstitial challenge page (normal pages may also load /cdn-cgi/challenge-platform scripts,
+# so the body marker only counts when the page has no table)
+CHALLENGE_TITLE = 'Just a moment'
+CHALLENGE_BODY_MARKER = 'cf-chl'
+BLOCKED_STATUS_CODES = (403, 429, 503)
+
+# Cloudflare clearance / waiting-room cookies: safe to share between parallel sessions
+# (the site's own session cookie is not — it carries the calendar position)
+CLEARANCE_COOKIE_PREFIXES = ('cf_', '__cf')
+
+
+class ScrapeBlocked(Exception):
+    """The site answered with a bot challenge or refusal instead of a calendar."""
+
+
+class CalendarAnomaly(Exception):
+    """A page loaded but held no parsable calendar table."""
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """A host's pooled transport lent to a session client: closing the client leaves it open."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass  # owned by the pool (HttpClientPool.aclose)
+
+
+class HttpClientPool:
+    """One keep-alive connection pool per host, plus that host's main AsyncClient (cookie jar)."""
+
+    def __init__(
+        self,
+        timeout_seconds: Optional[float] = None,
+        max_keepalive: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.timeout_seconds = timeout_seconds if timeout_seconds is not None else TIMEOUT / 1000
+        self.max_keepalive = max_keepalive or HTTP_MAX_KEEPALIVE
+        self.transport = transport  # tests inject httpx.MockTransport
+        self._transports: Dict[str, httpx.AsyncBaseTransport] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self.host_stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _host(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _transport_for(self, host: str) -> httpx.AsyncBaseTransport:
+        transport = self._transports.get(host)
+        if transport is None:
+            transport = self.transport or httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=self.max_keepalive,
+                    max_keepalive_connections=self.max_keepalive,
+                ),
+            )
+            self._transports[host] = transport
+            self.host_stats.setdefault(host, {'requests': 0, 'bytes': 0})
+        return transport
+
+    def _new_client(self, host: str, shared: bool = False) -> httpx.AsyncClient:
+        transport = self._transport_for(host)
+        return httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=self.timeout_seconds,
+            follow_redirects=True,
+            transport=_SharedTransport(transport) if shared else transport,
+        )
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        """The host's long-lived client; its cookies persist between scrapes."""
+        host = self._host(url)
+        client = self._clients.get(host)
+        if client is None:
+            client = self._new_client(host)
+            self._clients[host] = client
+        return client
+
+    def session_client(self, url: str) -> httpx.AsyncClient:
+        """Extra client with its own site session on the host's shared connections.
+
+        Seeded with the main client's Cloudflare cookies only. The caller aclose()s it when
+        done; that drops its session but leaves the host's connections to the pool.
+        """
+        client = self._new_client(self._host(url), shared=True)
+        for cookie in self.client_for(url).cookies.jar:
+            if cookie.name.startswith(CLEARANCE_COOKIE_PREFIXES):
+                client.cookies.jar.set_cookie(cookie)
+        return client
+
+    def record(self, url: str, num_bytes: int) -> None:
+        stats = self.host_stats.setdefault(self._host(url), {'requests': 0, 'bytes': 0})
+        stats['requests'] += 1
+        stats['bytes'] += num_bytes
+
+    async def aclose(self) -> None:
+        transports, self._transports = self._transports, {}
+        self._clients = {}
+        for transport in transports.values():
+            try:
+                await transport.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing HTTP transport: {e}")
+
+    def status_line(self) -> str:
+        if not self.host_stats:
+            return "no requests yet"
+        return ", ".join(
+            f"{urlsplit(host).netloc} {stats['requests']} req / {stats['bytes'] / 1024:.0f} KB"
+            for host, stats in self.host_stats.items()
+        )
+
+
+class HttpReservationChecker(ReservationChecker):
+    """Same constructor and run_check() → CheckResult as ReservationChecker, no browser."""
+
+    engine_name = "http"
+
+    def __init__(
+        self,
+        target_url=None,
+        target_facilities=None,
+        target_slot_types=None,
+        source_name="tokyo",
+        http_pool: Optional[HttpClientPool] = None,
+        snapshot_archive=None,
+    ):
+        super().__init__(
+            target_url=target_url,
+            target_facilities=target_facilities,
+            target_slot_types=target_slot_types,
+            source_name=source_name,
+            snapshot_archive=snapshot_archive,
+        )
+        # Session lives in the pooled client's cookie jar, never on disk.
+        self.storage_state_path = None
+        self.http_pool = http_pool
+        self._pool: Optional[HttpClientPool] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self.last_transfer: Dict = {}
+
+    def invalidate_storage_state(self, reason: str) -> None:
+        """Drop this host's cookies (challenge / error page): next scrape starts clean."""
+        if self._client is not None and len(self._client.cookies):
+            self._client.cookies.clear()
+            logger.info(f"🍪 Cleared HTTP session cookies for {self.source_name} ({reason})")
+
+    def resource_status_line(self) -> str:
+        if not self.last_transfer:
+            return "no scrapes yet"
+        return (
+            f"{self.last_transfer['requests']} request(s), "
+            f"{self.last_transfer['bytes'] / 1024:.0f} KB over HTTP"
+        )
+
+    async def _request(self, client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+        response = await client.request(method, url, **kwargs)
+        num_bytes = len(response.content)
+        self.last_transfer['requests'] += 1
+        self.last_transfer['bytes'] += num_bytes
+        if self.http_pool is not None:
+            self.http_pool.record(url, num_bytes)
+        return response
+
+    async def _parse(self, response: httpx.Response) -> CalendarPage:
+        """Parse the response (off the event loop) and reject challenge / error pages."""
+        page = await self.calendar_parser.page_async(response.text)
+        if 'Waiting Room' in page.title:
+            return page
+        if (
+            response.status_code in BLOCKED_STATUS_CODES
+            or CHALLENGE_TITLE in page.title
+            or (CHALLENGE_BODY_MARKER in response.text and not page.matrix)
+        ):
+            raise ScrapeBlocked(f"HTTP {response.status_code} bot challenge ({page.title or 'no title'})")
+        response.raise_for_status()
+        if 'エラー' in page.title or 'Error' in page.title:
+            raise CalendarAnomaly(f"error page: {page.title}")
+        return page
+
+    async def _load_calendar(self, client: httpx.AsyncClient) -> Tuple[httpx.Response, CalendarPage]:
+        """GET the calendar, backing off while Cloudflare's waiting room holds us."""
+        logger.info(f"🔍 Fetching: {self.target_url}")
+        waited = 0.0
+        backoff = WAITING_ROOM_POLL_SECONDS
+        while True:
+            response = await self._request(client, 'GET', self.target_url)
+            page = await self._parse(response)
+            if 'Waiting Room' not in page.title:
+                logger.info(f"📄 Page title: {page.title}")
+                return response, page
+
+            remaining = HTTP_WAITING_ROOM_MAX_WAIT - waited
+            if remaining <= 0:
+                raise Exception(
+                    f"Timed out waiting for Cloudflare waiting room to pass ({HTTP_WAITING_ROOM_MAX_WAIT}s)"
+                )
+            match = WAITING_ROOM_ESTIMATE_PATTERN.search(response.text)
+            delay = min(int(match.group(1)) * 60 if match else backoff, remaining)
+            backoff = min(backoff * 2, WAITING_ROOM_MAX_POLL_SECONDS)
+            logger.info(
+                f"Cloudflare waiting room detected ({waited:.0f}s elapsed); retrying in {delay:.0f}s"
+            )
+            await asyncio.sleep(delay)
+            waited += delay
+            self._waiting_room_ms += int(delay * 1000)
+
+    async def _post_navigation(
+        self, client: httpx.AsyncClient, response: httpx.Response, move: str, fields: Dict
+    ) -> Tuple[httpx.Response, CalendarPage]:
+        """POST the calendar form to facilitySelect_dateTrans (one period / month forward)."""
+        nav_url = urljoin(str(response.url), NAV_PATH.format(move=move))
+        response = await self._request(client, 'POST', nav_url, data=fields)
+        return response, await self._parse(response)
+
+    async def _check_periods(
+        self,
+        client: httpx.AsyncClient,
+        response: httpx.Response,
+        page: CalendarPage,
+        navigation_type: str,
+        max_periods: Optional[int] = None,
+        slice_index: int = 0,
+    ) -> List[Slot]:
+        """Walk periods by POSTing the page's form to facilitySelect_dateTrans.
+
+        max_periods=None is a whole-calendar walk bounded by the learned horizon (see
+        ReservationChecker._check_periods).
+        """
+        move, button_value = NAVIGATION[navigation_type]
+        all_available_slots: List[Slot] = []
+        last_headers = None
+        period_count = 0
+        full_walk = max_periods is None
+        limit = self.horizon.limit(navigation_type) if full_walk else max_periods
+        reached_end = False
+
+        try:
+            while period_count < limit:
+                period = period_count + 1
+                # Headers first: the repeated end page is neither parsed nor counted as a period
+                date_headers = self._headers_from_matrix(page.matrix)
+                if not date_headers:
+                    if period == 1:
+                        raise CalendarAnomaly("No calendar table in response")
+                    logger.warning(f"{navigation_type.capitalize()} {period}: no calendar table; stopping")
+                    break
+                if date_headers == last_headers:
+                    logger.info("🏁 Dates unchanged — reached end of available dates")
+                    reached_end = True
+                    break
+                current_slots, date_headers = self._slots_for_period(page.matrix)
+                last_headers = date_headers
+                period_count = period
+                self._periods_scanned += 1
+                self._capture_snapshot(navigation_type, slice_index, period, response.text, kind="page")
+
+                logger.info(f"🔄 Checking {navigation_type} {period}")
+                self._log_date_range(date_headers)
+                all_available_slots.extend(current_slots)
+                self._emit_period(navigation_type, slice_index, period, current_slots, date_headers[-1])
+                if current_slots:
+                    logger.info(f"🎯 {navigation_type.capitalize()} {period}: Found {len(current_slots)} available slots")
+                else:
+                    logger.info(f"📭 {navigation_type.capitalize()} {period}: No available slots found")
+
+                form = page.form_with_button(button_value)
+                if form is None or not form.buttons[button_value]:
+                    logger.info(f"Next {navigation_type} button missing/disabled - reached end of available dates")
+                    reached_end = True
+                    break
+
+                if period_count == limit and full_walk and limit < PERIOD_MAX_LIMIT:
+                    limit = self.horizon.extend(limit)
+                    logger.info(
+                        f"📏 Calendar continues past the expected horizon; allowing up to {limit} {navigation_type}s"
+                    )
+                if period_count >= limit:
+                    break
+
+                response, page = await self._phase(
+                    "navigation", self._post_navigation(client, response, move, form.fields)
+                )
+        except ScrapeDeadlineExceeded as e:
+            self._stop_walk_at_deadline(e, navigation_type)
+
+        last_date = last_headers[-1] if last_headers else None
+        if full_walk and reached_end:
+            self.horizon.record(navigation_type, period_count, last_date)
+        self._note_coverage(reached_end, last_date, slice_index, finished=period_count >= limit)
+
+        logger.info(
+            f"📊 SUMMARY: Checked {period_count} {navigation_type}s, "
+            f"found {len(all_available_slots)} total available slots"
+        )
+        if full_walk and not reached_end and period_count >= limit:
+            logger.warning(f"⚠️ Reached maximum {navigation_type} limit ({limit}) with the calendar still going.")
+        return list(dedupe_slots(all_available_slots))
+
+    async def _check_slice(self, slice_index: int, hops: int, walk: int, navigation_type: str) -> List[Slot]:
+        """One slice of sliced navigation, in its own site session (slice 0 uses the main client)."""
+        if slice_index == 0:
+            return await self._walk_slice(self._client, slice_index, hops, walk, navigation_type)
+        async with self._pool.session_client(self.target_url) as client:
+            return await self._walk_slice(client, slice_index, hops, walk, navigation_type)
+
+    async def _walk_slice(
+        self, client: httpx.AsyncClient, slice_index: int, hops: int, walk: int, navigation_type: str
+    ) -> List[Slot]:
+        move, button_value = NAVIGATION['month']
+        try:
+            response, page = await self._phase("waiting_room", self._load_calendar(client))
+            for _hop in range(hops):
+                form = page.form_with_button(button_value)
+                if form is None or not form.buttons[button_value]:
+                    logger.info(f"🧩 Slice {slice_index + 1}: +{hops} month(s) is past the end of the calendar")
+                    self._note_coverage(True, None, slice_index)
+                    return []
+                response, page = await self._phase(
+                    "navigation", self._post_navigation(client, response, move, form.fields)
+                )
+        except ScrapeDeadlineExceeded as e:
+            self._stop_walk_at_deadline(e, navigation_type)
+            return []
+        return await self._check_periods(
+            client, response, page, navigation_type, max_periods=walk, slice_index=slice_index
+        )
+
+    async def run_check(self, send_notifications=False, use_month_navigation=False, show_all=False):
+        """Scrape over HTTP; same contract (and CheckResult) as ReservationChecker.run_check."""
+        logger.info(f"Starting HTTP reservation check ({self.source_name})...")
+        pool = self.http_pool or HttpClientPool()
+        self._pool = pool
+        self._client = pool.client_for(self.target_url)
+        self._scrape_reused_state = bool(len(self._client.cookies))
+        self._waiting_room_ms = 0
+        self.last_transfer = {'requests': 0, 'bytes': 0}
+        self._begin_period_tracking()
+        self._begin_deadline()
+        self._begin_snapshots()
+        start = time.perf_counter()
+
+        try:
+            navigation_type = "month" if use_month_navigation else "week"
+            if PERIOD_NAVIGATION == "sliced":
+                available_slots = await self._check_periods_sliced(navigation_type)
+            else:
+                response, page = await self._phase("waiting_room", self._load_calendar(self._client))
+                available_slots = await self._check_periods(self._client, response, page, navigation_type)
+            check = self._stamp_coverage(
+                await self._finish_check(available_slots, send_notifications, show_all)
+            )
+            self._record_session_metrics()
+            self.last_outcome = "ok"
+            return self._end_period_tracking(check)
+        except ScrapeDeadlineExceeded as e:
+            # A slow site is not a bad session: keep the cookies.
+            logger.warning(f"⏱️ {e}; no period was scanned")
+            self._period_cache_next = {}
+            self.last_outcome = "timeout"
+            self._record_session_metrics()
+            return self._error_result(e)
+        except Exception as e:
+            self._period_cache_next = {}
+            if isinstance(e, ScrapeBlocked):
+                self.last_outcome = "blocked"
+            elif isinstance(e, CalendarAnomaly):
+                self.last_outcome = "anomaly"
+            else:
+                self.last_outcome = "error"
+            logger.error(f"Error during HTTP reservation check ({self.last_outcome}): {e}")
+            self.invalidate_storage_state(f"scrape {self.last_outcome}")
+            self._record_session_metrics()
+            return self._error_result(e)
+        finally:
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"📦 HTTP transfer: {self.last_transfer['requests']} request(s), "
+                f"{self.last_transfer['bytes'] / 1024:.1f} KB in {elapsed:.2f}s"
+            )
+            if self.http_pool is None:
+                await pool.aclose()
+            self._client = None
+            self._pool = None
+            await self._archive_snapshots()
+
+
+async def main():
+    """CLI debug: scrape Tokyo over HTTP and print; never notifies subscribers."""
+    from app_logging import configure_logging
+    from domain import format_check_message
+
+    configure_logging()
+    checker = HttpReservationChecker()
+    check = await checker.run_check(send_notifications=False)
+    print(format_check_message(check))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,13 +6,34 @@ and sends Telegram notifications when slots are found.
 """
 
 import asyncio
+import hashlib
+import json
 import logging
 import os
-import re
+import tempfile
+import time
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Set, Tuple, Optional
 from playwright.async_api import async_playwright, Page
 
+from browser_pool import MemoryRefused, process_memory_mb
+from calendar_parser import (
+    DATE_MD_PATTERN,
+    SLOT_AVAILABLE,
+    SLOT_FULL,
+    SLOT_OUT_OF_HOURS,
+    CalendarParser,
+    date_from_sr_text,
+    headers_from_matrix,
+    matrix_fingerprint,
+    normalize_label,
+    resolve_calendar_row,
+    slots_from_matrix,
+)
 from domain import (
     CheckResult,
     Slot,
@@ -20,6 +41,8 @@ from domain import (
     filter_slots,
     format_check_message,
 )
+from scrape_deadline import ScrapeDeadline, ScrapeDeadlineExceeded
+from snapshot_archive import PeriodSnapshot, SnapshotArchive
 from telegram import Bot
 # Import all template values as defaults
 from config_template import *
@@ -34,19 +57,269 @@ try:
 except ImportError:
     pass  # Use template values only
 
-DATE_MD_PATTERN = re.compile(r'\d{1,2}/\d{1,2}')
-FULL_DATE_PATTERN = re.compile(r'(\d{4})年(\d{2})月(\d{2})日')
-
 logger = logging.getLogger('reservation_checker_playwright')
 
+# Whole calendar in one round trip: every <tr> as [tag, textContent, svg aria-label, .sr-only text]
+# per th/td cell — the same elements the DOM walk visits, so parsing stays identical.
+CALENDAR_MATRIX_JS = """
+() => Array.from(document.querySelectorAll('tr')).map(tr =>
+    Array.from(tr.querySelectorAll('th, td')).map(cell => {
+        const svg = cell.querySelector('svg');
+        const srOnly = cell.querySelector('.sr-only');
+        return [
+            cell.tagName.toLowerCase(),
+            cell.textContent || '',
+            svg ? svg.getAttribute('aria-label') : null,
+            srOnly ? srOnly.textContent : null,
+        ];
+    })
+)
+"""
+
+# Identity of the calendar currently rendered: its MM/DD header cells. null until the
+# table has date headers and at least one slot marker, i.e. the period is parsable.
+CALENDAR_FINGERPRINT_JS = """
+() => {
+    const headers = Array.from(document.querySelectorAll('td'))
+        .map(td => (td.textContent || '').trim())
+        .filter(text => /\\d{1,2}\\/\\d{1,2}/.test(text));
+    if (headers.length < 3 || !document.querySelector('td svg[aria-label]')) {
+        return null;
+    }
+    return headers.join('|');
+}
+"""
+
+# Resolves (truthy fingerprint) once the calendar is parsable and differs from `previous`.
+CALENDAR_READY_JS = """
+(previous) => {
+    const fingerprint = (%s)();
+    return fingerprint !== null && fingerprint !== previous ? fingerprint : false;
+}
+""" % CALENDAR_FINGERPRINT_JS.strip()
+
+NEXT_MONTH_BUTTON = '1か月後＞'
+NEXT_WEEK_BUTTON = '2週後＞'
+
+# Aborted by the context route; still counted per scrape (see _account_request)
+BLOCKED_RESOURCE_TYPES = ('image', 'stylesheet', 'font')
+# How long a closing page waits for byte counts still being read (see _settle_byte_counts)
+BYTE_COUNT_SETTLE_SECONDS = 2.0
+
+END_OF_DATES_MARKERS = ('予約可能な日付がありません', 'No available dates', '利用可能な日付がありません')
+
+# Calendar <table> outerHTML for the snapshot archive (same selector as capture_calendar_fixture.py)
+CALENDAR_TABLE_HTML_JS = """
+() => {
+    const table = document.querySelector('table#TBL, table.time--table, table');
+    return table ? table.outerHTML : null;
+}
+"""
+
+# One round trip per period: end-of-dates indicators, the next button's state, and the
+# last MM/DD header (replaces five query_selector probes, a row count and three button calls).
+PERIOD_STATE_JS = """
+(nextLabel) => {
+    const text = document.body ? (document.body.innerText || '') : '';
+    const end = %s.some(marker => text.includes(marker))
+        || document.querySelector('.no-availability, .no-dates') !== null
+        || document.querySelectorAll('tr').length <= 1;
+    const button = document.querySelector(`input[value="${nextLabel}"]`);
+    let next = 'missing';
+    if (button) {
+        next = button.disabled || button.getAttribute('aria-disabled') === 'true' ? 'disabled' : 'enabled';
+    }
+    const dates = Array.from(document.querySelectorAll('td'))
+        .map(td => (td.textContent || '').trim())
+        .filter(text => /\\d{1,2}\\/\\d{1,2}/.test(text));
+    return {end, next, lastDate: dates.length ? dates[dates.length - 1] : null};
+}
+""" % json.dumps(list(END_OF_DATES_MARKERS), ensure_ascii=False)
+
+
+def plan_period_slices(
+    navigation_type: str, max_periods: int, slices: int, slice_months: int
+) -> List[Tuple[int, int]]:
+    """Split the horizon for sliced navigation: [(month hops to the seed page, periods to walk)].
+
+    The sites only offer relative paging (movePage=next / oneMonthLater), so slice k is
+    seeded by k * slice_months "1か月後＞" hops and then walks enough periods to reach the
+    next seed (overlap is removed by dedupe_slots). The last slice walks from its seed to
+    the end of max_periods; its seed is at least 28 days per month hop ahead, so it walks
+    from that offset (a walk past the calendar's end stops at the end).
+    """
+    slices = max(1, slices)
+    slice_months = max(1, slice_months)
+    week = navigation_type == "week"
+    # A week-view period is 14 days; a month-view period is one month.
+    per_slice = -(-slice_months * 31 // 14) if week else slice_months
+    plan = []
+    for k in range(slices):
+        if k < slices - 1:
+            walk = per_slice
+        else:
+            seed_offset = k * slice_months * 28 // 14 if week else k * slice_months
+            walk = max(max_periods - seed_offset, per_slice)
+        plan.append((k * slice_months, walk))
+    return plan
+
+
+class CalendarHorizon:
+    """How many periods a source's calendar had on recent complete walks, per navigation type.
+
+    The walk limit is the largest recent horizon plus PERIOD_HORIZON_MARGIN (PERIOD_LIMIT
+    before anything is learned); walks that find the calendar still going at the limit
+    extend it, up to PERIOD_MAX_LIMIT, instead of stopping silently.
+    """
+
+    def __init__(self, history: Optional[int] = None):
+        history = history or PERIOD_HORIZON_HISTORY
+        self._periods = {navigation_type: deque(maxlen=history) for navigation_type in ('week', 'month')}
+        self.last_date: Dict[str, str] = {}
+
+    def expected(self, navigation_type: str) -> Optional[int]:
+        recent = self._periods[navigation_type]
+        return max(recent) if recent else None
+
+    def limit(self, navigation_type: str) -> int:
+        expected = self.expected(navigation_type)
+        if expected is None:
+            return PERIOD_LIMIT
+        return min(expected + PERIOD_HORIZON_MARGIN, PERIOD_MAX_LIMIT)
+
+    def extend(self, limit: int) -> int:
+        return min(limit + max(1, PERIOD_HORIZON_MARGIN), PERIOD_MAX_LIMIT)
+
+    def record(self, navigation_type: str, periods: int, last_date: Optional[str]) -> None:
+        expected = self.expected(navigation_type)
+        if expected is not None and periods != expected:
+            change = "grew" if periods > expected else "shrank"
+            logger.info(f"📏 Calendar horizon {change}: {expected} → {periods} {navigation_type}(s)")
+        self._periods[navigation_type].append(periods)
+        if last_date:
+            self.last_date[navigation_type] = last_date
+
+    def summary(self) -> str:
+        parts = []
+        for navigation_type, recent in self._periods.items():
+            if recent:
+                last = self.last_date.get(navigation_type)
+                parts.append(f"{recent[-1]} {navigation_type}s" + (f" to {last}" if last else ""))
+        return ", ".join(parts)
+
+
+@dataclass(frozen=True)
+class PeriodSlots:
+    """One calendar period scanned by a scrape in flight (before slot-type filtering)."""
+
+    navigation_type: str
+    slice_index: int
+    period: int
+    slots: Tuple[Slot, ...]
+    last_date: Optional[str]
+
+
+class PeriodStream:
+    """The periods a checker scans during one run, as an async stream.
+
+    ``with PeriodStream(checker) as periods:`` installs itself as the checker's period
+    listener; ``async for period in periods`` then yields each PeriodSlots as soon as the
+    walk (or a slice of it) has scanned it, and ends when the ``with`` block is left,
+    i.e. once the run_check awaited inside it has returned.
+    """
+
+    def __init__(self, checker):
+        self._checker = checker
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def __enter__(self) -> "PeriodStream":
+        self._checker.period_listener = self._queue.put_nowait
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._checker.period_listener = None
+        self._queue.put_nowait(None)
+
+    def __aiter__(self) -> "PeriodStream":
+        return self
+
+    async def __anext__(self) -> PeriodSlots:
+        period = await self._queue.get()
+        if period is None:
+            raise StopAsyncIteration
+        return period
+
+
+# DOM round trips of the extraction in progress; per task, since sliced walks run concurrently
+_extraction_dom_calls: ContextVar[Optional[List[int]]] = ContextVar("extraction_dom_calls", default=None)
+
 class ReservationChecker:
-    def __init__(self, target_url=None, target_facilities=None, target_slot_types=None, source_name="tokyo"):
+    engine_name = "playwright"
+
+    def __init__(
+        self,
+        target_url=None,
+        target_facilities=None,
+        target_slot_types=None,
+        source_name="tokyo",
+        browser_pool=None,
+        snapshot_archive: Optional[SnapshotArchive] = None,
+    ):
         self.bot = Bot(token=TELEGRAM_BOT_TOKEN)
         self.available_slots = []
         self.target_url = target_url or TARGET_URL
         self.target_facilities = target_facilities or TARGET_FACILITIES
         self.target_slot_types = target_slot_types or TARGET_SLOT_TYPES
         self.source_name = source_name
+        # Shared BrowserPool (run_bot.py); None = launch a private Chromium per scrape
+        self.browser_pool = browser_pool
+        self.calendar_parser = CalendarParser(self.target_facilities)
+        # "ok" once periods were walked, else "error" (HTTP engine adds blocked/anomaly)
+        self.last_outcome: Optional[str] = None
+        # Last extraction's stats and the last walk's per-period ready times; after a sliced
+        # walk, extraction totals and ready times merged over all slices
+        self.last_extraction_stats: Dict = {}
+        self.last_period_ready_ms: List[float] = []
+        self._walk_stats: Dict[int, Tuple[List[float], int, float]] = {}  # slice -> (ready ms, DOM calls, extraction ms)
+        # Period fingerprint → (slots, headers) from the last successful scrape, and the
+        # table being built by the scrape in flight (swapped in by _end_period_tracking)
+        self._period_cache: Dict[str, Tuple[List[Slot], List[str]]] = {}
+        self._period_cache_next: Dict[str, Tuple[List[Slot], List[str]]] = {}
+        self._periods_changed = 0
+        self.horizon = CalendarHorizon()
+        # Per-scrape request/byte counts by resource type (see _account_request)
+        self._resources: Dict[str, Dict[str, int]] = {}
+        self._byte_counts_pending: Set[asyncio.Task] = set()  # requestfinished handlers still awaiting sizes()
+        self.last_resources: Dict = {}
+        # Per-scrape time budget (SCRAPE_DEADLINE_SECONDS / SCRAPE_PHASE_BUDGETS)
+        self._deadline: Optional[ScrapeDeadline] = None
+        self._partial_phase: Optional[str] = None
+        self._periods_scanned = 0
+        # How far this scrape's walk reached (stamped on the CheckResult), from each slice's
+        # (finished its range, reached the end, last date)
+        self._covered_through: Optional[str] = None
+        self._calendar_complete = False
+        self._slices_planned = 1
+        self._slice_coverage: Dict[int, Tuple[bool, bool, Optional[str]]] = {}
+        # Raw period HTML for the SnapshotArchive (None = not archiving this scrape)
+        self.snapshot_archive = snapshot_archive
+        self._snapshots: Optional[List[PeriodSnapshot]] = None
+        self.last_snapshot_id: Optional[str] = None
+        # Called with each scanned period's PeriodSlots while a scrape runs (see PeriodStream)
+        self.period_listener: Optional[Callable[[PeriodSlots], None]] = None
+
+        # Cloudflare clearance + site session (cookies/localStorage), reused across scrapes
+        self.storage_state_path = (
+            os.path.join(STORAGE_STATE_DIR, f"{source_name}.json") if STORAGE_STATE_DIR else None
+        )
+        self._storage_state: Optional[dict] = None
+        self._storage_state_loaded = False
+        self._scrape_reused_state = False
+        self._waiting_room_ms = 0
+        self.session_stats = {
+            mode: {'scrapes': 0, 'waiting_room_hits': 0, 'waiting_room_seconds': 0.0}
+            for mode in ('reused', 'fresh')
+        }
 
     async def send_telegram_message(self, message: str):
         """Send to every line in subscribers.txt (legacy). Production must use run_bot.py instead."""
@@ -101,8 +374,12 @@ class ReservationChecker:
                 continue
             if 'Waiting Room' in title:
                 logger.info(f"Cloudflare waiting room detected, waiting... ({elapsed // 1000}s elapsed)")
+                if not self._waiting_room_ms:
+                    # Saved clearance did not get us past Cloudflare — stop reusing it
+                    self.invalidate_storage_state("waiting room")
                 await page.wait_for_timeout(poll_interval)
                 elapsed += poll_interval
+                self._waiting_room_ms += poll_interval
                 continue
 
             # We're past the waiting room — wait for the actual table
@@ -116,7 +393,7 @@ class ReservationChecker:
                 except:
                     pass
 
-                await page.wait_for_timeout(DYNAMIC_CONTENT_WAIT)
+                await self._wait_for_calendar_ready(page, ceiling_ms=DYNAMIC_CONTENT_WAIT)
 
                 facility_elements = await page.query_selector_all('td')
                 if not facility_elements:
@@ -129,9 +406,40 @@ class ReservationChecker:
 
         raise Exception("Timed out waiting for Cloudflare waiting room to pass (3 minutes)")
 
+    async def _calendar_fingerprint(self, page: Page) -> Optional[str]:
+        try:
+            return await page.evaluate(CALENDAR_FINGERPRINT_JS)
+        except Exception as e:
+            logger.debug(f"Calendar fingerprint unavailable: {e}")
+            return None
+
+    async def _wait_for_calendar_ready(
+        self, page: Page, ceiling_ms: int, previous: Optional[str] = None
+    ) -> bool:
+        """Return as soon as the calendar is parsable (and changed from `previous`).
+
+        The old fixed sleep is kept as the ceiling: if readiness cannot be observed
+        within ceiling_ms, the caller proceeds exactly as it did after the fixed wait.
+        """
+        if READINESS_MODE != "event":
+            await page.wait_for_timeout(ceiling_ms)
+            return False
+
+        start = time.perf_counter()
+        try:
+            await page.wait_for_function(CALENDAR_READY_JS, arg=previous, timeout=ceiling_ms)
+            return True
+        except Exception as e:
+            # Timeout, or the execution context was torn down by navigation.
+            remaining = ceiling_ms - (time.perf_counter() - start) * 1000
+            logger.debug(f"Calendar readiness not observed ({e}); falling back to fixed wait")
+            if remaining > 0:
+                await page.wait_for_timeout(remaining)
+            return False
+
     @staticmethod
     def _normalize_label(text: str) -> str:
-        return ' '.join(text.strip().split())
+        return normalize_label(text)
 
     @classmethod
     def _applicant_type_matches(cls, applicant_type: str, target_types: List[str]) -> bool:
@@ -145,33 +453,25 @@ class ReservationChecker:
         current_facility: Optional[str],
         target_facilities: List[str],
     ) -> Optional[Tuple[str, str, str, int]]:
-        """Map a table row to facility, slot type, and where date cells start.
-
-        Kanagawa (and similar layouts) use rowspan on the facility cell, so only the
-        first slot-type row includes the facility name; follow-on rows have slot type
-        in the first column.
-        """
-        first_text = cls._normalize_label(first_text)
-        second_text = cls._normalize_label(second_text)
+        """Map a table row to facility, slot type, and where date cells start (see calendar_parser)."""
+        return resolve_calendar_row(first_text, second_text, current_facility, target_facilities)
 
-        for facility in target_facilities:
-            if cls._normalize_label(facility) in first_text:
-                return facility, facility, second_text, 2
-
-        if current_facility:
-            return current_facility, current_facility, first_text, 1
-
-        return None
+    async def _dom_call(self, awaitable):
+        """Await one Playwright DOM round trip, counting it for extraction stats."""
+        counter = _extraction_dom_calls.get()
+        if counter is not None:
+            counter[0] += 1
+        return await awaitable
 
     async def _collect_date_headers(self, rows) -> List[str]:
         """Find the calendar header row (cells look like MM/DD)."""
         for row in rows:
-            cells = await row.query_selector_all('td')
+            cells = await self._dom_call(row.query_selector_all('td'))
             if len(cells) < 3:
                 continue
             headers = []
             for cell in cells:
-                date_text = await cell.text_content()
+                date_text = await self._dom_call(cell.text_content())
                 if not date_text or not date_text.strip():
                     continue
                 clean_date = self._normalize_label(date_text)
@@ -185,38 +485,257 @@ class ReservationChecker:
         if index < len(date_headers):
             return date_headers[index]
 
-        sr_only = await cell.query_selector('.sr-only')
+        sr_only = await self._dom_call(cell.query_selector('.sr-only'))
         if sr_only:
-            sr_text = await sr_only.text_content()
-            if sr_text:
-                date_match = FULL_DATE_PATTERN.search(sr_text)
-                if date_match:
-                    _year, month, day = date_match.groups()
-                    return f"{month}/{day}"
+            sr_text = await self._dom_call(sr_only.text_content())
+            return self._date_from_sr_text(sr_text, index)
 
         return f"Unknown date {index + 1}"
 
+    @staticmethod
+    def _date_from_sr_text(sr_text: Optional[str], index: int) -> str:
+        return date_from_sr_text(sr_text, index)
+
+    @classmethod
+    def _headers_from_matrix(cls, rows: List[list]) -> List[str]:
+        """Python twin of _collect_date_headers over an extracted cell matrix."""
+        return headers_from_matrix(rows)
+
+    def _slots_from_matrix(self, rows: List[list]) -> Tuple[List[Slot], List[str]]:
+        """Build Slots from a cell matrix (CALENDAR_MATRIX_JS or CalendarParser.matrix)."""
+        return slots_from_matrix(rows, self.target_facilities, on_cell=self._log_cell)
+
+    def _slots_for_period(self, rows: List[list]) -> Tuple[List[Slot], List[str]]:
+        """_slots_from_matrix, reusing last scrape's Slots when the period's fingerprint matches."""
+        fingerprint = matrix_fingerprint(rows)
+        cached = self._period_cache.get(fingerprint)
+        if cached is None:
+            cached = self._period_cache_next.get(fingerprint)
+            if cached is None:
+                cached = self._slots_from_matrix(rows)
+                self._periods_changed += 1
+        else:
+            logger.info(f"♻️ Period unchanged since last scrape; reusing {len(cached[0])} slot(s)")
+        self._period_cache_next[fingerprint] = cached
+        return list(cached[0]), list(cached[1])
+
+    async def _phase(self, phase: str, awaitable):
+        """Await one scrape step under the current ScrapeDeadline (if any)."""
+        if self._deadline is None:
+            return await awaitable
+        return await self._deadline.run(phase, awaitable)
+
+    def _begin_deadline(self) -> None:
+        """Start this scrape's time budget and coverage accounting."""
+        self._deadline = ScrapeDeadline(SCRAPE_DEADLINE_SECONDS, SCRAPE_PHASE_BUDGETS)
+        self._partial_phase = None
+        self._periods_scanned = 0
+        self._covered_through = None
+        self._calendar_complete = False
+        self._slices_planned = 1
+        self._slice_coverage = {}
+
+    def _note_coverage(
+        self, reached_end: bool, last_date: Optional[str], slice_index: int = 0, finished: bool = False
+    ) -> None:
+        """Record how far a walk (or slice) got and recompute the scrape's coverage.
+
+        finished = the walk covered its whole assigned range. The scrape is complete only
+        when every planned slice finished or reached the end and one reached it (a slice cut
+        short leaves a gap); covered_through is the furthest slice's last date, slices being
+        seeded in date order.
+        """
+        self._slice_coverage[slice_index] = (finished or reached_end, reached_end, last_date)
+        coverage = [self._slice_coverage.get(k) for k in range(self._slices_planned)]
+        self._calendar_complete = (
+            all(c is not None and c[0] for c in coverage) and any(c[1] for c in coverage if c is not None)
+        )
+        self._covered_through = next((c[2] for c in reversed(coverage) if c is not None and c[2]), None)
+
+    def _stop_walk_at_deadline(self, e: ScrapeDeadlineExceeded, navigation_type: str) -> None:
+        self._partial_phase = e.phase
+        logger.warning(
+            f"⏱️ {e}; keeping the {self._periods_scanned} {navigation_type}(s) scanned so far"
+        )
+
+    def _stamp_coverage(self, check: CheckResult) -> CheckResult:
+        """Record periods scanned and date coverage; partial when the deadline cut the walk short.
+
+        A deadline that struck before any period was scanned is an error, not a result.
+        """
+        if self._partial_phase is not None and not self._periods_scanned:
+            raise self._deadline.expired
+        partial = self._partial_phase is not None
+        return replace(
+            check,
+            periods_scanned=self._periods_scanned,
+            partial=partial,
+            covered_through=self._covered_through,
+            calendar_complete=self._calendar_complete and not partial,
+        )
+
+    def _emit_period(
+        self, navigation_type: str, slice_index: int, period: int, slots, last_date: Optional[str]
+    ) -> None:
+        """Hand a scanned period's slots to the period listener, if one is installed."""
+        if self.period_listener is not None:
+            self.period_listener(PeriodSlots(navigation_type, slice_index, period, tuple(slots), last_date))
+
+    def _begin_snapshots(self) -> None:
+        self._snapshots = [] if self.snapshot_archive is not None else None
+
+    def _capture_snapshot(
+        self, navigation_type: str, slice_index: int, period: int, html: Optional[str], kind: str = "table"
+    ) -> None:
+        if self._snapshots is not None and html:
+            self._snapshots.append(PeriodSnapshot(navigation_type, slice_index, period, html, kind))
+
+    async def _capture_period(self, page: Page, navigation_type: str, slice_index: int, period: int) -> None:
+        """Keep this period's calendar table for the archive (one extra evaluate, archiving only)."""
+        if self._snapshots is None:
+            return
+        try:
+            html = await page.evaluate(CALENDAR_TABLE_HTML_JS)
+        except Exception as e:
+            logger.debug(f"Snapshot capture failed for {navigation_type} {period}: {e}")
+            return
+        self._capture_snapshot(navigation_type, slice_index, period, html)
+
+    async def _archive_snapshots(self) -> None:
+        """Write the scrape's captured periods to the archive off the event loop; never raises."""
+        snapshots, self._snapshots = self._snapshots, None
+        if not snapshots:
+            return
+        scrape_id = SnapshotArchive.new_scrape_id()
+        meta = {
+            "engine": self.engine_name,
+            "outcome": self.last_outcome,
+            "partial": self._partial_phase is not None,
+            # As stamped on the result, so a replay answers the same requests (see _stamp_coverage)
+            "calendar_complete": self._calendar_complete and self._partial_phase is None,
+            "covered_through": self._covered_through,
+        }
+        try:
+            written = await asyncio.to_thread(
+                self.snapshot_archive.write_scrape, self.source_name, scrape_id, snapshots, meta
+            )
+        except Exception as e:
+            logger.warning(f"Snapshot archive write failed for {self.source_name}: {e}")
+            return
+        self.last_snapshot_id = scrape_id
+        logger.info(
+            f"🗄️ Archived {len(snapshots)} period(s) for {self.source_name} as {scrape_id} "
+            f"({written / 1024:.1f} KB new)"
+        )
+
+    def _begin_period_tracking(self) -> None:
+        self._period_cache_next = {}
+        self._periods_changed = 0
+
+    def _end_period_tracking(self, check: CheckResult) -> CheckResult:
+        """Adopt this scrape's period table; stamp periods_changed / fingerprint on the result.
+
+        Only matrix extraction modes fingerprint periods; the legacy DOM walk leaves both None.
+        A failed scrape keeps the previous table as the baseline.
+        """
+        periods, self._period_cache_next = self._period_cache_next, {}
+        if not periods:
+            return check
+        self._period_cache = periods
+        digest = hashlib.blake2b(digest_size=16)
+        for fingerprint in sorted(periods):
+            digest.update(fingerprint.encode())
+        logger.info(f"🧮 Periods changed since last scrape: {self._periods_changed}/{len(periods)}")
+        return replace(check, periods_changed=self._periods_changed, fingerprint=digest.hexdigest())
+
+    @staticmethod
+    def _log_cell(aria_label, date_text, facility, applicant_type):
+        if aria_label == SLOT_AVAILABLE:
+            logger.info(f"✅ Found available slot: {date_text} - {facility} - {applicant_type}")
+        elif aria_label == SLOT_FULL:
+            logger.debug(f"❌ No availability: {date_text} - {applicant_type}")
+        elif aria_label == SLOT_OUT_OF_HOURS:
+            logger.debug(f"⏰ Outside hours: {date_text} - {applicant_type}")
+
+    @classmethod
+    def _record_cell(cls, slots: List[Slot], aria_label, date_text, facility, applicant_type):
+        if aria_label == SLOT_AVAILABLE:
+            slots.append(Slot(date=date_text, facility=facility, applicant_type=applicant_type))
+        cls._log_cell(aria_label, date_text, facility, applicant_type)
+
+    @staticmethod
+    def _log_date_range(date_headers: List[str]):
+        if date_headers:
+            logger.info(f"📅 Checking dates: {date_headers[0]} to {date_headers[-1]}")
+        else:
+            logger.info("📅 Date range: Unable to determine")
+
     async def get_available_dates(self, page: Page) -> List[Slot]:
-        """Extract available dates from the current page."""
+        """Extract available dates from the current page (mode: CALENDAR_EXTRACTION_MODE)."""
+        mode = CALENDAR_EXTRACTION_MODE
+        dom_calls = [0]
+        token = _extraction_dom_calls.set(dom_calls)
+        start = time.perf_counter()
+        try:
+            if mode == "evaluate":
+                available_slots = await self._get_available_dates_evaluate(page)
+            elif mode == "html":
+                available_slots = await self._get_available_dates_html(page)
+            else:
+                available_slots = await self._get_available_dates_dom(page)
+        finally:
+            _extraction_dom_calls.reset(token)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.last_extraction_stats = {
+            'mode': mode,
+            'dom_calls': dom_calls[0],
+            'elapsed_ms': elapsed_ms,
+        }
+        logger.info(
+            f"📐 Extraction ({mode}): {dom_calls[0]} DOM call(s) in {elapsed_ms:.1f} ms"
+        )
+        return available_slots
+
+    async def _get_available_dates_evaluate(self, page: Page) -> List[Slot]:
+        """One in-page script returns the whole cell matrix; parsing runs in Python."""
+        try:
+            rows = await self._dom_call(page.evaluate(CALENDAR_MATRIX_JS))
+            available_slots, date_headers = self._slots_for_period(rows or [])
+            self._log_date_range(date_headers)
+            return available_slots
+        except Exception as e:
+            logger.error(f"Error extracting available dates: {e}")
+            return []
+
+    async def _get_available_dates_html(self, page: Page) -> List[Slot]:
+        """One page.content() snapshot, parsed by CalendarParser off the event loop."""
+        try:
+            html = await self._dom_call(page.content())
+            rows = await self.calendar_parser.matrix_async(html)
+            available_slots, date_headers = self._slots_for_period(rows)
+            self._log_date_range(date_headers)
+            return available_slots
+        except Exception as e:
+            logger.error(f"Error extracting available dates: {e}")
+            return []
+
+    async def _get_available_dates_dom(self, page: Page) -> List[Slot]:
+        """Legacy per-cell DOM walk (one CDP round trip per element/attribute)."""
         available_slots = []
 
         try:
-            rows = await page.query_selector_all('tr')
+            rows = await self._dom_call(page.query_selector_all('tr'))
             date_headers = await self._collect_date_headers(rows)
-
-            if date_headers:
-                logger.info(f"📅 Checking dates: {date_headers[0]} to {date_headers[-1]}")
-            else:
-                logger.info("📅 Date range: Unable to determine")
+            self._log_date_range(date_headers)
 
             current_facility = None
             for row in rows:
-                row_cells = await row.query_selector_all('th, td')
+                row_cells = await self._dom_call(row.query_selector_all('th, td'))
                 if len(row_cells) < 2:
                     continue
 
-                first_text = await row_cells[0].text_content() or ""
-                second_text = await row_cells[1].text_content() or ""
+                first_text = await self._dom_call(row_cells[0].text_content()) or ""
+                second_text = await self._dom_call(row_cells[1].text_content()) or ""
                 resolved = self._resolve_calendar_row(
                     first_text, second_text, current_facility, self.target_facilities
                 )
@@ -233,100 +752,169 @@ class ReservationChecker:
                     date_text = await self._date_for_slot_cell(cell, i, date_headers)
 
                     # Check for available slot
-                    svg = await cell.query_selector('svg')
+                    svg = await self._dom_call(cell.query_selector('svg'))
                     if svg:
-                        aria_label = await svg.get_attribute('aria-label')
-                        if aria_label == "予約可能":
-                            available_slots.append(
-                                Slot(
-                                    date=date_text,
-                                    facility=target_facility,
-                                    applicant_type=applicant_type,
-                                )
-                            )
-                            logger.info(f"✅ Found available slot: {date_text} - {target_facility} - {applicant_type}")
-                        elif aria_label == "空き無":
-                            logger.debug(f"❌ No availability: {date_text} - {applicant_type}")
-                        elif aria_label == "時間外":
-                            logger.debug(f"⏰ Outside hours: {date_text} - {applicant_type}")
+                        aria_label = await self._dom_call(svg.get_attribute('aria-label'))
+                        self._record_cell(
+                            available_slots, aria_label, date_text, target_facility, applicant_type
+                        )
 
         except Exception as e:
             logger.error(f"Error extracting available dates: {e}")
 
         return available_slots
 
-    async def _check_periods(self, page: Page, navigation_type: str, max_periods: int = 20) -> List[Dict]:
-        """Core method to check all available periods for reservations."""
-        all_available_slots = []
-        period_count = 0
-
-        while period_count < max_periods:
-            period_count += 1
-            logger.info(f"🔄 Checking {navigation_type} {period_count}")
+    async def _period_state(self, page: Page, navigation_type: str) -> Dict:
+        """PERIOD_STATE_JS for the current page: {'end', 'next', 'lastDate'} in one round trip."""
+        label = NEXT_MONTH_BUTTON if navigation_type == "month" else NEXT_WEEK_BUTTON
+        try:
+            return await page.evaluate(PERIOD_STATE_JS, label)
+        except Exception as e:
+            logger.warning(f"Error probing {navigation_type} state: {e}")
+            return {'end': False, 'next': 'missing', 'lastDate': None}
 
-            # Wait for page to load
-            await self.wait_for_page_load(page)
+    async def _check_periods(
+        self, page: Page, navigation_type: str, max_periods: Optional[int] = None, slice_index: int = 0
+    ) -> List[Dict]:
+        """Core method to check all available periods for reservations.
 
-            # Check if we've reached the end of available dates
-            if await self.is_end_of_available_dates(page):
-                logger.info("🏁 Detected end of available dates")
-                break
+        max_periods=None walks a whole calendar from its first period: the limit comes from
+        the learned horizon and is extended while the calendar keeps going, and a walk that
+        reaches the calendar's end is recorded in self.horizon.
+        """
+        all_available_slots = []
+        period_count = 0
+        scanned = 0
+        dom_calls_total = 0
+        extraction_ms_total = 0.0
+        ready_times: List[float] = []
+        transition_started = time.perf_counter()
+        fixed_wait_ms = DYNAMIC_CONTENT_WAIT
+        full_walk = max_periods is None
+        limit = self.horizon.limit(navigation_type) if full_walk else max_periods
+        reached_end = False
+        last_date = None
+        # How the last click ended (see _advance_period), and the period it left behind
+        transition_seen: Optional[bool] = True
+        previous_fingerprint = None
+        button_label = NEXT_MONTH_BUTTON if navigation_type == "month" else NEXT_WEEK_BUTTON
 
-            # Get available slots from current page
-            current_slots = await self.get_available_dates(page)
-            all_available_slots.extend(current_slots)
+        try:
+            while period_count < limit:
+                period_count += 1
+                logger.info(f"🔄 Checking {navigation_type} {period_count}")
 
-            # Log summary for this period
-            if current_slots:
-                logger.info(f"🎯 {navigation_type.capitalize()} {period_count}: Found {len(current_slots)} available slots")
-            else:
-                logger.info(f"📭 {navigation_type.capitalize()} {period_count}: No available slots found")
+                # Wait for page to load (the first load of a walk may sit in the waiting room)
+                await self._phase(
+                    "waiting_room" if period_count == 1 else "period", self.wait_for_page_load(page)
+                )
+                ready_ms = (time.perf_counter() - transition_started) * 1000
+                ready_times.append(ready_ms)
+                logger.info(
+                    f"⏱️ {navigation_type.capitalize()} {period_count} ready in {ready_ms:.0f} ms "
+                    f"(fixed waits: {fixed_wait_ms} ms, mode: {READINESS_MODE})"
+                )
 
-            # Check for navigation button
-            try:
-                if navigation_type == "month":
-                    # Use "1か月後" (1 month later) button
-                    next_button = await page.query_selector('input[value="1か月後＞"]')
+                # End-of-dates indicators, next button and last header date in one call,
+                # then the period's slots — together under the per-period budget
+                async def scan_period(last_date=last_date, period=period_count):
+                    state = await self._period_state(page, navigation_type)
+                    if state['end'] or (last_date is not None and state['lastDate'] == last_date):
+                        return state, [], {}
+                    slots = await self.get_available_dates(page)
+                    # Read before the next await: another slice may extract meanwhile
+                    extraction = self.last_extraction_stats
+                    await self._capture_period(page, navigation_type, slice_index, period)
+                    return state, slots, extraction
+
+                state, current_slots, extraction = await self._phase("period", scan_period())
+                if transition_seen is not True and last_date is not None and state['lastDate'] == last_date:
+                    # No new dates seen yet: the old table may still be up, so wait once more and rescan
+                    logger.info(f"⏳ {navigation_type.capitalize()} {period_count} still shows the previous dates; waiting again")
+                    await self._phase("navigation", self._wait_for_calendar_ready(
+                        page, ceiling_ms=PAGE_TRANSITION_WAIT, previous=previous_fingerprint
+                    ))
+                    state, current_slots, extraction = await self._phase("period", scan_period())
+                if state['end']:
+                    logger.info("🏁 Detected end of available dates")
+                    reached_end = True
+                    period_count -= 1
+                    break
+                if last_date is not None and state['lastDate'] == last_date:
+                    if transition_seen is not None:
+                        # The click went through and, even after waiting again, changed nothing
+                        logger.info("🏁 Dates unchanged — reached end of available dates")
+                        reached_end = True
+                    else:
+                        # Not the end: the transition failed, so the walk is cut short
+                        logger.warning(
+                            f"⚠️ Next {navigation_type} did not load (dates still end {last_date}); "
+                            f"stopping after {period_count - 1} {navigation_type}(s)"
+                        )
+                    period_count -= 1
+                    break
+                last_date = state['lastDate'] or last_date
+                self._periods_scanned += 1
+                scanned += 1
+                all_available_slots.extend(current_slots)
+                self._emit_period(navigation_type, slice_index, period_count, current_slots, last_date)
+                dom_calls_total += extraction.get('dom_calls', 0)
+                extraction_ms_total += extraction.get('elapsed_ms', 0.0)
+
+                # Log summary for this period
+                if current_slots:
+                    logger.info(f"🎯 {navigation_type.capitalize()} {period_count}: Found {len(current_slots)} available slots")
                 else:
-                    # Use "2週後" (2 weeks later) button
-                    next_button = await page.query_selector('input[value="2週後＞"]')
+                    logger.info(f"📭 {navigation_type.capitalize()} {period_count}: No available slots found")
 
-                if not next_button:
-                    logger.info(f"Next {navigation_type} button not found - reached end of available dates")
+                if state['next'] != 'enabled':
+                    logger.info(f"Next {navigation_type} button {state['next']} - reached end of available dates")
+                    reached_end = True
                     break
 
-                # Check if button is disabled or has no-click attribute
-                is_disabled = await next_button.get_attribute('disabled')
-                is_clickable = await next_button.is_enabled()
-                aria_label = await next_button.get_attribute('aria-label')
-
-                # Log button status for debugging
-                logger.info(f"🔘 Next {navigation_type} button status - disabled: {is_disabled}, enabled: {is_clickable}, aria-label: {aria_label}")
+                if period_count == limit and full_walk and limit < PERIOD_MAX_LIMIT:
+                    limit = self.horizon.extend(limit)
+                    logger.info(
+                        f"📏 Calendar continues past the expected horizon; allowing up to {limit} {navigation_type}s"
+                    )
 
-                # If button is disabled or not clickable, we've reached the end
-                if is_disabled or not is_clickable:
-                    logger.info(f"Next {navigation_type} button is disabled/not clickable - reached end of available dates")
+                if period_count >= limit:
                     break
 
-                # Try to click the button
-                await next_button.click()
-                logger.info(f"✅ Successfully clicked next {navigation_type} button")
-
-                # Wait for page transition with better error handling
+                # Click through to the next period
+                transition_started = time.perf_counter()
+                fixed_wait_ms = PAGE_TRANSITION_WAIT + DYNAMIC_CONTENT_WAIT
                 try:
-                    await page.wait_for_timeout(PAGE_TRANSITION_WAIT)  # Configurable wait time
-                    # Additional check to ensure page loaded
-                    await page.wait_for_selector('table', timeout=TIMEOUT)
+                    previous_fingerprint = await self._calendar_fingerprint(page)
+                    transition_seen = await self._phase(
+                        "navigation",
+                        self._advance_period(page, navigation_type, button_label, previous=previous_fingerprint),
+                    )
+                except ScrapeDeadlineExceeded:
+                    raise
                 except Exception as e:
-                    logger.warning(f"Page transition timeout: {e}")
-                    # Continue anyway as the page might have loaded
+                    logger.info(f"Error with next {navigation_type} button or reached end: {e}")
+                    break
+        except ScrapeDeadlineExceeded as e:
+            self._stop_walk_at_deadline(e, navigation_type)
 
-            except Exception as e:
-                logger.info(f"Error with next {navigation_type} button or reached end: {e}")
-                break
+        if full_walk and reached_end:
+            self.horizon.record(navigation_type, period_count, last_date)
+        self._note_coverage(reached_end, last_date, slice_index, finished=scanned >= limit)
+        self._walk_stats[slice_index] = (ready_times, dom_calls_total, extraction_ms_total)
+        self.last_period_ready_ms = ready_times
 
         # Final summary
         logger.info(f"📊 SUMMARY: Checked {period_count} {navigation_type}s, found {len(all_available_slots)} total available slots")
+        if ready_times:
+            logger.info(
+                f"⏱️ Time to ready: {sum(ready_times):.0f} ms over "
+                f"{len(ready_times)} {navigation_type}(s)"
+            )
+        logger.info(
+            f"📐 Extraction total: {dom_calls_total} DOM call(s), {extraction_ms_total:.1f} ms "
+            f"({CALENDAR_EXTRACTION_MODE})"
+        )
 
         all_available_slots = list(dedupe_slots(all_available_slots))
 
@@ -343,52 +931,375 @@ class ReservationChecker:
         else:
             logger.info(f"😔 No available slots found in any {navigation_type}")
 
-        # Additional check: if we found no slots and reached max periods, log it
-        if period_count >= max_periods:
-            logger.warning(f"⚠️ Reached maximum {navigation_type} limit ({max_periods}). This might indicate an issue or no more dates available.")
+        if full_walk and not reached_end and period_count >= limit:
+            logger.warning(
+                f"⚠️ Reached maximum {navigation_type} limit ({limit}) with the calendar still going. "
+                f"Raise PERIOD_MAX_LIMIT if the site now offers more dates."
+            )
 
         return all_available_slots
 
+    async def _advance_period(
+        self, page: Page, navigation_type: str, button_label: str, previous: Optional[str] = None
+    ) -> Optional[bool]:
+        """Click the next-period button and wait until the calendar shows new dates.
+
+        previous is the fingerprint of the period being left (probed here when None). Returns
+        True once new dates were seen (always, after the fixed wait of READINESS_MODE "fixed");
+        False when the readiness wait ran out with the same dates still up (a slow load, or the
+        calendar's end); None when the transition failed and the page may show anything.
+        """
+        previous_fingerprint = previous if previous is not None else await self._calendar_fingerprint(page)
+        await page.click(f'input[value="{button_label}"]')
+        logger.info(f"✅ Successfully clicked next {navigation_type} button")
+
+        # Wait for page transition with better error handling
+        try:
+            # Returns once the header dates differ from the previous period;
+            # PAGE_TRANSITION_WAIT is only the ceiling.
+            changed = await self._wait_for_calendar_ready(
+                page, ceiling_ms=PAGE_TRANSITION_WAIT, previous=previous_fingerprint
+            )
+            # Additional check to ensure page loaded
+            await page.wait_for_selector('table', timeout=TIMEOUT)
+            return changed or READINESS_MODE != "event"
+        except Exception as e:
+            logger.warning(f"Page transition timeout: {e}")
+            # Continue anyway as the page might have loaded; the caller rescans before trusting it
+            return None
+
+    async def _hop_months(self, page: Page, hops: int) -> bool:
+        """Click "1か月後＞" hops times; False once the calendar end is reached."""
+        for hop in range(hops):
+            await self._phase("waiting_room" if hop == 0 else "navigation", self.wait_for_page_load(page))
+            button = await page.query_selector(f'input[value="{NEXT_MONTH_BUTTON}"]')
+            if not button or not await button.is_enabled():
+                return False
+            await self._phase("navigation", self._advance_period(page, "month", NEXT_MONTH_BUTTON))
+        return True
+
+    async def _check_slice(self, slice_index: int, hops: int, walk: int, navigation_type: str) -> List[Slot]:
+        """One slice of sliced navigation, on its own page/context."""
+        try:
+            async with AsyncExitStack() as stack:
+                page = await self._phase("launch", stack.enter_async_context(self._scrape_page()))
+                await self._open_calendar(page)
+                if hops and not await self._hop_months(page, hops):
+                    logger.info(f"🧩 Slice {slice_index + 1}: +{hops} month(s) is past the end of the calendar")
+                    self._note_coverage(True, None, slice_index)
+                    return []
+                slots = await self._check_periods(
+                    page, navigation_type, max_periods=walk, slice_index=slice_index
+                )
+                if slice_index == 0:
+                    await self._save_storage_state(page.context)
+                return slots
+        except ScrapeDeadlineExceeded as e:
+            # Out of time before this slice scanned anything; the other slices still count.
+            self._stop_walk_at_deadline(e, navigation_type)
+            return []
+
+    async def _check_periods_sliced(self, navigation_type: str, max_periods: Optional[int] = None) -> List[Slot]:
+        """Walk the horizon as parallel slices seeded by month hops; merge with dedupe_slots.
+
+        The horizon to cover defaults to the learned limit; slices walk fixed lengths, so they
+        neither extend it nor teach it (only sequential walks do).
+        """
+        max_periods = max_periods or self.horizon.limit(navigation_type)
+        plan = plan_period_slices(navigation_type, max_periods, PERIOD_SLICES, PERIOD_SLICE_MONTHS)
+        self._slices_planned = len(plan)
+        self._walk_stats = {}
+        logger.info(
+            f"🧩 Sliced {navigation_type} navigation: "
+            + ", ".join(f"+{hops}mo×{walk}" for hops, walk in plan)
+        )
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._check_slice(i, hops, walk, navigation_type) for i, (hops, walk) in enumerate(plan))
+        )
+        slots = list(dedupe_slots(slot for slice_slots in results for slot in slice_slots))
+        self._merge_walk_stats()
+        logger.info(
+            f"🧩 {len(plan)} slice(s) done in {time.perf_counter() - started:.1f}s, "
+            f"{len(slots)} unique slot(s)"
+        )
+        return slots
+
+    def _merge_walk_stats(self) -> None:
+        """After a sliced walk: ready times and extraction totals over all slices, in slice order."""
+        if not self._walk_stats:
+            return
+        walks = [self._walk_stats[k] for k in sorted(self._walk_stats)]
+        self.last_period_ready_ms = [ms for ready_times, _calls, _ms in walks for ms in ready_times]
+        self.last_extraction_stats = {
+            'mode': CALENDAR_EXTRACTION_MODE,
+            'dom_calls': sum(calls for _ready, calls, _ms in walks),
+            'elapsed_ms': sum(ms for _ready, _calls, ms in walks),
+        }
+
     async def check_all_weeks(self, page: Page) -> List[Dict]:
         """Check all available weeks for reservations."""
-        return await self._check_periods(page, "week", max_periods=20)
+        return await self._check_periods(page, "week")
 
     async def check_all_months(self, page: Page) -> List[Dict]:
         """Check all available months for reservations."""
-        return await self._check_periods(page, "month", max_periods=20)
+        return await self._check_periods(page, "month")
 
     async def is_end_of_available_dates(self, page: Page) -> bool:
         """Check if we've reached the end of available dates by examining page content."""
+        state = await self._period_state(page, "week")
+        if state['end']:
+            logger.info("Found end-of-dates indicator or empty calendar table")
+        return bool(state['end'])
+
+    async def _prepare_page(self, context) -> Page:
+        """Resource blocking + user agent on a fresh context; returns its first page."""
+        # Counts go to the scrape that leased this context, even if they land after it is recorded
+        resources = self._resources
+
+        async def block_resource(route, request):
+            blocked = request.resource_type in BLOCKED_RESOURCE_TYPES
+            self._account_request(request.resource_type, blocked=blocked, resources=resources)
+            if blocked:
+                await route.abort()
+            else:
+                await route.continue_()
+
+        async def count_bytes(request):
+            task = asyncio.current_task()
+            self._byte_counts_pending.add(task)
+            try:
+                sizes = await request.sizes()
+            except Exception:
+                return  # context closed before the sizes were read
+            finally:
+                self._byte_counts_pending.discard(task)
+            self._account_request(
+                request.resource_type,
+                num_bytes=sizes.get('responseBodySize', 0) + sizes.get('responseHeadersSize', 0),
+                resources=resources,
+            )
+
+        await context.route("**/*", block_resource)
+        context.on("requestfinished", count_bytes)
+        logger.info("✅ Resource blocking configured")
+
+        page = await context.new_page()
+        logger.info("✅ New page created")
+
+        # Set user agent to avoid detection
+        await page.set_extra_http_headers({
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        })
+        logger.info("✅ User agent set")
+        return page
+
+    def _load_storage_state(self) -> Optional[dict]:
+        """In-memory storage state, falling back to the per-source file once per process."""
+        if self._storage_state is None and not self._storage_state_loaded and self.storage_state_path:
+            self._storage_state_loaded = True
+            try:
+                with open(self.storage_state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if isinstance(state, dict):
+                    self._storage_state = state
+                    logger.info(f"🍪 Loaded saved session state for {self.source_name}")
+            except FileNotFoundError:
+                pass
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignoring unreadable session state {self.storage_state_path}: {e}")
+        return self._storage_state
+
+    async def _save_storage_state(self, context) -> None:
+        """Keep the context's cookies/localStorage in memory and atomically on disk."""
         try:
-            # Check for common "no more dates" indicators
-            no_dates_selectors = [
-                'text="予約可能な日付がありません"',
-                'text="No available dates"',
-                'text="利用可能な日付がありません"',
-                '.no-availability',
-                '.no-dates'
-            ]
-
-            for selector in no_dates_selectors:
+            state = await context.storage_state()
+        except Exception as e:
+            logger.warning(f"Could not read session state for {self.source_name}: {e}")
+            return
+        if not isinstance(state, dict):
+            return
+        self._storage_state = state
+        if not self.storage_state_path:
+            return
+
+        directory = os.path.dirname(os.path.abspath(self.storage_state_path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f'.{self.source_name}_', text=True)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(state, f)
+                os.replace(temp_path, self.storage_state_path)
+            except Exception:
                 try:
-                    element = await page.query_selector(selector)
-                    if element:
-                        logger.info(f"Found end-of-dates indicator: {selector}")
-                        return True
-                except:
-                    continue
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+                raise
+        except Exception as e:
+            logger.warning(f"Could not persist session state for {self.source_name}: {e}")
+
+    def invalidate_storage_state(self, reason: str) -> None:
+        """Drop saved cookies (waiting room / error page): next scrape starts clean."""
+        had_state = self._storage_state is not None
+        self._storage_state = None
+        self._storage_state_loaded = True
+        if self.storage_state_path:
+            try:
+                os.unlink(self.storage_state_path)
+                had_state = True
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove {self.storage_state_path}: {e}")
+        if had_state:
+            logger.info(f"🍪 Invalidated session state for {self.source_name} ({reason})")
+
+    def _account_request(
+        self, resource_type: str, blocked: bool = False, num_bytes: int = 0, resources: Optional[Dict] = None
+    ) -> None:
+        resources = self._resources if resources is None else resources
+        counts = resources.setdefault(resource_type, {'requests': 0, 'blocked': 0, 'bytes': 0})
+        if num_bytes:
+            counts['bytes'] += max(num_bytes, 0)
+        elif blocked:
+            counts['blocked'] += 1
+        else:
+            counts['requests'] += 1
 
-            # Check if the table is empty or has no facility rows
-            facility_rows = await page.query_selector_all('tr')
-            if len(facility_rows) <= 1:  # Only header row
-                logger.info("Table appears to be empty - reached end of dates")
-                return True
+    async def _settle_byte_counts(self) -> None:
+        """Let requestfinished handlers still reading sizes() finish while the page is open.
 
-            return False
+        Playwright reports response sizes asynchronously; without this the last responses
+        of a scrape would be missing from its byte count.
+        """
+        pending = self._byte_counts_pending - {asyncio.current_task()}
+        if pending:
+            await asyncio.wait(pending, timeout=BYTE_COUNT_SETTLE_SECONDS)
+
+    def _record_resources(self) -> None:
+        """Log this scrape's requests / bytes per resource type and the process memory."""
+        by_type, self._resources = self._resources, {}
+        if self.browser_pool is not None:
+            memory = self.browser_pool.sample_memory()
+        else:
+            sample = process_memory_mb()
+            memory = {'bot_mb': sample[0], 'browser_mb': sample[1] - sample[0], 'total_mb': sample[1]} if sample else {}
+        self.last_resources = {
+            'requests': sum(c['requests'] for c in by_type.values()),
+            'blocked': sum(c['blocked'] for c in by_type.values()),
+            'bytes': sum(c['bytes'] for c in by_type.values()),
+            'by_type': by_type,
+            'memory': memory,
+        }
+        logger.info(f"📦 Scrape resources ({self.source_name}): {self.resource_status_line()}")
+
+    def resource_status_line(self) -> str:
+        resources = self.last_resources
+        if not resources:
+            return "no scrapes yet"
+        heaviest = sorted(resources['by_type'].items(), key=lambda item: item[1]['bytes'], reverse=True)
+        types = ", ".join(
+            f"{resource_type} {counts['requests']}/{counts['bytes'] / 1024:.0f} KB"
+            for resource_type, counts in heaviest
+            if counts['requests']
+        )
+        line = (
+            f"{resources['requests']} request(s), {resources['blocked']} blocked, "
+            f"{resources['bytes'] / 1024:.0f} KB" + (f" ({types})" if types else "")
+        )
+        memory = resources['memory']
+        if memory:
+            line += f"; RSS bot {memory['bot_mb']:.0f} MB + browser {memory['browser_mb']:.0f} MB"
+        return line
+
+    def _record_session_metrics(self) -> None:
+        mode = 'reused' if self._scrape_reused_state else 'fresh'
+        stats = self.session_stats[mode]
+        stats['scrapes'] += 1
+        waited = self._waiting_room_ms / 1000
+        if self._waiting_room_ms:
+            stats['waiting_room_hits'] += 1
+            stats['waiting_room_seconds'] += waited
+        logger.info(
+            f"🍪 Session {mode} for {self.source_name}: waiting room "
+            f"{f'hit ({waited:.0f}s)' if self._waiting_room_ms else 'not hit'}; "
+            f"{mode} totals {stats['waiting_room_hits']}/{stats['scrapes']} hits, "
+            f"{stats['waiting_room_seconds']:.0f}s waited"
+        )
 
-        except Exception as e:
-            logger.warning(f"Error checking for end of dates: {e}")
-            return False
+    def session_status_line(self) -> str:
+        parts = []
+        for mode in ('reused', 'fresh'):
+            stats = self.session_stats[mode]
+            if not stats['scrapes']:
+                continue
+            avg = stats['waiting_room_seconds'] / stats['waiting_room_hits'] if stats['waiting_room_hits'] else 0
+            parts.append(
+                f"{mode} {stats['waiting_room_hits']}/{stats['scrapes']} waiting room (avg {avg:.0f}s)"
+            )
+        horizon = self.horizon.summary()
+        if horizon:
+            parts.append(f"horizon {horizon}")
+        return ", ".join(parts) or "no scrapes yet"
+
+    @asynccontextmanager
+    async def _scrape_page(self):
+        """Yield a ready page: leased from the shared BrowserPool, or a one-off Chromium."""
+        state = self._load_storage_state()
+        self._scrape_reused_state = state is not None
+        context_kwargs = {'storage_state': state} if state else {}
+
+        if self.browser_pool is not None:
+            async with self.browser_pool.context(**context_kwargs) as context:
+                logger.info(f"✅ Browser context leased from pool ({self.browser_pool.status_line()})")
+                try:
+                    yield await self._prepare_page(context)
+                finally:
+                    await self._settle_byte_counts()
+            return
+
+        async with async_playwright() as p:
+            logger.info("🔧 Launching browser...")
+            browser = await p.chromium.launch(headless=HEADLESS)
+            logger.info("✅ Browser launched successfully")
+            try:
+                context = await browser.new_context(**context_kwargs)
+                logger.info("✅ Browser context created")
+                try:
+                    yield await self._prepare_page(context)
+                finally:
+                    await self._settle_byte_counts()
+            finally:
+                await browser.close()
+
+    async def _open_calendar(self, page: Page) -> None:
+        """Navigate to the calendar URL (waiting room / readiness handled per period)."""
+        logger.info(f"🔍 Navigating to: {self.target_url}")
+        try:
+            start_time = time.time()
+            await self._phase("goto", page.goto(self.target_url, timeout=TIMEOUT))
+            nav_time = time.time() - start_time
+            logger.info(f"✅ Page navigation successful in {nav_time:.2f} seconds")
+
+            # Get page title and URL for debugging
+            title = await page.title()
+            current_url = page.url
+            logger.info(f"📄 Page title: {title}")
+            logger.info(f"🔗 Current URL: {current_url}")
+
+            # Check if we got redirected
+            if current_url != self.target_url:
+                logger.warning(f"⚠️ Redirected from {self.target_url} to {current_url}")
+            if isinstance(title, str) and ('エラー' in title or 'Error' in title):
+                self.invalidate_storage_state(f"error page: {title}")
+
+        except ScrapeDeadlineExceeded:
+            raise
+        except Exception as nav_error:
+            logger.error(f"❌ Navigation failed: {nav_error}")
+            raise
 
     async def run_check(self, send_notifications=False, use_month_navigation=False, show_all=False):
         """Main method to run the reservation check."""
@@ -401,120 +1312,116 @@ class ReservationChecker:
         logger.info(f"🔧 Environment: Python {platform.python_version()}, OS: {platform.system()}")
         logger.info(f"🔧 Headless mode: {HEADLESS}, Timeout: {TIMEOUT}ms")
 
+        self._waiting_room_ms = 0
+        self._resources = {}
+        self._begin_period_tracking()
+        self._begin_deadline()
+        self._begin_snapshots()
+        navigation_type = "month" if use_month_navigation else "week"
         try:
-            async with async_playwright() as p:
-                logger.info("🔧 Launching browser...")
-                browser = await p.chromium.launch(headless=HEADLESS)
-                logger.info("✅ Browser launched successfully")
-
-                context = await browser.new_context()
-                logger.info("✅ Browser context created")
-
-                async def block_resource(route, request):
-                    if request.resource_type in ["image", "stylesheet", "font"]:
-                        await route.abort()
+            if PERIOD_NAVIGATION == "sliced":
+                available_slots = await self._check_periods_sliced(navigation_type)
+            else:
+                async with AsyncExitStack() as stack:
+                    page = await self._phase("launch", stack.enter_async_context(self._scrape_page()))
+                    await self._open_calendar(page)
+                    if use_month_navigation:
+                        available_slots = await self.check_all_months(page)
                     else:
-                        await route.continue_()
-                await context.route("**/*", block_resource)
-                logger.info("✅ Resource blocking configured")
-
-                page = await context.new_page()
-                logger.info("✅ New page created")
-
-                # Set user agent to avoid detection
-                await page.set_extra_http_headers({
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                })
-                logger.info("✅ User agent set")
-
-                logger.info(f"🔍 Navigating to: {self.target_url}")
-                try:
-                    start_time = time.time()
-                    await page.goto(self.target_url, timeout=TIMEOUT)
-                    nav_time = time.time() - start_time
-                    logger.info(f"✅ Page navigation successful in {nav_time:.2f} seconds")
-
-                    # Get page title and URL for debugging
-                    title = await page.title()
-                    current_url = page.url
-                    logger.info(f"📄 Page title: {title}")
-                    logger.info(f"🔗 Current URL: {current_url}")
-
-                    # Check if we got redirected
-                    if current_url != self.target_url:
-                        logger.warning(f"⚠️ Redirected from {self.target_url} to {current_url}")
-
-                except Exception as nav_error:
-                    logger.error(f"❌ Navigation failed: {nav_error}")
-                    raise
-
-                if use_month_navigation:
-                    available_slots = await self.check_all_months(page)
-                else:
-                    available_slots = await self.check_all_weeks(page)
-                await browser.close()
-
-                if available_slots:
-                    check = CheckResult.from_slots(
-                        available_slots,
+                        available_slots = await self.check_all_weeks(page)
+                    await self._save_storage_state(page.context)
+            check = self._stamp_coverage(
+                await self._finish_check(available_slots, send_notifications, show_all)
+            )
+            self._record_session_metrics()
+            self.last_outcome = "ok"
+            return self._end_period_tracking(check)
+        except ScrapeDeadlineExceeded as e:
+            # Slow site, not a bad session: keep the storage state and the period baseline.
+            logger.warning(f"⏱️ {e}; no period was scanned")
+            self._period_cache_next = {}
+            self.last_outcome = "timeout"
+            self._record_session_metrics()
+            return self._error_result(e)
+        except MemoryRefused as e:
+            # Not the site's fault: keep the session state and the period baseline.
+            logger.warning(f"🐶 {e}")
+            self._period_cache_next = {}
+            self.last_outcome = "refused"
+            return self._error_result(e)
+        except Exception as e:
+            logger.error(f"Error during reservation check: {e}")
+            self._period_cache_next = {}
+            self.last_outcome = "error"
+            self.invalidate_storage_state("scrape error")
+            self._record_session_metrics()
+            return self._error_result(e)
+        finally:
+            self._record_resources()
+            await self._archive_snapshots()
+
+    async def _finish_check(self, available_slots, send_notifications=False, show_all=False) -> CheckResult:
+        """Scraped slots → CheckResult (slot-type filter, standalone notify guard)."""
+        if available_slots:
+            check = CheckResult.from_slots(
+                available_slots,
+                target_url=self.target_url,
+                facilities_label=tuple(self.target_facilities),
+            )
+            if not show_all and SHOW_ONLY_RELEVANT_APPLICANTS and self.target_slot_types:
+                filtered = filter_slots(check.slots, keep_types=self.target_slot_types)
+                if not filtered:
+                    return CheckResult.from_error(
+                        f"❌ No relevant slots found (only showing {', '.join(self.target_slot_types)})",
                         target_url=self.target_url,
                         facilities_label=tuple(self.target_facilities),
                     )
-                    if not show_all and SHOW_ONLY_RELEVANT_APPLICANTS and self.target_slot_types:
-                        filtered = filter_slots(check.slots, keep_types=self.target_slot_types)
-                        if not filtered:
-                            return CheckResult.from_error(
-                                f"❌ No relevant slots found (only showing {', '.join(self.target_slot_types)})",
-                                target_url=self.target_url,
-                                facilities_label=tuple(self.target_facilities),
-                            )
-                        logger.info(
-                            f"🔍 Filtered results: {len(check.slots)} total slots → {len(filtered)} relevant slots"
-                        )
-                        check = CheckResult.from_slots(
-                            filtered,
-                            target_url=self.target_url,
-                            facilities_label=tuple(self.target_facilities),
-                        )
-
-                    result_message = format_check_message(check)
-                    if send_notifications:
-                        if os.environ.get("ALLOW_STANDALONE_NOTIFY") == "1":
-                            logger.warning(
-                                "Sending via scraper send_telegram_message (bypasses run_bot filters). "
-                                "Use only for deliberate debugging."
-                            )
-                            await self.send_telegram_message(result_message)
-                        else:
-                            logger.warning(
-                                "send_notifications=True ignored. Run run_bot.py for production delivery, "
-                                "or set ALLOW_STANDALONE_NOTIFY=1 to force legacy broadcast."
-                            )
-                    return check
-
-                logger.info("No available slots found")
-                return CheckResult.no_slots(
+                logger.info(
+                    f"🔍 Filtered results: {len(check.slots)} total slots → {len(filtered)} relevant slots"
+                )
+                check = CheckResult.from_slots(
+                    filtered,
                     target_url=self.target_url,
                     facilities_label=tuple(self.target_facilities),
                 )
-        except Exception as e:
-            error_msg = str(e)
-            # Clean up error message to avoid HTML parsing issues
-            if "Host system is missing dependencies" in error_msg:
-                error_msg = "❌ Browser dependencies missing on server. Please contact administrator."
-            elif "Can't parse entities" in error_msg:
-                error_msg = "❌ Error processing response. Please try again."
-            else:
-                # Remove any HTML-like characters that might cause parsing issues
-                error_msg = error_msg.replace("<", "&lt;").replace(">", "&gt;")
-                error_msg = f"❌ Error during reservation check: {error_msg}"
 
-            logger.error(f"Error during reservation check: {e}")
-            return CheckResult.from_error(
-                error_msg,
-                target_url=self.target_url,
-                facilities_label=tuple(self.target_facilities),
-            )
+            result_message = format_check_message(check)
+            if send_notifications:
+                if os.environ.get("ALLOW_STANDALONE_NOTIFY") == "1":
+                    logger.warning(
+                        "Sending via scraper send_telegram_message (bypasses run_bot filters). "
+                        "Use only for deliberate debugging."
+                    )
+                    await self.send_telegram_message(result_message)
+                else:
+                    logger.warning(
+                        "send_notifications=True ignored. Run run_bot.py for production delivery, "
+                        "or set ALLOW_STANDALONE_NOTIFY=1 to force legacy broadcast."
+                    )
+            return check
+
+        logger.info("No available slots found")
+        return CheckResult.no_slots(
+            target_url=self.target_url,
+            facilities_label=tuple(self.target_facilities),
+        )
+
+    def _error_result(self, e: Exception) -> CheckResult:
+        error_msg = str(e)
+        # Clean up error message to avoid HTML parsing issues
+        if "Host system is missing dependencies" in error_msg:
+            error_msg = "❌ Browser dependencies missing on server. Please contact administrator."
+        elif "Can't parse entities" in error_msg:
+            error_msg = "❌ Error processing response. Please try again."
+        else:
+            # Remove any HTML-like characters that might cause parsing issues
+            error_msg = error_msg.replace("<", "&lt;").replace(">", "&gt;")
+            error_msg = f"❌ Error during reservation check: {error_msg}"
+        return CheckResult.from_error(
+            error_msg,
+            target_url=self.target_url,
+            facilities_label=tuple(self.target_facilities),
+        )
 
     async def process_available_slots(
         self,
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Replay scrape engine: recorded calendars through ReservationChecker's run_check() contract.
+
+A ``ReplayRecording`` is a time-ordered list of scrapes, each the period HTML one real
+scrape saw — loaded from the ``SnapshotArchive`` or built from fixture / hand-made HTML.
+``ReplayReservationChecker`` parses those periods exactly as the HTTP engine parses live
+responses (``CalendarParser`` matrix → ``_slots_for_period``), so fingerprints, coverage,
+slot-type filtering and the bot's cache / scheduler / notification pipeline all behave as
+they would live, without touching the sites.
+
+With ``speed=None`` every ``run_check()`` serves the next recorded scrape. With a speed
+factor, recorded time advances ``speed`` × faster than wall time from the first
+``run_check()``, and each call serves the latest scrape recorded at or before that point.
+"""
+
+import bisect
+import logging
+import time
+from typing import Callable, Optional, Sequence, Tuple
+
+from domain import dedupe_slots
+from reservation_checker_playwright import ReservationChecker
+from snapshot_archive import SnapshotArchive
+
+# Import all template values as defaults
+from config_template import *
+
+# Try to override with config values if they exist
+try:
+    import config
+    # Override template values with config values (if they exist)
+    for var in dir(config):
+        if not var.startswith('_') and var.isupper():
+            globals()[var] = getattr(config, var)
+except ImportError:
+    pass  # Use template values only
+
+logger = logging.getLogger('reservation_checker_replay')
+
+
+class ReplayScrape:
+    """One recorded scrape: its periods' HTML in walk order, plus how it ended.
+
+    calendar_complete is the recorded result's: whether that walk reached the calendar's end
+    (a walk stopped by its period limit did not).
+    """
+
+    __slots__ = ("scrape_id", "time", "periods", "outcome", "partial", "calendar_complete")
+
+    def __init__(
+        self,
+        scrape_id: str,
+        time: float,
+        periods: Sequence[Tuple[dict, str]],
+        outcome: str = "ok",
+        partial: bool = False,
+        calendar_complete: bool = False,
+    ):
+        self.scrape_id = scrape_id
+        self.time = time
+        self.periods = list(periods)
+        self.outcome = outcome or "ok"
+        self.partial = partial
+        self.calendar_complete = calendar_complete
+
+
+class ReplayRecording:
+    """Time-ordered scrapes of one source."""
+
+    def __init__(self, scrapes: Sequence[ReplayScrape]):
+        self.scrapes = sorted(scrapes, key=lambda scrape: scrape.time)
+        self._times = [scrape.time for scrape in self.scrapes]
+
+    def __len__(self) -> int:
+        return len(self.scrapes)
+
+    @property
+    def duration(self) -> float:
+        return self._times[-1] - self._times[0] if self.scrapes else 0.0
+
+    @classmethod
+    def from_archive(cls, archive: SnapshotArchive, source: str) -> "ReplayRecording":
+        scrapes = []
+        for record in archive.scrapes(source):
+            periods = archive.load_record(source, record)
+            periods.sort(key=lambda item: (item[0].get("slice", 0), item[0].get("period", 0)))
+            scrapes.append(ReplayScrape(
+                record["scrape_id"],
+                record["time"],
+                periods,
+                outcome=record.get("outcome"),
+                partial=record.get("partial", False),
+                calendar_complete=record.get("calendar_complete", False),
+            ))
+        logger.info(f"📼 Loaded {len(scrapes)} archived scrape(s) for {source}")
+        return cls(scrapes)
+
+    @classmethod
+    def from_html(
+        cls, scrapes: Sequence[Sequence[str]], interval: float = CHECK_INTERVAL, calendar_complete: bool = True
+    ) -> "ReplayRecording":
+        """Scrapes given as lists of period HTML (tables or whole pages), `interval` seconds apart.
+
+        calendar_complete: whether each list is the whole calendar, to its end.
+        """
+        return cls([
+            ReplayScrape(
+                f"html-{n}",
+                n * interval,
+                [({"navigation": "week", "slice": 0, "period": i + 1}, html) for i, html in enumerate(periods)],
+                calendar_complete=calendar_complete,
+            )
+            for n, periods in enumerate(scrapes)
+        ])
+
+    def at(self, offset: float) -> Optional[ReplayScrape]:
+        """Latest scrape recorded at or before `offset` seconds into the recording."""
+        if not self.scrapes:
+            return None
+        index = bisect.bisect_right(self._times, self._times[0] + offset) - 1
+        return self.scrapes[max(index, 0)]
+
+
+class ReplayReservationChecker(ReservationChecker):
+    """Same constructor and run_check() → CheckResult as ReservationChecker, no network."""
+
+    engine_name = "replay"
+
+    def __init__(
+        self,
+        target_url=None,
+        target_facilities=None,
+        target_slot_types=None,
+        source_name="tokyo",
+        recording: Optional[ReplayRecording] = None,
+        speed: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(
+            target_url=target_url,
+            target_facilities=target_facilities,
+            target_slot_types=target_slot_types,
+            source_name=source_name,
+        )
+        self.storage_state_path = None
+        self.recording = recording or ReplayRecording([])
+        self.speed = speed
+        self._clock = clock
+        self._started: Optional[float] = None
+        self.position = 0
+        self.scrapes_served = 0
+        self.last_replayed: Optional[ReplayScrape] = None
+
+    def invalidate_storage_state(self, reason: str) -> None:
+        """Nothing to drop: a replay has no site session."""
+
+    def resource_status_line(self) -> str:
+        if self.last_replayed is None:
+            return "no replays yet"
+        return (
+            f"replayed {self.last_replayed.scrape_id} "
+            f"({self.scrapes_served}/{len(self.recording)} served)"
+        )
+
+    @property
+    def exhausted(self) -> bool:
+        """In-order replay has served every scrape (time-compressed replays hold the last)."""
+        return self.speed is None and self.position >= len(self.recording)
+
+    def _next_scrape(self) -> Optional[ReplayScrape]:
+        if self.speed is None:
+            if self.exhausted:
+                return None
+            scrape = self.recording.scrapes[self.position]
+            self.position += 1
+            return scrape
+        now = self._clock()
+        if self._started is None:
+            self._started = now
+        return self.recording.at((now - self._started) * self.speed)
+
+    async def run_check(self, send_notifications=False, use_month_navigation=False, show_all=False):
+        """Serve the next recorded scrape; same contract (and CheckResult) as run_check live.
+
+        The recorded walk is served as-is whichever navigation is asked for: the recording
+        already fixes which periods were seen.
+        """
+        self._begin_period_tracking()
+        self._begin_deadline()
+        scrape = self._next_scrape()
+        if scrape is None:
+            self.last_outcome = "exhausted"
+            return self._error_result(Exception(f"Replay of {self.source_name} exhausted"))
+
+        self.last_replayed = scrape
+        self.scrapes_served += 1
+        if scrape.outcome != "ok":
+            self.last_outcome = scrape.outcome
+            return self._error_result(Exception(f"Recorded {scrape.outcome} scrape {scrape.scrape_id}"))
+
+        slots = []
+        last_date = None
+        navigation_type = "month" if use_month_navigation else "week"
+        for _meta, html in scrape.periods:
+            rows = await self.calendar_parser.matrix_async(html)
+            period_slots, date_headers = self._slots_for_period(rows)
+            if not date_headers:
+                continue
+            self._periods_scanned += 1
+            last_date = date_headers[-1]
+            slots.extend(period_slots)
+            self._emit_period(navigation_type, 0, self._periods_scanned, period_slots, last_date)
+        if not self._periods_scanned:
+            self._period_cache_next = {}
+            self.last_outcome = "timeout" if scrape.partial else "anomaly"
+            return self._error_result(Exception(f"No calendar in recorded scrape {scrape.scrape_id}"))
+        if scrape.partial:
+            self._partial_phase = "replay"
+        self._note_coverage(scrape.calendar_complete and not scrape.partial, last_date)
+
+        check = self._stamp_coverage(
+            await self._finish_check(list(dedupe_slots(slots)), send_notifications, show_all)
+        )
+        self.last_outcome = "ok"
+        return self._end_period_tracking(check)
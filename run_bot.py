@@ -5,6 +5,7 @@ Samezu Bot - Telegram bot for checking driving test reservations
 """
 
 import asyncio
+import html
 import json
 import logging
 import os
@@ -12,7 +13,7 @@ import signal
 import sys
 import tempfile
 import time
-from collections import defaultdict
+from dataclasses import replace
 from datetime import datetime
 from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes
@@ -34,69 +35,127 @@ except ImportError:
 
 configure_logging()
 
-from domain import CheckResult, format_check_message, scheduler_notify_signature
-from reservation_checker_playwright import ReservationChecker
+from adaptive_polling import PollingPlanner, ReleaseHistory
+from browser_pool import BrowserPool
+from circuit_breaker import HALF_OPEN, LOCAL_OUTCOMES, CircuitBreaker
+from delivery_queue import ALERT, PROGRESS, REPLY, DeliveryQueue
+from domain import (
+    CheckResult,
+    dedupe_slots,
+    filter_slots,
+    format_check_message,
+    scheduler_notify_signature,
+    slot_key,
+)
+from engine_router import EngineRouter
+from reservation_checker_http import HttpClientPool, HttpReservationChecker
+from reservation_checker_playwright import PeriodStream, ReservationChecker
+from reservation_checker_replay import ReplayRecording, ReplayReservationChecker
+from scheduling import build_schedules
+from scrape_broker import ScrapeBroker, ScrapeRequest
+from snapshot_archive import SnapshotArchive
+from sources import SOURCES
 
 logger = logging.getLogger(BOT_LOGGER_NAME)
 
+def _source_alias(kind, key):
+    """Attribute that reads/writes one source's entry of self.checkers / self.caches."""
+    return property(
+        lambda self: getattr(self, kind)[key],
+        lambda self, value: getattr(self, kind).__setitem__(key, value),
+    )
+
+
 class SamezuBot:
     SUBSCRIBERS_FILE = 'subscribers.txt'
     LAST_NOTIFIED_FILE = 'last_notified.json'
-    TOKYO_SUBSCRIBER_SOURCES = frozenset({"samezu", "fuchu"})
-    SOURCE_FACILITY_MAP = {"samezu": "鮫洲試験場", "fuchu": "府中試験場"}
+
+    # Built-in sources by their historical attribute names
+    reservation_checker = _source_alias("checkers", "tokyo")
+    kanagawa_checker = _source_alias("checkers", "kanagawa")
+    saitama_checker = _source_alias("checkers", "saitama")
+    cache = _source_alias("caches", "tokyo")
+    kanagawa_cache = _source_alias("caches", "kanagawa")
+    saitama_cache = _source_alias("caches", "saitama")
 
     def __init__(self):
         """Initialize the bot with configuration and state management."""
         self.application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
 
-        # scrape_key -> {(user_id, chat_id, check_source, show_all, use_month_navigation, force_check), ...}
-        self.waiting_users = defaultdict(set)
-        self.check_lock = asyncio.Lock()
-        self._check_schedule_lock = asyncio.Lock()
-        self._scrape_task_scheduled = False
+        # Outbound alerts, /check answers and progress edits, paced for Telegram's limits
+        self.delivery_queue = DeliveryQueue(
+            rate=TELEGRAM_SEND_RATE,
+            burst=TELEGRAM_SEND_BURST,
+            chat_interval=TELEGRAM_CHAT_INTERVAL,
+            max_attempts=TELEGRAM_SEND_ATTEMPTS,
+            base_backoff=TELEGRAM_RETRY_BACKOFF,
+            max_backoff=TELEGRAM_RETRY_MAX_BACKOFF,
+        )
+        # /check requests the cache cannot answer, as shared single-flight scrapes
+        self.scrape_broker = ScrapeBroker(max_waiters=CHECK_MAX_WAITERS)
+        # One lock per scrape key, so a slow or waiting-room-bound source never blocks the others
+        self.scrape_locks = {key: asyncio.Lock() for key in SOURCES.keys()}
+        # Global cap on simultaneous scrapes (each one is a Chromium context)
+        self._scrape_slots = asyncio.Semaphore(MAX_CONCURRENT_SCRAPES)
         self.scheduler_task = None  # Background scheduler task
+        self.schedules = {}  # scrape_key -> SourceSchedule, built when the scheduler starts
+        # Per-source circuit breaker: a failing site is backed off instead of re-scraped
+        self.breakers = {key: self._build_breaker(key) for key in SOURCES.keys()}
 
         # Per-source scrape cache (CheckResult + metadata)
-        self.cache = {
-            'result': None,  # CheckResult
-            'timestamp': None,
-            'cache_duration': CACHE_DURATION,
+        self.caches = {
+            key: {
+                'result': None,  # CheckResult
+                'timestamp': None,
+                'cache_duration': CACHE_DURATION,
+            }
+            for key in SOURCES.keys()
         }
 
-        # Initialize reservation checkers
-        self.reservation_checker = ReservationChecker(
-            target_url=TARGET_URL,
-            target_facilities=TARGET_FACILITIES,
-            target_slot_types=TARGET_SLOT_TYPES,
-            source_name="tokyo",
-        )
-        self.kanagawa_checker = ReservationChecker(
-            target_url=KANAGAWA_TARGET_URL,
-            target_facilities=KANAGAWA_TARGET_FACILITIES,
-            target_slot_types=KANAGAWA_TARGET_SLOT_TYPES,
-            source_name="kanagawa",
-        )
-        self.saitama_checker = ReservationChecker(
-            target_url=SAITAMA_TARGET_URL,
-            target_facilities=SAITAMA_TARGET_FACILITIES,
-            target_slot_types=SAITAMA_TARGET_SLOT_TYPES,
-            source_name="saitama",
-        )
+        # One Chromium for the whole process; each scrape leases a fresh context
+        self.browser_pool = None
+        if BROWSER_POOL_ENABLED:
+            self.browser_pool = BrowserPool(
+                headless=HEADLESS,
+                max_scrapes=BROWSER_POOL_MAX_SCRAPES,
+                max_rss_mb=BROWSER_POOL_MAX_RSS_MB,
+                refuse_rss_mb=BROWSER_POOL_REFUSE_RSS_MB,
+            )
 
-        # Per-source caches
-        self.kanagawa_cache = {
-            'result': None,
-            'timestamp': None,
-            'cache_duration': CACHE_DURATION
-        }
-        self.saitama_cache = {
-            'result': None,
-            'timestamp': None,
-            'cache_duration': CACHE_DURATION
+        # Scrape engine per source (http / playwright / auto); HTTP clients keep-alive per host
+        self.snapshot_archive = None
+        if SNAPSHOT_ARCHIVE_DIR:
+            self.snapshot_archive = SnapshotArchive(
+                SNAPSHOT_ARCHIVE_DIR,
+                max_bytes=SNAPSHOT_ARCHIVE_MAX_MB * 1024 * 1024,
+                segments=SNAPSHOT_ARCHIVE_SEGMENTS,
+            )
+        self.http_pool = None
+        if any(spec.engine_mode in ("http", "auto") for spec in SOURCES):
+            self.http_pool = HttpClientPool(max_keepalive=HTTP_MAX_KEEPALIVE)
+
+        # Reservation checker per source (EngineRouter: same interface as ReservationChecker)
+        self.checkers = {
+            spec.key: self._build_checker(spec.engine_mode, **spec.checker_kwargs())
+            for spec in SOURCES
         }
 
         # Last scheduler-relevant slot signature per source (see scheduler_notify_signature)
         self.last_notified: dict = self._load_last_notified()
+        # Calendar fingerprint of the last scheduled scrape per source (CheckResult.fingerprint)
+        self.last_scheduled_fingerprint: dict = {}
+        # When new relevant slots appeared, per source; drives adaptive scheduled intervals
+        self.release_history = ReleaseHistory(RELEASE_HISTORY_FILE, retention_days=ADAPTIVE_HISTORY_DAYS)
+        self.polling_planner = None
+        if ADAPTIVE_POLLING:
+            self.polling_planner = PollingPlanner(
+                self.release_history,
+                bucket_minutes=ADAPTIVE_BUCKET_MINUTES,
+                half_life_days=ADAPTIVE_HALF_LIFE_DAYS,
+                min_interval=ADAPTIVE_MIN_INTERVAL,
+                max_interval=ADAPTIVE_MAX_INTERVAL,
+                min_releases=ADAPTIVE_MIN_RELEASES,
+            )
 
         # Register command handlers
         self.application.add_handler(CommandHandler("start", self.start_command))
@@ -109,6 +168,47 @@ class SamezuBot:
         self.application.add_handler(CommandHandler("cache", self.cache_command))
         self.application.add_handler(CommandHandler("status", self.status_command))
 
+    @staticmethod
+    def _build_breaker(source):
+        return CircuitBreaker(
+            source,
+            failure_threshold=BREAKER_FAILURE_THRESHOLD,
+            base_backoff=BREAKER_BASE_BACKOFF,
+            max_backoff=BREAKER_MAX_BACKOFF,
+            jitter=BREAKER_JITTER,
+        )
+
+    def _breaker(self, source):
+        if source not in self.breakers:
+            self.breakers[source] = self._build_breaker(source)
+        return self.breakers[source]
+
+    def _build_checker(self, mode, **checker_kwargs):
+        """EngineRouter over the engines `mode` needs for one source."""
+        engines = {}
+        if mode in ("http", "auto"):
+            engines["http"] = HttpReservationChecker(
+                http_pool=self.http_pool, snapshot_archive=self.snapshot_archive, **checker_kwargs
+            )
+        if mode in ("playwright", "auto"):
+            engines["playwright"] = ReservationChecker(
+                browser_pool=self.browser_pool, snapshot_archive=self.snapshot_archive, **checker_kwargs
+            )
+        if mode == "replay":
+            archive = SnapshotArchive(REPLAY_ARCHIVE_DIR, max_bytes=SNAPSHOT_ARCHIVE_MAX_MB * 1024 * 1024)
+            engines["replay"] = ReplayReservationChecker(
+                recording=ReplayRecording.from_archive(archive, checker_kwargs["source_name"]),
+                speed=REPLAY_SPEED,
+                **checker_kwargs,
+            )
+        return EngineRouter(
+            engines,
+            mode=mode,
+            alpha=ENGINE_SCORE_ALPHA,
+            min_success=ENGINE_MIN_SUCCESS,
+            probe_interval=ENGINE_PROBE_INTERVAL,
+        )
+
     # Subscriber management methods
     @staticmethod
     def _deserialize_signature(raw):
@@ -123,8 +223,8 @@ class SamezuBot:
         return [list(item) for item in signature]
 
     def _load_last_notified(self):
-        """Load persisted scheduler dedup signatures (tokyo/kanagawa/saitama)."""
-        defaults = {'tokyo': None, 'kanagawa': None, 'saitama': None}
+        """Load persisted scheduler dedup signatures (one per source)."""
+        defaults = {key: None for key in SOURCES.keys()}
         try:
             with open(self.LAST_NOTIFIED_FILE, 'r') as f:
                 data = json.load(f)
@@ -261,7 +361,7 @@ class SamezuBot:
           None / empty                      (legacy — all sources, relevant type)
         """
         if not user_info_raw:
-            return None, ["samezu", "fuchu", "kanagawa"], "relevant"
+            return None, list(SOURCES.default_subscription), "relevant"
 
         parts = user_info_raw.split('|')
         if len(parts) >= 3:
@@ -269,11 +369,11 @@ class SamezuBot:
             sources = [s.strip() for s in sources_str.split(',') if s.strip()]
         elif len(parts) == 2:
             username, sub_type = parts[0], parts[1]
-            sources = ["samezu", "fuchu", "kanagawa"]  # backward compat
+            sources = list(SOURCES.default_subscription)  # backward compat
         else:
             username = parts[0]
             sub_type = "relevant"
-            sources = ["samezu", "fuchu", "kanagawa"]
+            sources = list(SOURCES.default_subscription)
 
         return username, sources, sub_type
 
@@ -282,7 +382,7 @@ class SamezuBot:
         """Start the automatic checking scheduler"""
         if self.scheduler_task is None or self.scheduler_task.done():
             self.scheduler_task = asyncio.create_task(self._scheduler_loop())
-            logger.info(f"🔄 Automatic checking scheduler started (interval: {CHECK_INTERVAL} seconds)")
+            logger.info(f"🔄 Automatic checking scheduler started (default interval: {CHECK_INTERVAL} seconds)")
         else:
             logger.info("🔄 Scheduler is already running")
 
@@ -296,58 +396,161 @@ class SamezuBot:
                 pass
             logger.info("🛑 Automatic checking scheduler stopped")
 
+    async def close_browser_pool(self):
+        """Shut down the shared Chromium (after the scheduler has stopped)."""
+        if self.browser_pool is not None:
+            await self.browser_pool.close()
+            logger.info(f"🛑 Browser pool closed ({self.browser_pool.status_line()})")
+
+    async def close_http_pool(self):
+        """Close the HTTP engine's keep-alive clients (after the scheduler has stopped)."""
+        if self.http_pool is not None:
+            await self.http_pool.aclose()
+            logger.info(f"🛑 HTTP clients closed ({self.http_pool.status_line()})")
+
+    async def close_delivery_queue(self):
+        """Stop the outbound queue; whatever is still queued is dropped."""
+        dropped = self.delivery_queue.depth()
+        await self.delivery_queue.close()
+        if dropped:
+            logger.warning(f"🛑 Delivery queue closed with {dropped} message(s) unsent")
+
+    def scrape_in_progress(self, scrape_key=None):
+        """Whether a scrape holds the lock for scrape_key (or for any key when None)."""
+        if scrape_key is not None:
+            return self.scrape_locks[scrape_key].locked()
+        return any(lock.locked() for lock in self.scrape_locks.values())
+
     async def _run_scheduled_checks(self):
-        """Run Tokyo + Kanagawa + Saitama scheduled scrapes and update caches."""
+        """Run Tokyo + Kanagawa + Saitama scheduled scrapes concurrently and update caches."""
         logger.info("🔄 Running scheduled check...")
+        started = time.monotonic()
 
-        if self.check_lock.locked():
-            logger.info("⏭️ Skipping scheduled check — scrape already in progress")
+        results = await asyncio.gather(
+            *(self._run_scheduled_source(key) for key in SOURCES.keys()),
+            return_exceptions=True,
+        )
+        for scrape_key, result in zip(SOURCES.keys(), results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Scheduled check for {scrape_key} raised: {result}")
+
+        if self.browser_pool is not None:
+            await self.browser_pool.check_memory()
+            logger.info(f"🐶 Memory after scheduled check: {self.browser_pool.memory_line()}")
+        logger.info(f"✅ Scheduled check completed in {time.monotonic() - started:.1f}s")
+
+    async def _run_scheduled_source(self, scrape_key):
+        """Scheduled scrape for one key; skipped only if that key is already scraping."""
+        lock = self.scrape_locks[scrape_key]
+        if lock.locked():
+            logger.info(f"⏭️ Skipping scheduled {scrape_key} check — scrape already in progress")
             return
 
-        async with self.check_lock:
-            await self._run_scheduled_check(
-                checker=self.reservation_checker,
-                cache=self.cache,
-                source="tokyo",
-            )
-            await self._drain_waiting_queues_after_scrape("tokyo")
+        checker, cache = self._checker_and_cache_for_scrape_key(scrape_key)
+        async with lock:
+            async with self._scrape_slots:
+                await self._run_scheduled_check(checker=checker, cache=cache, source=scrape_key)
+
+    async def _run_scheduled_tick(self, schedule):
+        """One fixed-rate run of a source; waits for (rather than skips) a scrape already running."""
+        scrape_key = schedule.source
+        lock = self.scrape_locks[scrape_key]
+        if lock.locked():
+            schedule.deferred += 1
+            logger.info(f"⏳ Scheduled {scrape_key} check deferred until the running scrape finishes")
 
-            await self._run_scheduled_check(
-                checker=self.kanagawa_checker,
-                cache=self.kanagawa_cache,
-                source="kanagawa",
-            )
-            await self._drain_waiting_queues_after_scrape("kanagawa")
+        checker, cache = self._checker_and_cache_for_scrape_key(scrape_key)
+        async with lock:
+            async with self._scrape_slots:
+                lag = schedule.started()
+                if lag > SCHEDULE_LAG_WARNING:
+                    logger.warning(f"🐢 Scheduled {scrape_key} check started {lag:.1f}s late")
+                await self._run_scheduled_check(checker=checker, cache=cache, source=scrape_key)
+
+        if self.browser_pool is not None:
+            await self.browser_pool.check_memory()
+
+    async def _source_schedule_loop(self, schedule):
+        """Run one source at its schedule's due times until cancelled."""
+        while True:
+            await asyncio.sleep(schedule.delay())
+            try:
+                await self._run_scheduled_tick(schedule)
+            except Exception as e:
+                logger.error(f"❌ Error in scheduled check for {schedule.source}: {e}")
+            missed = schedule.finished()
+            if missed:
+                logger.warning(
+                    f"⏩ Scheduled {schedule.source} check overran {missed} tick(s); catching up now"
+                )
+            self._retune_schedule(schedule)
 
-            await self._run_scheduled_check(
-                checker=self.saitama_checker,
-                cache=self.saitama_cache,
-                source="saitama",
+    @staticmethod
+    def _scrape_budget_per_hour(schedule):
+        """Weekly mean: no more scrapes than the source's fixed interval, and never above the cap."""
+        fixed_rate = 3600 / schedule.base_interval
+        return min(fixed_rate, ADAPTIVE_SCRAPES_PER_HOUR) if ADAPTIVE_SCRAPES_PER_HOUR else fixed_rate
+
+    def _retune_schedule(self, schedule):
+        """Adaptive polling: next interval from the source's release profile for this time of week."""
+        if self.polling_planner is None:
+            return
+        interval = self.polling_planner.interval_for(
+            schedule.source, self._scrape_budget_per_hour(schedule), max_per_hour=ADAPTIVE_SCRAPES_PER_HOUR
+        )
+        if abs(interval - schedule.interval) >= 1:
+            logger.info(
+                f"📈 {schedule.source} scheduled interval {schedule.interval:.0f}s → {interval:.0f}s"
             )
-            await self._drain_waiting_queues_after_scrape("saitama")
-
-        await self._start_chained_scrapes_for_remaining_waiters()
-        logger.info("✅ Scheduled check completed")
+            schedule.retune(interval)
 
     async def _scheduler_loop(self):
-        """Background loop: scrape on start, then every CHECK_INTERVAL seconds."""
-        logger.info(f"⏰ Starting scheduler loop with {CHECK_INTERVAL} second intervals")
+        """Background loop: scrape every source on start, then each on its own fixed-rate schedule."""
+        started = time.monotonic()
+        self.schedules = build_schedules(
+            SOURCES,
+            default_interval=CHECK_INTERVAL,
+            default_jitter=SCHEDULE_JITTER,
+            stagger=SCHEDULE_STAGGER,
+            anchor=started,
+        )
+        for schedule in self.schedules.values():
+            schedule.start_after(started)
+            logger.info(f"⏰ Schedule for {schedule.source}: {schedule.status_line()}")
 
-        while True:
+        tasks = []
+        try:
             try:
                 await self._run_scheduled_checks()
-                await asyncio.sleep(CHECK_INTERVAL)
-            except asyncio.CancelledError:
-                logger.info("🛑 Scheduler loop cancelled")
-                break
             except Exception as e:
-                logger.error(f"❌ Error in scheduled check: {e}")
-                await asyncio.sleep(CHECK_INTERVAL)
+                logger.error(f"❌ Error in startup check: {e}")
+            tasks = [
+                asyncio.create_task(self._source_schedule_loop(schedule))
+                for schedule in self.schedules.values()
+            ]
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            logger.info("🛑 Scheduler loop cancelled")
+        finally:
+            for task in tasks:
+                task.cancel()
 
     async def _run_scheduled_check(self, checker, cache, source):
-        """Run one checker, update its cache, notify relevant subscribers."""
+        """Run one checker, update its cache, notify relevant subscribers.
+
+        With EARLY_ALERTS, subscribers are alerted as soon as a scanned period shows relevant
+        slots not in last_notified; the final signature then only alerts on what is left.
+        """
+        previous = set(self.last_notified[source] or ())
+        periods = PeriodStream(checker)
+        early = None
+        if EARLY_ALERTS:
+            early = asyncio.create_task(self._early_scheduled_alerts(checker, source, periods))
         try:
-            check = await checker.run_check(send_notifications=False, show_all=True)
+            with periods:
+                check = await self._run_check_through_breaker(
+                    source, checker, send_notifications=False, show_all=True
+                )
         except Exception as e:
             logger.error(f"❌ Scheduled check failed for {source}: {e}")
             check = CheckResult.from_error(
@@ -355,6 +558,13 @@ class SamezuBot:
                 target_url=checker.target_url,
                 facilities_label=tuple(checker.target_facilities),
             )
+        early_alerted = await early if early is not None else set()
+
+        if check is None:
+            logger.info(
+                f"⛔ Skipping scheduled {source} check — breaker {self._breaker(source).status_line()}"
+            )
+            return
 
         if check.is_error:
             logger.warning(
@@ -362,7 +572,21 @@ class SamezuBot:
             )
             return
 
+        if check.partial:
+            await self._notify_partial_scheduled_check(checker, check, source)
+            return
+
         self._update_cache_after_scrape(cache, check, use_month_navigation=False)
+        await self._answer_flights_covered_by(source, check, use_month_navigation=False)
+
+        if check.fingerprint is not None:
+            if check.fingerprint == self.last_scheduled_fingerprint.get(source):
+                logger.info(
+                    f"🔕 Calendar unchanged for {source} "
+                    f"({check.periods_changed} period(s) changed); skipping notification pass"
+                )
+                return
+            self.last_scheduled_fingerprint[source] = check.fingerprint
 
         signature = scheduler_notify_signature(
             check,
@@ -373,14 +597,180 @@ class SamezuBot:
             self._set_last_notified(source, None)  # Reset when slots actually disappear
             return
 
-        if signature == self.last_notified[source]:
+        if early_alerted and set(signature) <= previous | early_alerted:
+            logger.info(f"🔕 New slots for {source} were already alerted early; reconciling last_notified")
+            self._set_last_notified(source, signature)
+            return
+
+        if not early_alerted and signature == self.last_notified[source]:
             logger.info(f"🔕 Slots unchanged for {source}, skipping duplicate notification")
             return
 
+        self._record_release(source, signature)
+
         logger.info(f"🎉 New slots for {source}! Sending notifications...")
         self._set_last_notified(source, signature)
+        if early_alerted:
+            # The early alert already showed its slots: send only what the rest of the walk added
+            later = replace(check, slots=tuple(s for s in check.slots if slot_key(s) not in early_alerted))
+            await self._send_notifications_to_subscribers(
+                later, source=source, note="ℹ️ Slots from the early alert above are not repeated."
+            )
+            return
+        await self._send_notifications_to_subscribers(check, source=source)
+
+    async def _early_scheduled_alerts(self, checker, source, periods):
+        """Alert subscribers on the first period showing relevant slots not yet notified.
+
+        One early alert per scrape: the alerted slots go into last_notified at once, and the
+        final signature alerts only on what the rest of the walk adds. Returns the slot keys
+        alerted early.
+        """
+        slots = []
+        scanned = 0
+        alerted = set()
+        async for period in periods:
+            scanned += 1
+            if alerted or not period.slots:
+                continue
+            slots.extend(period.slots)
+            provisional = CheckResult.from_slots(
+                list(dedupe_slots(slots)),
+                target_url=checker.target_url,
+                facilities_label=tuple(checker.target_facilities),
+            )
+            signature = scheduler_notify_signature(
+                provisional,
+                default_slot_types=list(checker.target_slot_types),
+            )
+            known = set(self.last_notified[source] or ())
+            if signature is None or set(signature) <= known:
+                continue
+
+            self._record_release(source, signature)
+            logger.info(f"⚡ New slots for {source} in calendar period {scanned}! Alerting early...")
+            alerted |= set(signature) - known
+            self._set_last_notified(source, tuple(sorted(known | set(signature))))
+            try:
+                await self._send_notifications_to_subscribers(
+                    provisional,
+                    source=source,
+                    note=f"⚡ Early alert: found in the first {scanned} calendar period(s) "
+                         f"while the rest of the calendar is still being checked.",
+                )
+            except Exception as e:
+                logger.error(f"Failed to send early alerts for {source}: {e}")
+        return alerted
+
+    async def _run_check_through_breaker(self, source, checker, **run_kwargs):
+        """checker.run_check unless source's breaker is open (then None); feeds it the outcome."""
+        breaker = self._breaker(source)
+        if not breaker.allow():
+            return None
+        try:
+            check = await checker.run_check(**run_kwargs)
+        except Exception as e:
+            breaker.record_failure(type(e).__name__)
+            raise
+        except BaseException:
+            # Cancelled (shutdown, an outer deadline): no verdict, but free a half-open probe
+            breaker.record_inconclusive()
+            raise
+        outcome = getattr(checker, 'last_outcome', None)
+        if check.is_error and outcome in LOCAL_OUTCOMES:
+            logger.info(f"Circuit breaker for {source}: {outcome} scrape not counted")
+            breaker.record_inconclusive()
+        elif check.is_error:
+            breaker.record_failure(outcome if isinstance(outcome, str) else "error")
+            if breaker.is_open:
+                logger.warning(f"⛔ Circuit breaker for {source} {breaker.status_line()}")
+        else:
+            if breaker.failures:
+                logger.info(f"✅ Circuit breaker for {source} closed after {breaker.failures} failure(s)")
+            breaker.record_success()
+        return check
+
+    def _breaker_fallback_message(self, scrape_key, check_source, show_all):
+        """Reply while a source's breaker is open: last good cached result and its age."""
+        breaker = self._breaker(scrape_key)
+        checker, cache = self._checker_and_cache_for_scrape_key(scrape_key)
+        if breaker.state == HALF_OPEN:
+            retry = "retrying now"
+        else:
+            wait = breaker.retry_in()
+            retry = f"not checking again for {int(wait // 60)}m {int(wait % 60)}s"
+        header = (
+            f"⛔ <b>{html.escape(SOURCES[scrape_key].label)} site is failing</b> "
+            f"({html.escape(str(breaker.last_reason))}); {retry}."
+        )
+        if not self._cache_has_scrape(cache):
+            return f"{header}\n\nNo earlier result is cached."
+        elapsed = time.time() - cache['timestamp']
+        if show_all and SOURCES.facility_filter(check_source) is None:
+            result_to_show = format_check_message(cache['result'])
+        else:
+            result_to_show = self._format_check_for_user(cache['result'], checker, show_all, check_source)
+        return (
+            f"{header}\n\n📊 Last good result, from {int(elapsed // 60)}m {int(elapsed % 60)}s ago:\n\n"
+            f"{result_to_show}"
+        )
+
+    async def _answer_while_breaker_open(self, update, scrape_key, check_source, show_all):
+        """/check on a backed-off source (even with force): reply from the last good result."""
+        if not self._breaker(scrape_key).is_open:
+            return False
+        await update.message.reply_text(
+            self._breaker_fallback_message(scrape_key, check_source, show_all), parse_mode='HTML'
+        )
+        return True
+
+    async def _answer_flight_from_breaker(self, flight):
+        """Answer a flight of a backed-off source from the last good result."""
+        requests = self.scrape_broker.resolve(flight, None)
+        await asyncio.gather(
+            *(
+                self._reply_to_request(
+                    request,
+                    self._breaker_fallback_message(flight.source, request.check_source, request.show_all),
+                )
+                for request in requests
+            ),
+            return_exceptions=True,
+        )
+        logger.info(f"Sent last good result to {len(requests)} waiting users for {flight.source} (breaker open)")
+
+    async def _notify_partial_scheduled_check(self, checker, check, source):
+        """Deadline-truncated scheduled scrape: alert on slots not yet notified, touch nothing else.
+
+        The cache, the fingerprint baseline and a slot-free last_notified are left as they
+        were, since the unscanned periods may still hold the slots notified before.
+        """
+        logger.warning(
+            f"⏱️ Partial scheduled check for {source} ({check.periods_scanned} period(s) scanned); "
+            f"not caching result"
+        )
+        if not PARTIAL_RESULTS_NOTIFY:
+            return
+        signature = scheduler_notify_signature(
+            check,
+            default_slot_types=list(checker.target_slot_types),
+        )
+        previous = set(self.last_notified[source] or ())
+        if signature is None or set(signature) <= previous:
+            logger.info(f"🔕 No new slots in partial check for {source}")
+            return
+
+        self._record_release(source, signature)
+        logger.info(f"🎉 New slots for {source} (partial check)! Sending notifications...")
+        self._set_last_notified(source, tuple(sorted(previous | set(signature))))
         await self._send_notifications_to_subscribers(check, source=source)
 
+    def _record_release(self, source, signature):
+        """Log relevant slots not in last_notified as a release for adaptive polling."""
+        new_slots = set(signature) - set(self.last_notified[source] or ())
+        if new_slots:
+            self.release_history.record(source, len(new_slots))
+
     async def unsubscribe_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /unsubscribe command."""
         chat_id = update.effective_chat.id
@@ -403,9 +793,11 @@ class SamezuBot:
         """Handle /subscribe command.
 
         Usage: /subscribe [sources] [type]
-          sources: samezu, fuchu, kanagawa, saitama (space-separated; default = samezu+fuchu+kanagawa —
-                   saitama is opt-in only and never included by default)
-          type:    all, ari, nai, am, pm, 1, 2, 3, relevant (default = relevant)
+          sources: source aliases from sources.py — samezu, fuchu, kanagawa, saitama, plus any
+                   EXTRA_SOURCES (space-separated; default = every alias of a default_subscribe
+                   source, i.e. samezu+fuchu+kanagawa — saitama is opt-in only)
+          type:    all, relevant, or a source's type filter: ari, nai, am, pm, 1, 2, 3
+                   (default = relevant)
 
         Examples:
           /subscribe                    → samezu+fuchu+kanagawa, relevant type
@@ -428,34 +820,14 @@ class SamezuBot:
             username = f"User{chat_id}"
 
         # Parse args into sources and type
-        source_keywords = {"samezu", "fuchu", "kanagawa", "saitama"}
-        type_keywords = {
-            "all", "relevant", "nai", "ari", "am", "pm", "1", "2", "3",
-            "すべて", "全て", "ない方", "ある方",
-        }
-
         args_lower = [a.lower() for a in (context.args or [])]
-        sources = [a for a in args_lower if a in source_keywords]
-        type_args = [a for a in args_lower if a in type_keywords]
+        sources = [a for a in args_lower if a in SOURCES.by_alias]
+        type_args = [SOURCES.type_keywords[a] for a in args_lower if a in SOURCES.type_keywords]
 
         if not sources:
-            sources = ["samezu", "fuchu", "kanagawa"]  # saitama is opt-in only, never a default
-
-        subscription_type = "relevant"
-        if type_args:
-            arg = type_args[0]
-            if arg in ["all", "すべて", "全て"]:
-                subscription_type = "all"
-            elif arg in ["nai", "ない方"]:
-                subscription_type = "nai"
-            elif arg in ["ari", "ある方"]:
-                subscription_type = "ari"
-            elif arg == "am":
-                subscription_type = "am"
-            elif arg == "pm":
-                subscription_type = "pm"
-            elif arg in ["1", "2", "3"]:
-                subscription_type = arg
+            sources = list(SOURCES.default_subscription)  # opt-in sources are never a default
+
+        subscription_type = type_args[0] if type_args else "relevant"
 
         sources_str = ",".join(sources)
         user_info = f"{username}|{sources_str}|{subscription_type}"
@@ -463,25 +835,10 @@ class SamezuBot:
         self.upsert_subscriber(chat_id, user_info)
 
         sources_display = ", ".join(sources)
-        is_kanagawa_only = sources == ["kanagawa"]
-        is_saitama_only = sources == ["saitama"]
-        if is_kanagawa_only:
-            relevant_display = "普通車ＡＭ &amp; ＰＭ (Kanagawa)"
-        elif is_saitama_only:
-            relevant_display = "【１】１回目（初めて） (Saitama)"
+        if subscription_type == "all":
+            type_display = "ALL slot types"
         else:
-            relevant_display = "住民票のある方 (Tokyo)"
-        type_display = {
-            "all": "ALL slot types",
-            "nai": "住民票のない方 only (Tokyo)",
-            "ari": "住民票のある方 only (Tokyo)",
-            "am": "普通車ＡＭ only (Kanagawa)",
-            "pm": "普通車ＰＭ only (Kanagawa)",
-            "1": "【１】１回目（初めて） only (Saitama)",
-            "2": "【２】２回目以降 only (Saitama)",
-            "3": "【３】免除国等 only (Saitama)",
-            "relevant": relevant_display,
-        }[subscription_type]
+            type_display = self._subscription_type_display(subscription_type, sources)
 
         action = "Updated" if was_subscribed else "Subscribed"
         response = (
@@ -492,6 +849,18 @@ class SamezuBot:
         )
         await update.message.reply_text(response, parse_mode='HTML')
 
+    @staticmethod
+    def _subscription_type_display(subscription_type, sources):
+        """Slot types a subscription keeps, per subscribed source (type filters name one source)."""
+        specs = [SOURCES[key] for key in SOURCES.subscribed(sources)]
+        filtering = [spec for spec in specs if subscription_type in spec.type_filters]
+        if filtering:
+            return "; ".join(spec.type_label(subscription_type) for spec in filtering)
+        owner = next((spec for spec in SOURCES if subscription_type in spec.type_filters), None)
+        if owner is not None:
+            return owner.type_label(subscription_type)
+        return "; ".join(spec.type_label("relevant") for spec in specs)
+
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         welcome_message = (
@@ -511,7 +880,8 @@ class SamezuBot:
         """Handle /check command.
 
         Usage: /check [source] [all] [force]
-          source: samezu, fuchu, kanagawa, saitama (default = tokyo, i.e. samezu+fuchu)
+          source: a source alias (samezu, fuchu, kanagawa, saitama, ...; default = the first
+                  source in sources.py, tokyo, i.e. samezu+fuchu)
         """
         user_id = update.effective_user.id
         user_name = update.effective_user.first_name or "User"
@@ -520,9 +890,6 @@ class SamezuBot:
 
         logger.info(f"User {user_name} ({user_id}) issued /check. force={force_check}, show_all={show_all}, source={source}")
 
-        await update.message.reply_text("🔍 Checking for available slots...\n\nPlease wait, this may take up to 30 seconds.")
-        await asyncio.sleep(0)
-
         scrape_key = self._scrape_key_for_check(source)
         checker, cache = self._checker_and_cache_for_scrape_key(scrape_key)
         if await self._handle_cached_result(
@@ -530,23 +897,21 @@ class SamezuBot:
             check_source=source, use_month_navigation=False,
         ):
             return
+        if await self._answer_while_breaker_open(update, scrape_key, source, show_all):
+            return
 
-        self._enqueue_waiting_user(
-            scrape_key, user_id, update.effective_chat.id, source, show_all,
-            use_month_navigation=False, force_check=force_check,
+        # Only a request that will scrape gets the "Checking…" message its answer replaces
+        progress_message = await update.message.reply_text(
+            "🔍 Checking for available slots...\n\nPlease wait, this may take up to 30 seconds. "
+            "Dates found so far will show up here as the calendar is checked."
         )
+        await asyncio.sleep(0)
 
-        if not await self._reserve_and_start_background_check(
-            context, use_month_navigation=False, show_all=show_all, source=source, scrape_key=scrape_key
-        ):
-            logger.info(f"User {user_name} ({user_id}) queued for {scrape_key} result.")
-            await update.message.reply_text(
-                "⏳ A check is already running. You'll receive the result here when it finishes.",
-                parse_mode='HTML',
-            )
-            return
-
-        logger.info(f"User {user_name} ({user_id}) starting background check task.")
+        await self._queue_check(update, user_name, scrape_key, ScrapeRequest(
+            user_id, update.effective_chat.id, source, show_all,
+            use_month_navigation=False, force=force_check,
+            message_id=getattr(progress_message, 'message_id', None),
+        ))
 
     async def check_month_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /check_month command - check using month navigation."""
@@ -557,9 +922,6 @@ class SamezuBot:
 
         logger.info(f"User {user_name} ({user_id}) issued /check_month. force={force_check}, show_all={show_all}, source={source}")
 
-        await update.message.reply_text("🔍 Checking for available slots using month navigation...\n\nPlease wait, this may take up to 30 seconds.")
-        await asyncio.sleep(0)
-
         scrape_key = self._scrape_key_for_check(source)
         checker, cache = self._checker_and_cache_for_scrape_key(scrape_key)
         if await self._handle_cached_result(
@@ -567,60 +929,63 @@ class SamezuBot:
             check_source=source, use_month_navigation=True,
         ):
             return
-
-        self._enqueue_waiting_user(
-            scrape_key, user_id, update.effective_chat.id, source, show_all,
-            use_month_navigation=True, force_check=force_check,
-        )
-
-        if not await self._reserve_and_start_background_check(
-            context, use_month_navigation=True, show_all=show_all, source=source, scrape_key=scrape_key
-        ):
-            logger.info(f"User {user_name} ({user_id}) queued for {scrape_key} result.")
-            await update.message.reply_text(
-                "⏳ A check is already running. You'll receive the result here when it finishes.",
-                parse_mode='HTML',
-            )
+        if await self._answer_while_breaker_open(update, scrape_key, source, show_all):
             return
 
-        logger.info(f"User {user_name} ({user_id}) starting background check task with month navigation.")
-
-    async def _reserve_and_start_background_check(
-        self, context, use_month_navigation, show_all, source, scrape_key
-    ):
-        """Atomically reserve a single background scrape slot and start the task."""
-        async with self._check_schedule_lock:
-            if self.check_lock.locked() or self._scrape_task_scheduled:
-                return False
-            self._scrape_task_scheduled = True
-
-        asyncio.create_task(
-            self._background_check_task(
-                context,
-                use_month_navigation=use_month_navigation,
-                show_all=show_all,
-                source=source,
-                scrape_key=scrape_key,
-            )
+        # Only a request that will scrape gets the "Checking…" message its answer replaces
+        progress_message = await update.message.reply_text(
+            "🔍 Checking for available slots using month navigation...\n\nPlease wait, this may take up to 30 seconds. "
+            "Dates found so far will show up here as the calendar is checked."
         )
-        return True
+        await asyncio.sleep(0)
+
+        await self._queue_check(update, user_name, scrape_key, ScrapeRequest(
+            user_id, update.effective_chat.id, source, show_all,
+            use_month_navigation=True, force=force_check,
+            message_id=getattr(progress_message, 'message_id', None),
+        ))
 
     async def _telegram_send(self, chat_id, text, parse_mode='HTML'):
         """Send a Telegram message (overridable in tests)."""
         await self.application.bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
 
+    async def _telegram_edit(self, chat_id, message_id, text, parse_mode='HTML'):
+        """Edit a sent Telegram message in place (overridable in tests)."""
+        await self.application.bot.edit_message_text(
+            text=text, chat_id=chat_id, message_id=message_id, parse_mode=parse_mode
+        )
+
+    async def _deliver_send(self, chat_id, text, priority):
+        """Send text through the delivery queue (paced, retried)."""
+        return await self.delivery_queue.submit(
+            chat_id, lambda: self._telegram_send(chat_id, text), priority=priority
+        )
+
+    async def _deliver_edit(self, chat_id, message_id, text, priority):
+        """Edit a message through the delivery queue; a newer edit of it supersedes this one."""
+        return await self.delivery_queue.submit(
+            chat_id,
+            lambda: self._telegram_edit(chat_id, message_id, text),
+            priority=priority,
+            key=(chat_id, message_id),
+        )
+
+    async def _reply_to_request(self, request, text):
+        """Finalise a /check: edit its "Checking…" message into text, or send text if that fails."""
+        if request.message_id is not None:
+            try:
+                await self._deliver_edit(request.chat_id, request.message_id, text, REPLY)
+                return
+            except Exception as e:
+                logger.info(f"Could not edit /check message in {request.chat_id} ({e}); sending the result")
+        await self._deliver_send(request.chat_id, text, REPLY)
+
     def _scrape_key_for_check(self, check_source):
         """Map /check source arg to cache/checker bucket."""
-        if check_source in ("kanagawa", "saitama"):
-            return check_source
-        return "tokyo"
+        return SOURCES.for_alias(check_source).key
 
     def _checker_and_cache_for_scrape_key(self, scrape_key):
-        if scrape_key == "kanagawa":
-            return self.kanagawa_checker, self.kanagawa_cache
-        if scrape_key == "saitama":
-            return self.saitama_checker, self.saitama_cache
-        return self.reservation_checker, self.cache
+        return self.checkers[scrape_key], self.caches[scrape_key]
 
     def _update_cache_after_scrape(self, cache, check, use_month_navigation):
         if not isinstance(check, CheckResult):
@@ -647,196 +1012,189 @@ class SamezuBot:
         return elapsed < cache.get('cache_duration', CACHE_DURATION)
 
     @staticmethod
-    def _waiter_matches_scrape(waiter, use_month_navigation, from_fresh_scrape):
-        """Whether a queued request matches the navigation mode of a finished scrape."""
-        _user_id, _chat_id, _check_source, _show_all, use_month, force = waiter
-        if use_month != use_month_navigation:
-            return False
-        if force:
-            return from_fresh_scrape
-        return True
+    def _check_covers_request(check, scraped_month_navigation, use_month_navigation):
+        """Whether a scrape covers the dates a /check or /check_month asks for.
 
-    def _cache_usable_for_waiter(self, cache, waiter, from_fresh_scrape):
-        """Whether a queued request can be answered from cache without a new scrape."""
-        check = cache.get('result')
-        if check is None or not self._cached_check_is_usable(check):
-            return False
-
-        if not self._waiter_matches_scrape(
-            waiter, cache.get('use_month_navigation', False), from_fresh_scrape
-        ):
-            return False
-
-        _user_id, _chat_id, _check_source, _show_all, _use_month, force = waiter
-        if not from_fresh_scrape and not force and not self._is_cache_valid(cache):
-            return False
-
-        return True
-
-    def _enqueue_waiting_user(
-        self, scrape_key, user_id, chat_id, check_source, show_all, use_month_navigation, force_check
-    ):
-        self.waiting_users[scrape_key].add(
-            (user_id, chat_id, check_source, show_all, use_month_navigation, force_check)
-        )
-
-    async def _deliver_fresh_check_to_waiters(self, scrape_key, check, use_month_navigation):
-        """Send a just-finished scrape to compatible waiters without writing it to cache."""
-        waiters = self.waiting_users.pop(scrape_key, None)
-        if not waiters:
+        Both commands want the whole calendar. A scrape that reached the calendar's end
+        covers it whichever way it paged; one that stopped short (walk limit, or a result
+        without coverage info) only answers the navigation mode that walked the same range.
+        """
+        if check is not None and check.calendar_complete:
+            return True
+        return scraped_month_navigation == use_month_navigation
+
+    async def _queue_check(self, update, user_name, scrape_key, request):
+        """Attach a /check the cache cannot answer to its scrape flight (starting one if needed)."""
+        flight, created = self.scrape_broker.attach(scrape_key, request)
+        if flight is None:
+            logger.warning(f"User {user_name} ({request.user_id}) refused: {scrape_key} check queue full")
+            await self._reply_to_request(
+                request,
+                f"⏳ Too many checks are queued for {html.escape(SOURCES[scrape_key].label)} right now. "
+                "Please try again in a minute.",
+            )
             return
+        if created:
+            flight.task = asyncio.create_task(self._flight_task(flight))
+        if not created or self.scrape_in_progress(scrape_key):
+            logger.info(f"User {user_name} ({request.user_id}) queued for {scrape_key} result.")
+            waiting = "⏳ A check is already running. You'll receive the result here when it finishes."
+            if request.message_id is not None:
+                try:
+                    # Progress edits and the answer replace this one (same message, later edits win)
+                    await self._deliver_edit(request.chat_id, request.message_id, waiting, PROGRESS)
+                    return
+                except Exception as e:
+                    logger.info(f"Could not edit /check message in {request.chat_id} ({e})")
+            await update.message.reply_text(waiting, parse_mode='HTML')
+            return
+        logger.info(
+            f"User {user_name} ({request.user_id}) starting background check task "
+            f"(month navigation={request.use_month_navigation})."
+        )
 
-        checker, _cache = self._checker_and_cache_for_scrape_key(scrape_key)
+    async def _answer_flight(self, flight, check):
+        """Send a flight's result to each of its requests (rendered once per filter)."""
+        requests = self.scrape_broker.resolve(flight, check)
+        checker, _cache = self._checker_and_cache_for_scrape_key(flight.source)
+        rendered = {}
         tasks = []
-        still_waiting = set()
-        delivered = 0
-
-        for waiter in waiters:
-            if not self._waiter_matches_scrape(waiter, use_month_navigation, from_fresh_scrape=True):
-                still_waiting.add(waiter)
-                continue
-
-            _user_id, chat_id, check_source, show_all, _use_month, _force = waiter
-            if show_all and check_source not in self.SOURCE_FACILITY_MAP:
-                result_to_send = format_check_message(check)
-            else:
-                result_to_send = self._format_check_for_user(
-                    check, checker, show_all, check_source
+        for request in requests:
+            profile = (request.check_source, request.show_all)
+            if profile not in rendered:
+                rendered[profile] = self._format_check_for_user(
+                    check, checker, request.show_all, request.check_source
                 )
-            tasks.append(self._telegram_send(chat_id, result_to_send))
-            delivered += 1
-
-        if still_waiting:
-            self.waiting_users[scrape_key] |= still_waiting
-
+            tasks.append(self._reply_to_request(request, rendered[profile]))
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
-        if delivered:
-            logger.info(f"Sent fresh result to {delivered} waiting users for {scrape_key}")
-        if still_waiting:
-            logger.info(
-                f"{len(still_waiting)} waiter(s) for {scrape_key} need a matching scrape "
-                f"(month={use_month_navigation}, fresh_only=False)"
-            )
+            logger.info(f"Sent result to {len(tasks)} waiting users for {flight.source}")
+
+    async def _answer_flights_covered_by(self, source, check, use_month_navigation, running=None):
+        """After a successful full scrape: answer its flight and every waiting flight it covers."""
+        flights = [running] if running is not None else []
+        flights += [
+            flight for flight in self.scrape_broker.waiting(source)
+            if self._check_covers_request(check, use_month_navigation, flight.use_month_navigation)
+        ]
+        for flight in flights:
+            await self._answer_flight(flight, check)
+
+    def _progress_text(self, provisional, checker, request, scanned, last_date):
+        """Interim /check message: slots found in the periods scanned so far."""
+        through = f", through {html.escape(last_date)}" if last_date else ""
+        header = f"🔍 <b>Still checking…</b> {scanned} calendar period(s) scanned{through}."
+        matching = filter_slots(
+            provisional.slots,
+            keep_types=None if request.show_all else list(checker.target_slot_types),
+            keep_facilities=self._facilities_for_check_source(request.check_source),
+        )
+        if not matching:
+            return f"{header}\n\nNo matching slots so far."
+        return f"{header}\n\n" + self._format_check_for_user(
+            provisional, checker, request.show_all, request.check_source
+        )
 
-    async def _deliver_to_waiting_users(self, scrape_key, from_fresh_scrape=False):
-        """Send cached scrape results to waiters whose request matches the cache."""
-        waiters = self.waiting_users.pop(scrape_key, None)
-        if not waiters:
-            return
+    async def _stream_flight_progress(self, flight, checker, periods):
+        """Edit the flight's "Checking…" messages as periods are scanned (earliest dates first).
 
-        checker, cache = self._checker_and_cache_for_scrape_key(scrape_key)
-        tasks = []
-        still_waiting = set()
-        delivered = 0
-
-        for waiter in waiters:
-            if not self._cache_usable_for_waiter(cache, waiter, from_fresh_scrape):
-                still_waiting.add(waiter)
+        At most one round of edits per CHECK_PROGRESS_EDIT_INTERVAL seconds, and only where
+        the text changed; _reply_to_request turns the same messages into the final result.
+        """
+        slots = []
+        scanned = 0
+        last_edit = None
+        shown = {}  # (chat_id, message_id) -> text on screen
+        async for period in periods:
+            slots.extend(period.slots)
+            scanned += 1
+            now = time.monotonic()
+            if last_edit is not None and now - last_edit < CHECK_PROGRESS_EDIT_INTERVAL:
                 continue
-
-            _user_id, chat_id, check_source, show_all, _use_month, _force = waiter
-            result_to_send = self._format_check_for_user(
-                cache['result'], checker, show_all, check_source
-            )
-            tasks.append(self._telegram_send(chat_id, result_to_send))
-            delivered += 1
-
-        if still_waiting:
-            self.waiting_users[scrape_key] |= still_waiting
-
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
-        if delivered:
-            logger.info(f"Sent result to {delivered} waiting users for {scrape_key}")
-        if still_waiting:
-            logger.info(
-                f"{len(still_waiting)} waiter(s) for {scrape_key} need a matching scrape "
-                f"(month={cache.get('use_month_navigation')}, fresh_only={not from_fresh_scrape})"
+            last_edit = now
+            provisional = CheckResult.from_slots(
+                list(dedupe_slots(slots)),
+                target_url=checker.target_url,
+                facilities_label=tuple(checker.target_facilities),
             )
-
-    async def _deliver_cached_waiters_for_other_keys(self, completed_scrape_key):
-        """Serve waiters on other scrape keys from valid, matching caches only."""
-        for scrape_key in list(self.waiting_users.keys()):
-            if scrape_key != completed_scrape_key:
-                await self._deliver_to_waiting_users(scrape_key, from_fresh_scrape=False)
-
-    async def _drain_waiting_queues_after_scrape(self, completed_scrape_key):
-        """Deliver waiters compatible with the scrape that just finished, then try other caches."""
-        await self._deliver_to_waiting_users(completed_scrape_key, from_fresh_scrape=True)
-        await self._deliver_cached_waiters_for_other_keys(completed_scrape_key)
-
-    async def _start_chained_scrapes_for_remaining_waiters(self):
-        """Start one background scrape for the next scrape key that still has waiters."""
-        for scrape_key in list(self.waiting_users.keys()):
-            waiters = self.waiting_users.get(scrape_key)
-            if not waiters:
-                continue
-
-            use_month_navigation = any(w[4] for w in waiters)
-            show_all = any(w[3] for w in waiters)
-            check_source = next(iter(waiters))[2]
-
-            if await self._reserve_and_start_background_check(
-                None,
-                use_month_navigation=use_month_navigation,
-                show_all=show_all,
-                source=check_source,
-                scrape_key=scrape_key,
-            ):
-                logger.info(f"Chaining background check for {scrape_key} ({len(waiters)} waiter(s))")
-            return
-
-    async def _background_check_task(
-        self, context, use_month_navigation=False, show_all=False, source=None, scrape_key=None
-    ):
-        """Background task to perform reservation check and notify users."""
-        if scrape_key is None:
-            scrape_key = self._scrape_key_for_check(source)
-
-        try:
-            async with self.check_lock:
-                try:
-                    logger.info(
-                        f"Starting background check task. scrape_key={scrape_key}, "
-                        f"use_month_navigation={use_month_navigation}, show_all={show_all}, source={source}"
+            rendered = {}
+            edits = []
+            for request, _attached_at in flight.requests:
+                if request.message_id is None:
+                    continue
+                profile = (request.check_source, request.show_all)
+                if profile not in rendered:
+                    rendered[profile] = self._progress_text(
+                        provisional, checker, request, scanned, period.last_date
                     )
-
-                    checker, cache = self._checker_and_cache_for_scrape_key(scrape_key)
-
-                    check = await checker.run_check(
-                        send_notifications=False,
-                        use_month_navigation=use_month_navigation,
-                        show_all=True,
+                target = (request.chat_id, request.message_id)
+                if shown.get(target) != rendered[profile]:
+                    shown[target] = rendered[profile]
+                    edits.append(
+                        self._deliver_edit(request.chat_id, request.message_id, rendered[profile], PROGRESS)
                     )
+            if edits:
+                await asyncio.gather(*edits, return_exceptions=True)
+                logger.info(f"✏️ {flight.source}: progress after {scanned} period(s) shown to {len(edits)} user(s)")
 
-                    if check.is_error:
-                        logger.warning(
-                            f"Background check error for {scrape_key}; not caching result"
-                        )
-                        await self._deliver_fresh_check_to_waiters(
-                            scrape_key, check, use_month_navigation
-                        )
-                    else:
-                        self._update_cache_after_scrape(cache, check, use_month_navigation)
-                        await self._drain_waiting_queues_after_scrape(scrape_key)
-
+    async def _flight_task(self, flight):
+        """Run one shared /check scrape once the source's lock is free, then answer its requests."""
+        scrape_key = flight.source
+        try:
+            async with self.scrape_locks[scrape_key]:
+                if flight.done:
+                    logger.info(f"{scrape_key} check flight answered by an earlier scrape")
+                    return
+                self.scrape_broker.start(flight)
+                logger.info(
+                    f"Starting background check task. scrape_key={scrape_key}, "
+                    f"use_month_navigation={flight.use_month_navigation}, waiters={len(flight.requests)}"
+                )
+                checker, cache = self._checker_and_cache_for_scrape_key(scrape_key)
+                periods = PeriodStream(checker)
+                progress = None
+                if CHECK_PROGRESS_EDIT_INTERVAL is not None:
+                    progress = asyncio.create_task(self._stream_flight_progress(flight, checker, periods))
+                try:
+                    with periods:
+                        async with self._scrape_slots:
+                            check = await self._run_check_through_breaker(
+                                scrape_key,
+                                checker,
+                                send_notifications=False,
+                                use_month_navigation=flight.use_month_navigation,
+                                show_all=True,
+                            )
                 except Exception as e:
-                    error_message = f"❌ Error during reservation check: {str(e)}"
                     logger.error(f"Background check task failed: {e}")
-                    await self._deliver_fresh_check_to_waiters(
-                        scrape_key,
-                        CheckResult.from_error(error_message),
-                        use_month_navigation,
+                    check = CheckResult.from_error(f"❌ Error during reservation check: {str(e)}")
+                finally:
+                    if progress is not None:
+                        progress.cancel()  # the final answer supersedes edits still queued
+
+                if check is None or (check.is_error and self._breaker(scrape_key).is_open):
+                    await self._answer_flight_from_breaker(flight)
+                elif check.is_error or check.partial:
+                    logger.warning(
+                        f"Background check {'error' if check.is_error else 'partial'} "
+                        f"for {scrape_key}; not caching result"
+                    )
+                    await self._answer_flight(flight, check)
+                else:
+                    self._update_cache_after_scrape(cache, check, flight.use_month_navigation)
+                    await self._answer_flights_covered_by(
+                        scrape_key, check, flight.use_month_navigation, running=flight
                     )
         finally:
-            async with self._check_schedule_lock:
-                self._scrape_task_scheduled = False
-
-        await self._start_chained_scrapes_for_remaining_waiters()
+            if not flight.done:  # cancelled, or failed before answering
+                logger.warning(f"{scrape_key} check flight ended without an answer; sending an error")
+                await self._answer_flight(
+                    flight, CheckResult.from_error("❌ The check was interrupted. Please try again."),
+                )
 
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
+        sources = "\n".join(f"• {self._source_help_line(spec)}" for spec in SOURCES)
         help_message = (
             f"📋 <b>Samezu Bot Help</b>\n\n"
             f"<b>Commands:</b>\n"
@@ -849,9 +1207,7 @@ class SamezuBot:
             f"/cache — Detailed cache info\n"
             f"/help — This message\n\n"
             f"<b>Sources:</b>\n"
-            f"• <b>tokyo</b> (default) — 府中試験場 &amp; 鮫洲試験場\n"
-            f"• <b>kanagawa</b> — 外国免許四輪車 (普通車ＡＭ/ＰＭ)\n"
-            f"• <b>saitama</b> — 外免　書類審査 (opt-in only, not in default subscribe)\n\n"
+            f"{sources}\n\n"
             f"<b>Check examples:</b>\n"
             f"• <code>/check</code> — Tokyo, relevant slots\n"
             f"• <code>/check kanagawa</code> — Kanagawa slots\n"
@@ -875,9 +1231,32 @@ class SamezuBot:
         )
         await update.message.reply_text(help_message, parse_mode='HTML')
 
+    @staticmethod
+    def _source_help_line(spec):
+        line = f"<b>{html.escape(spec.key)}</b>"
+        if spec is SOURCES.default:
+            line += " (default)"
+        line += " — " + " &amp; ".join(html.escape(f) for f in spec.facilities)
+        if spec.slot_types:
+            line += f" ({html.escape('/'.join(spec.slot_types))})"
+        keywords = [alias for alias in spec.aliases if alias != spec.key]
+        if keywords:
+            line += f"; keywords: {html.escape(', '.join(keywords))}"
+        if not spec.default_subscribe:
+            line += " (opt-in only, not in default subscribe)"
+        return line
+
+    def _schedule_status_line(self, schedule):
+        line = schedule.status_line()
+        if self.polling_planner is not None:
+            line += "; " + self.polling_planner.status_line(
+                schedule.source, self._scrape_budget_per_hour(schedule), max_per_hour=ADAPTIVE_SCRAPES_PER_HOUR
+            )
+        return line
+
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command"""
-        check_in_progress = self.check_lock.locked()
+        scraping = [key for key in SOURCES.keys() if self.scrape_in_progress(key)]
 
         def cache_line(label, cache):
             if not cache.get('timestamp'):
@@ -890,15 +1269,37 @@ class SamezuBot:
                 return f"✅ {label}: valid ({age} old)"
             return f"❌ {label}: expired ({age} old)"
 
-        status = "⏳ Check in progress" if check_in_progress else "🟢 Ready"
+        status = f"⏳ Check in progress ({', '.join(scraping)})" if scraping else "🟢 Ready"
         msg = (
             f"<b>Status</b>\n\n"
             f"{status}\n\n"
             f"<b>Cache:</b>\n"
-            f"• {cache_line('Tokyo', self.cache)}\n"
-            f"• {cache_line('Kanagawa', self.kanagawa_cache)}\n"
-            f"• {cache_line('Saitama', self.saitama_cache)}"
+            + "\n".join(f"• {cache_line(spec.label, self.caches[spec.key])}" for spec in SOURCES)
+        )
+        if self.schedules:
+            msg += "\n\n<b>Schedule:</b>\n" + "\n".join(
+                f"• {spec.label}: {self._schedule_status_line(self.schedules[spec.key])}"
+                for spec in SOURCES if spec.key in self.schedules
+            )
+        msg += "\n\n<b>Check queues:</b>\n" + "\n".join(
+            f"• {spec.label}: {self.scrape_broker.status_line(spec.key)}" for spec in SOURCES
+        )
+        msg += "\n\n<b>Circuit breakers:</b>\n" + "\n".join(
+            f"• {spec.label}: {self._breaker(spec.key).status_line()}" for spec in SOURCES
         )
+        msg += f"\n\n<b>Telegram delivery:</b> {self.delivery_queue.status_line()}"
+        if self.browser_pool is not None:
+            msg += f"\n\n<b>Browser:</b> {self.browser_pool.status_line()}"
+        if self.snapshot_archive is not None:
+            msg += f"\n\n<b>Snapshot archive:</b> {self.snapshot_archive.status_line()}"
+        for title, status_line in (
+            ("Engines", "status_line"),
+            ("Last scrape resources", "resource_status_line"),
+            ("Sessions", "session_status_line"),
+        ):
+            msg += f"\n\n<b>{title}:</b>\n" + "\n".join(
+                f"• {spec.label}: {getattr(self.checkers[spec.key], status_line)()}" for spec in SOURCES
+            )
         await update.message.reply_text(msg, parse_mode='HTML')
 
     async def cache_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -913,27 +1314,28 @@ class SamezuBot:
             ts = datetime.fromtimestamp(cache['timestamp']).strftime('%H:%M:%S')
             age = f"{int(elapsed // 60)}m {int(elapsed % 60)}s"
             status = "✅ valid" if valid else "❌ expired"
-            return f"<b>{label}:</b> {status} — {age} old (fetched {ts})"
+            check = cache['result']
+            if check.calendar_complete:
+                coverage = f"whole calendar to {html.escape(check.covered_through or '?')}"
+            else:
+                mode = "month" if cache.get('use_month_navigation') else "week"
+                coverage = f"{mode} navigation only"
+            return f"<b>{label}:</b> {status} — {age} old (fetched {ts}; {coverage})"
 
         message = (
             f"📊 <b>Cache Information</b>\n\n"
-            f"• {format_cache('Tokyo', self.cache)}\n"
-            f"• {format_cache('Kanagawa', self.kanagawa_cache)}\n"
-            f"• {format_cache('Saitama', self.saitama_cache)}\n\n"
-            f"⏰ Duration: {CACHE_DURATION // 60} minutes"
+            + "\n".join(f"• {format_cache(spec.label, self.caches[spec.key])}" for spec in SOURCES)
+            + f"\n\n⏰ Duration: {CACHE_DURATION // 60} minutes"
         )
         await update.message.reply_text(message, parse_mode='HTML')
 
     async def link_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /link command - send the reservation system website URLs"""
-        link_message = (
-            f"🔗 <b>Reservation Websites</b>\n\n"
-            f"🗼 <b>Tokyo</b> (府中・鮫洲)\n"
-            f"<a href='{TARGET_URL}'>Book Tokyo slot</a>\n\n"
-            f"🏔 <b>Kanagawa</b> (外国免許四輪車)\n"
-            f"<a href='{KANAGAWA_TARGET_URL}'>Book Kanagawa slot</a>\n\n"
-            f"🌻 <b>Saitama</b> (外免　書類審査)\n"
-            f"<a href='{SAITAMA_TARGET_URL}'>Book Saitama slot</a>"
+        link_message = "🔗 <b>Reservation Websites</b>\n\n" + "\n\n".join(
+            f"{spec.emoji} <b>{html.escape(spec.label)}</b>"
+            + (f" ({html.escape(spec.description)})" if spec.description else "")
+            + f"\n<a href='{html.escape(spec.url)}'>Book {html.escape(spec.label)} slot</a>"
+            for spec in SOURCES
         )
         await update.message.reply_text(link_message, parse_mode='HTML')
 
@@ -941,24 +1343,18 @@ class SamezuBot:
         """Whether a subscriber should receive alerts for a scrape source."""
         if not notify_source:
             return True
-        if notify_source == "tokyo":
-            return bool(set(subscriber_sources) & self.TOKYO_SUBSCRIBER_SOURCES)
-        return notify_source in subscriber_sources
-
-    def _facilities_for_subscriber_sources(self, subscriber_sources):
-        """Facility names to keep in Tokyo alerts for this subscriber (None = both)."""
-        tokyo_keys = [s for s in subscriber_sources if s in self.TOKYO_SUBSCRIBER_SOURCES]
-        if len(tokyo_keys) >= 2:
-            return None
-        if len(tokyo_keys) == 1:
-            return [self.SOURCE_FACILITY_MAP[tokyo_keys[0]]]
-        return []
+        return notify_source in SOURCES.subscribed(subscriber_sources)
+
+    def _facilities_for_subscriber_sources(self, subscriber_sources, notify_source="tokyo"):
+        """Facility names to keep in notify_source alerts for this subscriber (None = all)."""
+        aliases = SOURCES.subscribed(subscriber_sources).get(notify_source)
+        if not aliases:
+            return []
+        return SOURCES[notify_source].facility_filter(aliases)
 
     def _facilities_for_check_source(self, check_source):
-        """Facility filter for /check when source is samezu or fuchu (None = no extra filter)."""
-        if check_source in self.SOURCE_FACILITY_MAP:
-            return [self.SOURCE_FACILITY_MAP[check_source]]
-        return None
+        """Facility filter for /check when the source alias names one facility (None = no extra filter)."""
+        return SOURCES.facility_filter(check_source)
 
     def _format_check_for_user(self, check, checker, show_all, check_source):
         """Apply slot-type and optional facility filters for manual /check replies."""
@@ -973,85 +1369,94 @@ class SamezuBot:
     def _resolve_keep_types(self, subscription_type, source):
         """Return the slot type strings to keep for a given subscription type and source.
 
-        Tokyo types:  住民票のある方, 住民票のない方
-        Kanagawa types: 普通車ＡＭ, 普通車ＰＭ
-        Saitama types: 【１】１回目（初めて）, 【２】２回目以降, 【３】免除国等
+        Type filters are per source (SourceSpec.type_filters); "relevant" and filters the
+        source does not define keep its default slot types. A missing or unknown source
+        means the default source.
 
         Returns None to mean "keep all".
         """
-        is_kanagawa = source == "kanagawa"
-        is_saitama = source == "saitama"
-        if subscription_type == "all":
-            return None
-        if is_kanagawa:
-            if subscription_type == "am":
-                return ["普通車ＡＭ"]
-            if subscription_type == "pm":
-                return ["普通車ＰＭ"]
-            # relevant / default for kanagawa = both AM and PM
-            return list(KANAGAWA_TARGET_SLOT_TYPES)
-        elif is_saitama:
-            if subscription_type == "1":
-                return ["【１】１回目（初めて）"]
-            if subscription_type == "2":
-                return ["【２】２回目以降"]
-            if subscription_type == "3":
-                return ["【３】免除国等"]
-            # relevant / default for saitama = first-time only
-            return list(SAITAMA_TARGET_SLOT_TYPES)
-        else:
-            if subscription_type == "nai":
-                return ["住民票のない方"]
-            if subscription_type in ("ari", "relevant"):
-                return ["住民票のある方"]
-            # fallback: use configured default
-            return list(TARGET_SLOT_TYPES)
-
-    def _notification_messages_for_subscribers(self, check, source=None):
-        """Build (chat_id, message) pairs for subscribers who should be notified."""
+        spec = SOURCES.sources.get(source, SOURCES.default)
+        return spec.keep_types(subscription_type)
+
+    def _notification_messages_for_subscribers(self, check, source=None, note=None):
+        """Build (chat_id, message) pairs for subscribers who should be notified.
+
+        Subscribers sharing a subscription profile (sources, type) get the same alert, so
+        each profile is filtered and rendered once (profiles with identical filters share
+        one render); per subscriber only the 🔔 @tag header is added. note, when given, is
+        appended to each rendered result.
+        """
         if not isinstance(check, CheckResult):
             raise TypeError("notifications require CheckResult")
 
+        profiles = {}  # (sources, subscription type) -> alert text, or None = nothing for them
+        renders = {}  # (keep_types, facilities) -> format_check_message text
         messages = []
+        skipped = 0
         for chat_id, user_info_raw in self.get_subscribers():
             try:
                 chat_id = int(chat_id)
                 username, sources, subscription_type = self.parse_subscriber_info(user_info_raw)
 
-                if not self._subscriber_matches_source(sources, source):
-                    logger.info(f"Skipping subscriber {chat_id} - not subscribed to {source}")
+                profile = (tuple(sources), subscription_type)
+                if profile not in profiles:
+                    profiles[profile] = self._notification_for_profile(
+                        check, source, sources, subscription_type, renders, note
+                    )
+                alert = profiles[profile]
+                if alert is None:
+                    skipped += 1
                     continue
 
-                keep_types = self._resolve_keep_types(subscription_type, source)
-                facilities = None
-                if source == "tokyo":
-                    facilities = self._facilities_for_subscriber_sources(sources)
-
-                filtered_result = format_check_message(
-                    check,
-                    keep_types=keep_types,
-                    keep_facilities=facilities,
-                )
-
-                if filtered_result and "❌" not in filtered_result:
-                    if username and username != f"User{chat_id}":
-                        tag = username if username.startswith('@') else f"@{username}"
-                        notification_message = f"🔔 {tag}\n\n{filtered_result}"
-                    else:
-                        notification_message = filtered_result
-                    messages.append((chat_id, notification_message))
-                    logger.info(f"Sending {subscription_type} notification to subscriber {chat_id}")
+                if username and username != f"User{chat_id}":
+                    tag = username if username.startswith('@') else f"@{username}"
+                    messages.append((chat_id, f"🔔 {tag}\n\n{alert}"))
                 else:
-                    logger.info(f"Skipping notification for subscriber {chat_id} - no {subscription_type} slots found")
+                    messages.append((chat_id, alert))
 
             except Exception as e:
                 logger.error(f"Failed to prepare notification for subscriber {chat_id}: {e}")
 
+        logger.info(
+            f"Prepared {len(messages)} notification(s) for {source or 'all sources'} "
+            f"({skipped} subscriber(s) skipped; {len(profiles)} profile(s), {len(renders)} render(s))"
+        )
         return messages
 
-    async def _send_notifications_to_subscribers(self, check, source=None):
+    def _notification_for_profile(self, check, source, sources, subscription_type, renders, note=None):
+        """Alert text for one subscription profile, or None when it gets no alert.
+
+        renders caches format_check_message output by (keep_types, facilities) across profiles.
+        """
+        if not self._subscriber_matches_source(sources, source):
+            logger.info(f"Skipping {subscription_type} subscribers of {sources} - not subscribed to {source}")
+            return None
+
+        keep_types = self._resolve_keep_types(subscription_type, source)
+        facilities = None
+        if source:
+            facilities = self._facilities_for_subscriber_sources(sources, source)
+
+        key = (
+            None if keep_types is None else tuple(keep_types),
+            None if facilities is None else tuple(facilities),
+        )
+        if key not in renders:
+            renders[key] = format_check_message(
+                check,
+                keep_types=keep_types,
+                keep_facilities=facilities,
+            )
+        filtered_result = renders[key]
+
+        if not filtered_result or "❌" in filtered_result:
+            logger.info(f"Skipping {subscription_type} subscribers of {sources} - no {subscription_type} slots found")
+            return None
+        return f"{filtered_result}\n\n{note}" if note else filtered_result
+
+    async def _send_notifications_to_subscribers(self, check, source=None, note=None):
         """Send notifications to subscribers, filtered by source and subscription type."""
-        messages = self._notification_messages_for_subscribers(check, source=source)
+        messages = self._notification_messages_for_subscribers(check, source=source, note=note)
         if not messages:
             if not self.get_subscribers():
                 logger.warning("No subscribers to send notifications to.")
@@ -1059,9 +1464,12 @@ class SamezuBot:
                 logger.info("No notifications sent - no relevant slots for any subscribers.")
             return
 
-        tasks = [self._telegram_send(chat_id, text) for chat_id, text in messages]
-        await asyncio.gather(*tasks, return_exceptions=True)
-        logger.info(f"Sent notifications to {len(tasks)} subscribers.")
+        results = await asyncio.gather(
+            *(self._deliver_send(chat_id, text, ALERT) for chat_id, text in messages),
+            return_exceptions=True,
+        )
+        failed = sum(isinstance(result, Exception) for result in results)
+        logger.info(f"Sent notifications to {len(results) - failed} subscribers ({failed} failed).")
 
     async def _filter_result_for_subscription(self, check, subscription_type, source=None):
         """Filter cached scrape for subscription type and source."""
@@ -1073,7 +1481,8 @@ class SamezuBot:
         """Parse command arguments for force, filtering, and source options.
 
         Returns (force_check, show_all, source).
-        source is "kanagawa", "saitama", "samezu", "fuchu", or None (= default Tokyo).
+        source is the first source alias in the args ("kanagawa", "samezu", ...) or None
+        (= the default source, Tokyo).
         """
         force_check = False
         show_all = False
@@ -1084,19 +1493,14 @@ class SamezuBot:
                 force_check = True
             if "all" in args_lower or "-a" in args_lower:
                 show_all = True
-            if "kanagawa" in args_lower:
-                source = "kanagawa"
-            elif "saitama" in args_lower:
-                source = "saitama"
-            elif "samezu" in args_lower:
-                source = "samezu"
-            elif "fuchu" in args_lower:
-                source = "fuchu"
+            source = next((arg for arg in args_lower if arg in SOURCES.by_alias), None)
         return force_check, show_all, source
 
-    def _cache_matches_navigation(self, cache, use_month_navigation):
-        """Cache is only valid for the same navigation mode as the command."""
-        return cache.get('use_month_navigation', False) == use_month_navigation
+    def _cache_covers_request(self, cache, use_month_navigation):
+        """Cached scrape covers the command's dates (see _check_covers_request)."""
+        return self._check_covers_request(
+            cache.get('result'), cache.get('use_month_navigation', False), use_month_navigation
+        )
 
     async def _handle_cached_result(
         self, update, user_name, user_id, force_check, show_all, cache=None, checker=None,
@@ -1114,14 +1518,14 @@ class SamezuBot:
             and self._cached_check_is_usable(cached_check)
             and cache['timestamp']
             and not force_check
-            and self._cache_matches_navigation(cache, use_month_navigation)
+            and self._cache_covers_request(cache, use_month_navigation)
             and self._is_cache_valid(cache)
         ):
             elapsed = time.time() - cache['timestamp']
             cache_age_minutes = int(elapsed // 60)
             cache_age_seconds = int(elapsed % 60)
 
-            if show_all and check_source not in self.SOURCE_FACILITY_MAP:
+            if show_all and SOURCES.facility_filter(check_source) is None:
                 result_to_show = format_check_message(cached_check)
                 cache_type_text = "unfiltered"
             else:
@@ -1185,6 +1589,9 @@ class BotRunner:
             try:
                 # Stop the scheduler first
                 await self.bot.stop_scheduler()
+                await self.bot.close_browser_pool()
+                await self.bot.close_http_pool()
+                await self.bot.close_delivery_queue()
 
                 await self.bot.application.updater.stop()
                 await self.bot.application.stop()
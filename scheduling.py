@@ -0,0 +1,146 @@
+"""Per-source fixed-rate schedules for the bot's scheduled scrapes.
+
+Each source runs on its own grid of due times ``anchor + phase + k * interval``, so the
+period between runs is ``interval`` however long a scrape takes (the old loop slept a
+full interval *after* every cycle and drifted by the scrape duration). ``phase`` shifts a
+source along the grid — by default sources are staggered evenly over the interval so
+their Chromium contexts do not all open at once — and every run is delayed by a fresh
+random ``[0, jitter)`` seconds so the sites do not see a metronome.
+
+A run that overruns one or more due times does not queue them up: the next run starts
+at once (deferred catch-up) and the ticks it stands in for are counted as missed. Lag —
+how late a run actually started against its due time, e.g. waiting for a /check scrape
+of the same source or for a global scrape slot — is tracked per source for /status.
+``retune`` changes the interval between runs without breaking the grid (adaptive
+polling, see adaptive_polling.py).
+"""
+
+import random
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+
+class SourceSchedule:
+    """Fixed-rate tick grid of one source, with jitter and lag / missed-tick accounting."""
+
+    def __init__(
+        self,
+        source: str,
+        interval: float,
+        phase: float = 0.0,
+        jitter: float = 0.0,
+        anchor: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random,
+    ):
+        if interval <= 0:
+            raise ValueError(f"schedule interval for {source} must be positive, got {interval}")
+        self.source = source
+        self.interval = float(interval)
+        self.base_interval = self.interval  # configured interval (interval may be retuned)
+        self.phase = float(phase) % self.interval
+        self.jitter = max(0.0, float(jitter))
+        self._clock = clock
+        self._rng = rng
+        self.anchor = clock() if anchor is None else anchor
+        self.tick = 0  # index of the next grid time to run
+        self._offset = self._draw_jitter()
+        self.runs = 0
+        self.missed = 0
+        self.deferred = 0
+        self.last_lag: Optional[float] = None
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    def _draw_jitter(self) -> float:
+        return self._rng() * self.jitter if self.jitter else 0.0
+
+    def grid_time(self, tick: int) -> float:
+        return self.anchor + self.phase + tick * self.interval
+
+    @property
+    def next_due(self) -> float:
+        return self.grid_time(self.tick) + self._offset
+
+    def delay(self) -> float:
+        """Seconds until the next run is due (0 when it is already due or overdue)."""
+        return max(0.0, self.next_due - self._clock())
+
+    def start_after(self, moment: float) -> None:
+        """Skip grid times at or before `moment` (covered by an unscheduled run, e.g. at startup)."""
+        while self.grid_time(self.tick) <= moment:
+            self.tick += 1
+
+    def started(self) -> float:
+        """Record that the pending run is starting now; returns its lag in seconds."""
+        lag = max(0.0, self._clock() - self.next_due)
+        self.runs += 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.total_lag += lag
+        return lag
+
+    def finished(self) -> int:
+        """Advance past the run just made; returns how many grid times it overran (missed)."""
+        now = self._clock()
+        self.tick += 1
+        missed = 0
+        while self.grid_time(self.tick + 1) <= now:
+            self.tick += 1
+            missed += 1
+        self.missed += missed
+        self._offset = self._draw_jitter()
+        return missed
+
+    def retune(self, interval: float) -> None:
+        """Use `interval` from the next due time on, keeping the grid continuous.
+
+        The next run comes at the last due time + `interval`, or sooner if the current
+        grid already has it due earlier (a pending catch-up, or a longer new interval).
+        """
+        if interval == self.interval or self.tick == 0:
+            return
+        following = min(self.grid_time(self.tick), self.grid_time(self.tick - 1) + interval)
+        self.interval = float(interval)
+        self.anchor, self.phase, self.tick = following - self.interval, 0.0, 1
+
+    @property
+    def mean_lag(self) -> Optional[float]:
+        return self.total_lag / self.runs if self.runs else None
+
+    def status_line(self) -> str:
+        line = f"every {self.interval:.0f}s (phase {self.phase:.0f}s, jitter ≤{self.jitter:.0f}s), next in {self.delay():.0f}s"
+        if not self.runs:
+            return line + ", no scheduled runs yet"
+        return (
+            f"{line}; lag {self.last_lag:.1f}s last, {self.mean_lag:.1f}s mean, {self.max_lag:.1f}s max; "
+            f"{self.missed} missed, {self.deferred} deferred over {self.runs} run(s)"
+        )
+
+
+def build_schedules(
+    sources: Iterable,
+    default_interval: float,
+    default_jitter: float = 0.0,
+    stagger: bool = True,
+    anchor: Optional[float] = None,
+    clock: Callable[[], float] = time.monotonic,
+) -> Dict[str, SourceSchedule]:
+    """One SourceSchedule per SourceSpec; spec fields override the defaults.
+
+    With `stagger`, sources without an explicit phase get ``i / n`` of their interval
+    (registry order), spreading n sources evenly across a cycle.
+    """
+    specs = list(sources)
+    anchor = clock() if anchor is None else anchor
+    schedules = {}
+    for index, spec in enumerate(specs):
+        interval = spec.interval or default_interval
+        phase = spec.phase
+        if phase is None:
+            phase = interval * index / len(specs) if stagger else 0.0
+        jitter = default_jitter if spec.jitter is None else spec.jitter
+        schedules[spec.key] = SourceSchedule(
+            spec.key, interval, phase=phase, jitter=jitter, anchor=anchor, clock=clock
+        )
+    return schedules
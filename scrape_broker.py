@@ -0,0 +1,149 @@
+"""Single-flight broker for /check scrapes.
+
+A /check the cache cannot answer becomes a ``ScrapeRequest`` and attaches to the open
+flight of its key — (source, navigation mode) — or opens one. A ``Flight`` is one scrape
+shared by every request attached to it: it waits for the source's scrape lock (held by a
+scheduled scrape or by the source's other flight), runs once, and ``resolve`` settles its
+future and hands back its requests, so each is answered exactly once with no re-queueing.
+Every flight is a new scrape, so a forced /check (which must not be served from cache)
+attaches like any other: freshness is decided by the cache lookup before attaching.
+
+A successful full scrape of a source — another flight's or a scheduled one — also settles
+the source's flights still waiting for the lock when it covers them (same navigation, or a
+calendar that reached its end), so no request waits behind a redundant scrape.
+
+Per key the broker keeps queue metrics: peak depth, requests answered, mean / max wait
+(attach → answer) and requests refused because ``max_waiters`` were already attached.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+FlightKey = Tuple[str, bool]  # (source, use_month_navigation)
+
+
+@dataclass(frozen=True)
+class ScrapeRequest:
+    """One queued /check: who asked, and how the result is filtered for them."""
+
+    user_id: int
+    chat_id: int
+    check_source: Optional[str]
+    show_all: bool
+    use_month_navigation: bool
+    force: bool
+    message_id: Optional[int] = None  # the "Checking…" reply, edited with progress and the result
+
+
+class Flight:
+    """One scrape of a source shared by the requests attached to it."""
+
+    def __init__(self, source: str, use_month_navigation: bool, created_at: float):
+        self.source = source
+        self.use_month_navigation = use_month_navigation
+        self.created_at = created_at
+        self.started_at: Optional[float] = None
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.requests: List[Tuple[ScrapeRequest, float]] = []  # (request, attached at)
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def key(self) -> FlightKey:
+        return (self.source, self.use_month_navigation)
+
+    @property
+    def done(self) -> bool:
+        return self.future.done()
+
+
+@dataclass
+class QueueStats:
+    peak: int = 0
+    served: int = 0
+    refused: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+class ScrapeBroker:
+    """Open flights per (source, navigation) key and their queue metrics."""
+
+    def __init__(self, max_waiters: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        self.max_waiters = max_waiters
+        self._clock = clock
+        self.flights: Dict[FlightKey, Flight] = {}
+        self.stats: Dict[FlightKey, QueueStats] = {}
+
+    def _stats(self, key: FlightKey) -> QueueStats:
+        return self.stats.setdefault(key, QueueStats())
+
+    def attach(self, source: str, request: ScrapeRequest) -> Tuple[Optional[Flight], bool]:
+        """Attach request to its key's open flight, opening one if needed.
+
+        Returns ``(flight, created)``; ``(None, False)`` when the flight already has
+        ``max_waiters`` requests.
+        """
+        key = (source, request.use_month_navigation)
+        stats = self._stats(key)
+        flight = self.flights.get(key)
+        created = flight is None
+        if created:
+            flight = self.flights[key] = Flight(source, request.use_month_navigation, self._clock())
+        elif self.max_waiters and len(flight.requests) >= self.max_waiters:
+            stats.refused += 1
+            return None, False
+        flight.requests.append((request, self._clock()))
+        stats.peak = max(stats.peak, len(flight.requests))
+        return flight, created
+
+    def start(self, flight: Flight) -> None:
+        flight.started_at = self._clock()
+
+    def waiting(self, source: str) -> List[Flight]:
+        """Flights of source not yet started (still waiting for the scrape lock)."""
+        return [f for f in self.flights.values() if f.source == source and f.started_at is None]
+
+    def resolve(self, flight: Flight, check) -> List[ScrapeRequest]:
+        """Settle flight with check (None: no scrape ran) and return its requests, once."""
+        if flight.done:
+            return []
+        flight.future.set_result(check)
+        if self.flights.get(flight.key) is flight:
+            del self.flights[flight.key]
+        now = self._clock()
+        stats = self._stats(flight.key)
+        for _request, attached_at in flight.requests:
+            wait = now - attached_at
+            stats.served += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+        return [request for request, _attached_at in flight.requests]
+
+    def depth(self, source: Optional[str] = None) -> int:
+        return sum(
+            len(f.requests) for f in self.flights.values() if source is None or f.source == source
+        )
+
+    def status_line(self, source: str) -> str:
+        parts = []
+        for use_month in (False, True):
+            key = (source, use_month)
+            stats = self.stats.get(key)
+            flight = self.flights.get(key)
+            if stats is None and flight is None:
+                continue
+            label = "month" if use_month else "week"
+            if flight is None:
+                state = "idle"
+            elif flight.started_at is None:
+                state = f"{len(flight.requests)} waiting for the scrape lock"
+            else:
+                state = f"{len(flight.requests)} on a scrape running {self._clock() - flight.started_at:.0f}s"
+            mean = stats.total_wait / stats.served if stats.served else 0.0
+            parts.append(
+                f"{label} {state}; {stats.served} answered, wait {mean:.1f}s mean / "
+                f"{stats.max_wait:.1f}s max, peak {stats.peak}, {stats.refused} refused"
+            )
+        return "; ".join(parts) if parts else "no /check scrapes yet"
@@ -0,0 +1,79 @@
+"""Wall-clock budget for one scrape, with per-phase caps enforced by cancellation.
+
+A scrape holds its source's scrape lock (and every /check flight queued behind it)
+until it returns, so no single step may wait unbounded: ``ScrapeDeadline.run(phase, aw)``
+cancels ``aw`` once the phase budget (``SCRAPE_PHASE_BUDGETS[phase]``) or the scrape's
+remaining total (``SCRAPE_DEADLINE_SECONDS``) runs out and raises ``ScrapeDeadlineExceeded``.
+Checkers turn that into a partial ``CheckResult`` when some periods were already scanned.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Dict, Optional
+
+
+class ScrapeDeadlineExceeded(Exception):
+    """A phase (or the whole scrape) ran out of time; the phase's work was cancelled."""
+
+    def __init__(self, phase: str, budget_seconds: float, scope: str = "phase"):
+        self.phase = phase
+        self.budget_seconds = budget_seconds
+        self.scope = scope  # "phase" budget or whole-"scrape" deadline
+        super().__init__(
+            f"Scrape deadline exceeded during {phase.replace('_', ' ')} "
+            f"({budget_seconds:.0f}s {scope} budget)"
+        )
+
+
+class ScrapeDeadline:
+    """Total + per-phase time limits for one scrape (None = unlimited)."""
+
+    def __init__(
+        self,
+        total_seconds: Optional[float] = None,
+        phase_budgets: Optional[Dict[str, float]] = None,
+        clock=time.monotonic,
+    ):
+        self.total_seconds = total_seconds
+        self.phase_budgets = dict(phase_budgets or {})
+        self._clock = clock
+        self.started = clock()
+        self.expired: Optional[ScrapeDeadlineExceeded] = None
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started
+
+    def remaining(self) -> Optional[float]:
+        if self.total_seconds is None:
+            return None
+        return self.total_seconds - self.elapsed()
+
+    def _limit_for(self, phase: str):
+        """(seconds left for this phase, scope, configured budget) — the tighter limit wins."""
+        budget = self.phase_budgets.get(phase)
+        remaining = self.remaining()
+        if remaining is not None and (budget is None or remaining < budget):
+            return max(remaining, 0.0), "scrape", self.total_seconds
+        return budget, "phase", budget
+
+    async def run(self, phase: str, awaitable: Awaitable):
+        """Await `awaitable`, cancelling it when the phase or the whole scrape is out of time."""
+        timeout, scope, budget = self._limit_for(phase)
+        if timeout is None:
+            return await awaitable
+
+        task = asyncio.ensure_future(awaitable)
+        try:
+            done, _pending = await asyncio.wait({task}, timeout=timeout)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        if task in done:
+            return task.result()
+
+        task.cancel()
+        await asyncio.wait({task})
+        if not task.cancelled():
+            task.exception()  # the step finished or failed while being cancelled; its outcome is moot
+        self.expired = ScrapeDeadlineExceeded(phase, budget, scope)
+        raise self.expired
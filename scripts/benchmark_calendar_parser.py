@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Time CalendarParser backends on the saved calendar fixtures (no browser, no network).
+
+Usage (from repo root):
+    python scripts/benchmark_calendar_parser.py [--repeat N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from calendar_parser import CalendarParser, available_backends  # noqa: E402
+from config_template import (  # noqa: E402
+    KANAGAWA_TARGET_FACILITIES,
+    SAITAMA_TARGET_FACILITIES,
+    TARGET_FACILITIES,
+)
+
+FIXTURES = REPO_ROOT / 'tests' / 'fixtures'
+SOURCES = {
+    'tokyo': TARGET_FACILITIES,
+    'kanagawa': KANAGAWA_TARGET_FACILITIES,
+    'saitama': SAITAMA_TARGET_FACILITIES,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200, help='parses per fixture and backend')
+    args = parser.parse_args()
+
+    print(f"{'source':<10} {'backend':<8} {'slots':>5} {'ms/parse':>9}")
+    for source, facilities in SOURCES.items():
+        html = (FIXTURES / f'{source}_calendar_sample.html').read_text(encoding='utf-8')
+        for backend in available_backends():
+            calendar_parser = CalendarParser(facilities, backend=backend)
+            slots = calendar_parser.parse(html)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                calendar_parser.parse(html)
+            per_parse_ms = (time.perf_counter() - start) * 1000 / args.repeat
+            print(f"{source:<10} {backend:<8} {len(slots):>5} {per_parse_ms:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Run the bot's scheduler / cache / notification pipeline against recorded calendars.
+
+Every source is served by ReplayReservationChecker (archived scrapes from the snapshot
+archive, or the saved fixtures), subscribers are synthetic and Telegram sends are only
+counted — no site and no Telegram API is contacted.
+
+Usage (from repo root):
+    python scripts/replay_bot.py [--archive DIR | --fixtures] [--speed N] [--cycles N] [--subscribers N]
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from adaptive_polling import ReleaseHistory  # noqa: E402
+from circuit_breaker import CircuitBreaker  # noqa: E402
+from delivery_queue import DeliveryQueue  # noqa: E402
+from engine_router import EngineRouter  # noqa: E402
+from reservation_checker_replay import (  # noqa: E402
+    CHECK_INTERVAL,
+    REPLAY_ARCHIVE_DIR,
+    ReplayRecording,
+    ReplayReservationChecker,
+)
+from run_bot import SamezuBot  # noqa: E402
+from snapshot_archive import SnapshotArchive  # noqa: E402
+from sources import SOURCES  # noqa: E402
+
+FIXTURES = REPO_ROOT / 'tests' / 'fixtures'
+
+
+def build_bot(workdir: Path, subscribers: int, recordings, speed):
+    """SamezuBot with replay engines, throwaway state files, and counted (not sent) messages."""
+
+    class ReplayBot(SamezuBot):
+        SUBSCRIBERS_FILE = str(workdir / 'subscribers.txt')
+        LAST_NOTIFIED_FILE = str(workdir / 'last_notified.json')
+
+    Path(ReplayBot.SUBSCRIBERS_FILE).write_text(
+        ''.join(f"{100000 + n}\n" for n in range(subscribers)), encoding='utf-8'
+    )
+    bot = ReplayBot()
+    bot.release_history = ReleaseHistory(str(workdir / 'release_history.json'))
+    # Replayed time is compressed, so a back-off would skip recorded scrapes: never open
+    bot.breakers = {source: CircuitBreaker(source, failure_threshold=sys.maxsize) for source in SOURCES.keys()}
+    # Nothing reaches Telegram, so messages are not paced either
+    bot.delivery_queue = DeliveryQueue(rate=sys.maxsize, burst=sys.maxsize, chat_interval=0)
+    for source, live in list(bot.checkers.items()):
+        replay = ReplayReservationChecker(
+            target_url=live.target_url,
+            target_facilities=live.target_facilities,
+            target_slot_types=live.target_slot_types,
+            source_name=source,
+            recording=recordings[source],
+            speed=speed,
+        )
+        bot.checkers[source] = EngineRouter({'replay': replay}, mode='replay')
+
+    bot.sent = Counter()
+
+    async def count_send(chat_id, text, parse_mode='HTML'):
+        bot.sent[chat_id] += 1
+
+    bot._telegram_send = count_send
+    return bot
+
+
+def load_recordings(args):
+    if args.fixtures:
+        recordings = {}
+        for source in SOURCES.keys():
+            fixture = FIXTURES / f'{source}_calendar_sample.html'
+            pages = [[fixture.read_text(encoding='utf-8')]] if fixture.exists() else []
+            recordings[source] = ReplayRecording.from_html(pages * (args.cycles or 1))
+        return recordings
+    archive = SnapshotArchive(args.archive, max_bytes=1)
+    return {source: ReplayRecording.from_archive(archive, source) for source in SOURCES.keys()}
+
+
+async def replay(args):
+    recordings = load_recordings(args)
+    longest = max(recordings.values(), key=len)
+    if not len(longest):
+        raise SystemExit(f"No recorded scrapes under {args.archive} (set SNAPSHOT_ARCHIVE_DIR and run the bot first)")
+    if args.cycles:
+        cycles = args.cycles
+    elif args.speed:
+        cycles = math.ceil(longest.duration / CHECK_INTERVAL) + 1
+    else:
+        cycles = len(longest)
+
+    with tempfile.TemporaryDirectory(prefix='samezu_replay_') as workdir:
+        bot = build_bot(Path(workdir), args.subscribers, recordings, args.speed)
+        cycle_ms = []
+        started = time.perf_counter()
+        for _cycle in range(cycles):
+            cycle_started = time.perf_counter()
+            await bot._run_scheduled_checks()
+            cycle_ms.append((time.perf_counter() - cycle_started) * 1000)
+            if args.speed:
+                await asyncio.sleep(CHECK_INTERVAL / args.speed)
+        wall = time.perf_counter() - started
+
+    served = sum(checker.primary.scrapes_served for checker in bot.checkers.values())
+    print(f"cycles           {cycles}")
+    print(f"scrapes replayed {served} ({served / wall:.1f}/s)")
+    print(f"cycle ms         p50 {statistics.median(cycle_ms):.1f}, max {max(cycle_ms):.1f}")
+    print(f"messages         {sum(bot.sent.values())} to {len(bot.sent)} of {args.subscribers} subscriber(s)")
+    recorded = longest.duration
+    if recorded:
+        print(f"recorded time    {recorded / 3600:.1f}h replayed in {wall:.1f}s ({recorded / wall:.0f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--archive', default=REPLAY_ARCHIVE_DIR, help='snapshot archive directory')
+    source.add_argument('--fixtures', action='store_true',
+                        help='replay the tests/fixtures calendar of each source on every cycle')
+    parser.add_argument('--speed', type=float, default=None,
+                        help='time-compress the recording N× (default: one recorded scrape per cycle)')
+    parser.add_argument('--cycles', type=int, default=None, help='scheduler cycles to run')
+    parser.add_argument('--subscribers', type=int, default=50, help='synthetic default subscribers')
+    parser.add_argument('--verbose', action='store_true', help='keep INFO logging')
+    args = parser.parse_args()
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    asyncio.run(replay(args))
+
+
+if __name__ == '__main__':
+    main()
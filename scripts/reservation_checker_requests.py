@@ -15,6 +15,7 @@ import requests
 from bs4 import BeautifulSoup
 from telegram import Bot
 
+from calendar_parser import CalendarParser
 from config_template import *
 
 try:
@@ -41,6 +42,7 @@ class ReservationChecker:
     def __init__(self):
         self.bot = Bot(token=TELEGRAM_BOT_TOKEN)
         self.available_slots = []
+        self.calendar_parser = CalendarParser(TARGET_FACILITIES)
 
     def _make_session(self):
         session = requests.Session()
@@ -58,17 +60,6 @@ class ReservationChecker:
             if inp.get('name')
         }
 
-    def _get_dates(self, soup) -> List[str]:
-        """Extract date headers from the second table row."""
-        rows = soup.find_all('tr')
-        if len(rows) > 1:
-            return [
-                td.get_text(strip=True)
-                for td in rows[1].find_all('td')
-                if td.get_text(strip=True)
-            ]
-        return []
-
     def _is_end_of_dates(self, soup, nav_button_value) -> bool:
         """Check if the next navigation button is absent or disabled."""
         btn = soup.find('input', {'value': nav_button_value})
@@ -79,55 +70,15 @@ class ReservationChecker:
             return True
         return False
 
-    def _get_available_slots(self, soup, date_headers: List[str]) -> List[Dict]:
-        """Extract available slots from the current page."""
-        available = []
-        rows = soup.find_all('tr')
-
-        for row in rows:
-            facility_cell = row.find(['th', 'td'])
-            if not facility_cell:
-                continue
-
-            facility_text = facility_cell.get_text(strip=True)
-            target_facility = next(
-                (f for f in TARGET_FACILITIES if f in facility_text), None
-            )
-            if not target_facility:
-                continue
-
-            # Get applicant type from second cell
-            cells = row.find_all(['th', 'td'])
-            if len(cells) < 2:
-                continue
-            applicant_type = cells[1].get_text(strip=True)
-
-            # Check date cells (skip first two: facility name + applicant type)
-            date_cells = row.find_all('td')
-            # Filter out the first cells that are facility/applicant info
-            slot_cells = [
-                td for td in date_cells
-                if not any(f in td.get_text() for f in TARGET_FACILITIES)
-                and applicant_type not in td.get_text()
-            ]
-
-            for i, cell in enumerate(slot_cells):
-                svg = cell.find('svg')
-                if not svg:
-                    continue
-                aria_label = svg.get('aria-label', '')
-                if aria_label == '予約可能':
-                    date = date_headers[i] if i < len(date_headers) else f'Unknown date {i+1}'
-                    available.append({
-                        'date': date,
-                        'facility': target_facility,
-                        'applicant_type': applicant_type,
-                    })
-                    logger.info(f"✅ Found slot: {date} - {target_facility} - {applicant_type}")
-                elif aria_label == '空き無':
-                    logger.debug(f"❌ No availability: {date_headers[i] if i < len(date_headers) else i} - {applicant_type}")
-
-        return available
+    def _get_available_slots(self, html: str):
+        """Extract available slots and date headers from the current page."""
+        slots, date_headers = self.calendar_parser.parse_with_headers(html)
+        for slot in slots:
+            logger.info(f"✅ Found slot: {slot.date} - {slot.facility} - {slot.applicant_type}")
+        return [
+            {'date': s.date, 'facility': s.facility, 'applicant_type': s.applicant_type}
+            for s in slots
+        ], date_headers
 
     async def _check_periods(self, session, move_param: str, nav_button_value: str, max_periods: int = 20) -> List[Dict]:
         """Navigate through all available periods and collect slots."""
@@ -164,7 +115,7 @@ class ReservationChecker:
         for period in range(1, max_periods + 1):
             logger.info(f"🔄 Checking period {period}")
 
-            date_headers = self._get_dates(soup)
+            slots, date_headers = self._get_available_slots(resp.text)
             if date_headers:
                 logger.info(f"📅 Dates: {date_headers[0]} to {date_headers[-1]}")
 
@@ -173,8 +124,6 @@ class ReservationChecker:
                 logger.info("🏁 Dates unchanged — reached end of available dates")
                 break
             last_dates = date_headers
-
-            slots = self._get_available_slots(soup, date_headers)
             all_slots.extend(slots)
 
             if slots:
@@ -0,0 +1,205 @@
+"""Bounded on-disk archive of raw calendar HTML, one record per scrape.
+
+Each source gets a directory of numbered segments. ``<seg>.pack`` is an append-only
+concatenation of zlib-compressed period snapshots; ``<seg>.idx`` has one JSON line per
+scrape (scrape id, time, engine, navigation, outcome, coverage, and an ``[offset, length]``
+blob per period). A period whose HTML is byte-identical to one already stored in the current
+segment reuses that blob, so the usual mostly-unchanged calendar costs an index entry,
+not another copy. Once a segment passes ``max_bytes / segments`` a new one is started
+and the oldest segments are deleted (ring buffer). Loading a scrape reads its index line
+and seeks straight to its blobs; nothing else is decompressed.
+
+Checkers collect a scrape's periods in memory and hand them over in one ``write_scrape``
+call, off the event loop, after the scrape has finished.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app_logging import SCRAPER_LOGGER_NAME
+
+logger = logging.getLogger(SCRAPER_LOGGER_NAME)
+
+PACK_SUFFIX = ".pack"
+INDEX_SUFFIX = ".idx"
+
+
+class PeriodSnapshot:
+    """One calendar period as captured: raw HTML plus where it sits in the walk."""
+
+    __slots__ = ("navigation", "slice_index", "period", "html", "kind")
+
+    def __init__(self, navigation: str, slice_index: int, period: int, html: str, kind: str = "table"):
+        self.navigation = navigation
+        self.slice_index = slice_index
+        self.period = period
+        self.html = html
+        self.kind = kind  # "table" = calendar <table> outerHTML, "page" = whole response body
+
+    def meta(self) -> dict:
+        return {
+            "navigation": self.navigation,
+            "slice": self.slice_index,
+            "period": self.period,
+            "kind": self.kind,
+        }
+
+
+class SnapshotArchive:
+    """Per-source ring buffer of compressed calendar snapshots (thread-safe writes)."""
+
+    def __init__(self, directory: str, max_bytes: int, segments: int = 8, level: int = 6):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segments = max(2, segments)
+        self.segment_bytes = max(1, max_bytes // self.segments)
+        self.level = level
+        self._lock = threading.Lock()
+        # source → digest → (offset, length) of blobs in the current segment
+        self._blobs: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self.scrapes_written = 0
+        self.bytes_written = 0
+        self.blobs_reused = 0
+
+    def _source_dir(self, source: str) -> str:
+        return os.path.join(self.directory, source)
+
+    def _segment_numbers(self, source: str) -> List[int]:
+        try:
+            names = os.listdir(self._source_dir(source))
+        except FileNotFoundError:
+            return []
+        return sorted(int(name[: -len(INDEX_SUFFIX)]) for name in names if name.endswith(INDEX_SUFFIX))
+
+    def _path(self, source: str, segment: int, suffix: str) -> str:
+        return os.path.join(self._source_dir(source), f"{segment:06d}{suffix}")
+
+    def _current_segment(self, source: str) -> int:
+        """Segment to append to, rolling over (and dropping the oldest) once it is full."""
+        numbers = self._segment_numbers(source)
+        if not numbers:
+            os.makedirs(self._source_dir(source), exist_ok=True)
+            return self._start_segment(source, 0)
+        current = numbers[-1]
+        pack = self._path(source, current, PACK_SUFFIX)
+        size = os.path.getsize(pack) if os.path.exists(pack) else 0
+        if size < self.segment_bytes:
+            return current
+        current = self._start_segment(source, current + 1)
+        for old in numbers[: max(0, len(numbers) + 1 - self.segments)]:
+            for suffix in (PACK_SUFFIX, INDEX_SUFFIX):
+                try:
+                    os.unlink(self._path(source, old, suffix))
+                except FileNotFoundError:
+                    pass
+            logger.info(f"🗄️ Snapshot archive {source}: dropped segment {old}")
+        return current
+
+    def _start_segment(self, source: str, segment: int) -> int:
+        open(self._path(source, segment, INDEX_SUFFIX), "a").close()
+        self._blobs[source] = {}
+        return segment
+
+    @staticmethod
+    def new_scrape_id() -> str:
+        return datetime.now().strftime("%Y%m%dT%H%M%S%f")
+
+    def write_scrape(
+        self,
+        source: str,
+        scrape_id: str,
+        periods: Sequence[PeriodSnapshot],
+        meta: Optional[dict] = None,
+    ) -> int:
+        """Append one scrape's periods; returns the compressed bytes actually written."""
+        with self._lock:
+            segment = self._current_segment(source)
+            blobs = self._blobs.setdefault(source, {})
+            pack_path = self._path(source, segment, PACK_SUFFIX)
+            written = 0
+            entries = []
+            with open(pack_path, "ab") as pack:
+                offset = pack.tell()
+                for snapshot in periods:
+                    raw = snapshot.html.encode("utf-8")
+                    digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+                    location = blobs.get(digest)
+                    if location is None:
+                        data = zlib.compress(raw, self.level)
+                        pack.write(data)
+                        location = (offset, len(data))
+                        blobs[digest] = location
+                        offset += len(data)
+                        written += len(data)
+                    else:
+                        self.blobs_reused += 1
+                    entries.append({**snapshot.meta(), "blob": list(location)})
+            record = {
+                "scrape_id": scrape_id,
+                "time": time.time(),
+                **(meta or {}),
+                "periods": entries,
+            }
+            with open(self._path(source, segment, INDEX_SUFFIX), "a", encoding="utf-8") as index:
+                index.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.scrapes_written += 1
+            self.bytes_written += written
+            return written
+
+    def scrapes(self, source: str) -> List[dict]:
+        """Index records (oldest first) with their segment number; torn lines are skipped."""
+        records = []
+        for segment in self._segment_numbers(source):
+            try:
+                with open(self._path(source, segment, INDEX_SUFFIX), "r", encoding="utf-8") as index:
+                    lines = index.readlines()
+            except FileNotFoundError:
+                continue  # dropped by a concurrent rollover
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                record["segment"] = segment
+                records.append(record)
+        return records
+
+    def load(self, source: str, scrape_id: str) -> List[Tuple[dict, str]]:
+        """(period meta, html) for every period of one archived scrape, in capture order."""
+        record = next((r for r in self.scrapes(source) if r["scrape_id"] == scrape_id), None)
+        if record is None:
+            raise KeyError(f"no archived scrape {scrape_id} for {source}")
+        return self.load_record(source, record)
+
+    def load_record(self, source: str, record: dict) -> List[Tuple[dict, str]]:
+        periods = []
+        with open(self._path(source, record["segment"], PACK_SUFFIX), "rb") as pack:
+            for entry in record["periods"]:
+                offset, length = entry["blob"]
+                pack.seek(offset)
+                html = zlib.decompress(pack.read(length)).decode("utf-8")
+                meta = {key: value for key, value in entry.items() if key != "blob"}
+                periods.append((meta, html))
+        return periods
+
+    def disk_bytes(self, source: str) -> int:
+        total = 0
+        for segment in self._segment_numbers(source):
+            for suffix in (PACK_SUFFIX, INDEX_SUFFIX):
+                path = self._path(source, segment, suffix)
+                if os.path.exists(path):
+                    total += os.path.getsize(path)
+        return total
+
+    def status_line(self) -> str:
+        return (
+            f"{self.scrapes_written} scrape(s) archived, {self.bytes_written / 1024:.0f} KB written, "
+            f"{self.blobs_reused} unchanged period(s) deduplicated"
+        )
@@ -0,0 +1,251 @@
+"""Monitored sources: one ``SourceSpec`` per reservation calendar the bot scrapes.
+
+run_bot.py builds every per-source piece (checker, cache, scrape lock, scheduler state,
+/status and /link lines) from ``SOURCES``, and resolves command keywords through the
+lookup tables below instead of per-source if-chains. The three built-in sources come from
+the TARGET_* / KANAGAWA_* / SAITAMA_* settings; further offers are added with
+``EXTRA_SOURCES`` entries in config.py (see config_template.py).
+
+Keywords:
+  * an *alias* names (part of) a source in /check and /subscribe — ``samezu`` and
+    ``fuchu`` are single Tokyo facilities, ``kanagawa`` is the whole Kanagawa offer.
+    Subscriptions store aliases, so existing subscriber lines keep their meaning.
+  * a *type filter* names the slot types a subscription keeps for that source
+    (``am`` → 普通車ＡＭ); ``all`` keeps everything and ``relevant`` (or any filter the
+    source does not define) keeps the source's default ``slot_types``.
+"""
+
+import html
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# Import all template values as defaults
+from config_template import *
+
+# Try to override with config values if they exist
+try:
+    import config
+    # Override template values with config values (if they exist)
+    for var in dir(config):
+        if not var.startswith('_') and var.isupper():
+            globals()[var] = getattr(config, var)
+except ImportError:
+    pass  # Use template values only
+
+ALL_TYPES = "all"
+RELEVANT_TYPES = "relevant"
+# Subscription-type keywords shared by every source
+COMMON_TYPE_KEYWORDS = {
+    "all": ALL_TYPES,
+    "すべて": ALL_TYPES,
+    "全て": ALL_TYPES,
+    "relevant": RELEVANT_TYPES,
+}
+
+
+@dataclass(frozen=True)
+class SourceSpec:
+    """One monitored calendar and how commands and subscriptions address it."""
+
+    key: str  # scrape key: checker / cache / lock / last_notified bucket
+    label: str
+    url: str
+    facilities: Tuple[str, ...]
+    slot_types: Tuple[str, ...]  # default ("relevant") slot types
+    emoji: str = "📍"
+    description: str = ""  # shown next to the label in /help and /link
+    # alias → facility it narrows to (None = the whole source)
+    aliases: Mapping[str, Optional[str]] = field(default_factory=dict)
+    # subscription type → slot types kept for this source
+    type_filters: Mapping[str, Tuple[str, ...]] = field(default_factory=dict)
+    # extra keyword → type filter name (e.g. Japanese spellings)
+    type_keywords: Mapping[str, str] = field(default_factory=dict)
+    default_subscribe: bool = False  # included in a bare /subscribe
+    engine: Optional[str] = None  # None = SCRAPE_ENGINE
+    # Scheduled scrapes (scheduling.py): None = CHECK_INTERVAL / staggered phase / SCHEDULE_JITTER
+    interval: Optional[float] = None
+    phase: Optional[float] = None
+    jitter: Optional[float] = None
+
+    @property
+    def engine_mode(self) -> str:
+        return self.engine or SCRAPE_ENGINE
+
+    def checker_kwargs(self) -> dict:
+        return {
+            "target_url": self.url,
+            "target_facilities": list(self.facilities),
+            "target_slot_types": list(self.slot_types),
+            "source_name": self.key,
+        }
+
+    def keep_types(self, subscription_type: str) -> Optional[List[str]]:
+        """Slot types a subscription of this type keeps for this source (None = all)."""
+        if subscription_type == ALL_TYPES:
+            return None
+        return list(self.type_filters.get(subscription_type, self.slot_types))
+
+    def facility_filter(self, aliases: Iterable[str]) -> Optional[List[str]]:
+        """Facilities the given aliases of this source select (None = the whole source)."""
+        selected = []
+        for alias in aliases:
+            if alias not in self.aliases:
+                continue
+            facility = self.aliases[alias]
+            if facility is None:
+                return None
+            if facility not in selected:
+                selected.append(facility)
+        if set(self.facilities) <= set(selected):
+            return None
+        return selected
+
+    def type_label(self, subscription_type: str) -> str:
+        """/subscribe confirmation text for a type filter of this source."""
+        if subscription_type in self.type_filters:
+            types = " &amp; ".join(html.escape(t) for t in self.type_filters[subscription_type])
+            return f"{types} only ({html.escape(self.label)})"
+        types = " &amp; ".join(html.escape(t) for t in self.slot_types) or "all types"
+        return f"{types} ({html.escape(self.label)})"
+
+
+def _schedule(key: str, entry: Mapping = None) -> dict:
+    """interval / phase / jitter of a source: its own entry, then SOURCE_SCHEDULES[key]."""
+    fields = {name: (entry or {}).get(name) for name in ("interval", "phase", "jitter")}
+    fields.update(SOURCE_SCHEDULES.get(key, {}))
+    return fields
+
+
+def source_from_config(entry: Mapping) -> SourceSpec:
+    """SourceSpec from an EXTRA_SOURCES dict (key, label, url, facilities, slot_types, ...)."""
+    key = entry["key"]
+    return SourceSpec(
+        key=key,
+        label=entry.get("label", key.title()),
+        url=entry["url"],
+        facilities=tuple(entry["facilities"]),
+        slot_types=tuple(entry.get("slot_types", ())),
+        emoji=entry.get("emoji", "📍"),
+        description=entry.get("description", ""),
+        aliases=dict(entry.get("aliases") or {key: None}),
+        type_filters={name: tuple(types) for name, types in (entry.get("type_filters") or {}).items()},
+        type_keywords=dict(entry.get("type_keywords") or {}),
+        default_subscribe=entry.get("default_subscribe", False),
+        engine=entry.get("engine"),
+        **_schedule(key, entry),
+    )
+
+
+def builtin_sources() -> List[SourceSpec]:
+    return [
+        SourceSpec(
+            key="tokyo",
+            label="Tokyo",
+            emoji="🗼",
+            description="府中・鮫洲",
+            url=TARGET_URL,
+            facilities=tuple(TARGET_FACILITIES),
+            slot_types=tuple(TARGET_SLOT_TYPES),
+            aliases={"samezu": "鮫洲試験場", "fuchu": "府中試験場"},
+            type_filters={"ari": ("住民票のある方",), "nai": ("住民票のない方",)},
+            type_keywords={"ある方": "ari", "ない方": "nai"},
+            default_subscribe=True,
+            **_schedule("tokyo"),
+        ),
+        SourceSpec(
+            key="kanagawa",
+            label="Kanagawa",
+            emoji="🏔",
+            description="外国免許四輪車",
+            url=KANAGAWA_TARGET_URL,
+            facilities=tuple(KANAGAWA_TARGET_FACILITIES),
+            slot_types=tuple(KANAGAWA_TARGET_SLOT_TYPES),
+            aliases={"kanagawa": None},
+            type_filters={"am": ("普通車ＡＭ",), "pm": ("普通車ＰＭ",)},
+            default_subscribe=True,
+            engine=KANAGAWA_SCRAPE_ENGINE,
+            **_schedule("kanagawa"),
+        ),
+        SourceSpec(
+            key="saitama",
+            label="Saitama",
+            emoji="🌻",
+            description="外免　書類審査",
+            url=SAITAMA_TARGET_URL,
+            facilities=tuple(SAITAMA_TARGET_FACILITIES),
+            slot_types=tuple(SAITAMA_TARGET_SLOT_TYPES),
+            aliases={"saitama": None},
+            type_filters={
+                "1": ("【１】１回目（初めて）",),
+                "2": ("【２】２回目以降",),
+                "3": ("【３】免除国等",),
+            },
+            default_subscribe=False,  # opt-in only
+            engine=SAITAMA_SCRAPE_ENGINE,
+            **_schedule("saitama"),
+        ),
+    ]
+
+
+class SourceRegistry:
+    """Sources by key plus the keyword lookup tables derived from them."""
+
+    def __init__(self, specs: Sequence[SourceSpec]):
+        self.sources: Dict[str, SourceSpec] = {}
+        self.by_alias: Dict[str, SourceSpec] = {}
+        self.type_keywords: Dict[str, str] = dict(COMMON_TYPE_KEYWORDS)
+        for spec in specs:
+            if spec.key in self.sources:
+                raise ValueError(f"duplicate source key {spec.key!r}")
+            self.sources[spec.key] = spec
+            for alias in spec.aliases:
+                if alias in self.by_alias:
+                    raise ValueError(
+                        f"alias {alias!r} of {spec.key!r} already names {self.by_alias[alias].key!r}"
+                    )
+                self.by_alias[alias] = spec
+            for name in spec.type_filters:
+                self.type_keywords.setdefault(name, name)
+            for keyword, name in spec.type_keywords.items():
+                self.type_keywords.setdefault(keyword, name)
+        if not self.sources:
+            raise ValueError("no sources configured")
+        self.default = next(iter(self.sources.values()))  # /check without a source keyword
+        self.default_subscription = [
+            alias for spec in self.sources.values() if spec.default_subscribe for alias in spec.aliases
+        ]
+
+    def __getitem__(self, key: str) -> SourceSpec:
+        return self.sources[key]
+
+    def __iter__(self):
+        return iter(self.sources.values())
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def keys(self) -> Tuple[str, ...]:
+        return tuple(self.sources)
+
+    def for_alias(self, alias: Optional[str]) -> SourceSpec:
+        """Source a /check keyword names (None or unknown = the default source)."""
+        return self.by_alias.get(alias, self.default)
+
+    def facility_filter(self, alias: Optional[str]) -> Optional[List[str]]:
+        """Facility narrowing of a /check keyword (None = none beyond the source's own)."""
+        spec = self.by_alias.get(alias)
+        if spec is None:
+            return None
+        return spec.facility_filter([alias])
+
+    def subscribed(self, aliases: Iterable[str]) -> Dict[str, List[str]]:
+        """Subscribed aliases grouped by source key (unknown aliases are ignored)."""
+        grouped: Dict[str, List[str]] = {}
+        for alias in aliases:
+            spec = self.by_alias.get(alias)
+            if spec is not None:
+                grouped.setdefault(spec.key, []).append(alias)
+        return grouped
+
+
+SOURCES = SourceRegistry(builtin_sources() + [source_from_config(entry) for entry in EXTRA_SOURCES])
@@ -21,3 +21,11 @@ def chromium_available():
     except Exception as exc:
         pytest.skip(f"Chromium not launchable ({exc}). Install with: playwright install chromium")
     return True
+
+
+@pytest.fixture(autouse=True)
+def isolated_release_history(tmp_path, monkeypatch):
+    """Keep bots built by tests from reading or growing ./release_history.json."""
+    import run_bot
+
+    monkeypatch.setattr(run_bot, "RELEASE_HISTORY_FILE", str(tmp_path / "release_history.json"))
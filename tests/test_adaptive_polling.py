@@ -0,0 +1,91 @@
+"""Adaptive polling: release history → time-of-week profile → per-window intervals."""
+
+from datetime import datetime
+
+import pytest
+
+from adaptive_polling import JST, PollingPlanner, ReleaseHistory, allocate_rates, bucket_of
+from run_bot import SamezuBot
+from scheduling import SourceSchedule
+from tests.test_helpers import CHECK_TOKYO_ARI
+
+MONDAY_9 = datetime(2026, 6, 1, 9, 10, tzinfo=JST).timestamp()
+WEEK = 7 * 86400
+
+
+def _planner(tmp_path, releases, **kwargs):
+    history = ReleaseHistory(str(tmp_path / "history.json"), clock=lambda: MONDAY_9)
+    for weeks_ago in range(releases):
+        history.record("tokyo", when=MONDAY_9 - weeks_ago * WEEK)
+    return PollingPlanner(history, min_interval=60, max_interval=900, min_releases=5, **kwargs)
+
+
+def test_release_window_is_polled_faster_with_the_same_weekly_budget(tmp_path):
+    planner = _planner(tmp_path, releases=8)
+    plan = planner.intervals("tokyo", scrapes_per_hour=12, now=MONDAY_9)
+
+    hot = plan[bucket_of(MONDAY_9, 30)]
+    quiet = plan[bucket_of(MONDAY_9 + 3 * 86400, 30)]
+    assert hot == pytest.approx(60)
+    assert quiet > 300
+    assert all(60 - 1e-6 <= interval <= 900 + 1e-6 for interval in plan)
+    assert sum(1 / interval for interval in plan) / len(plan) * 3600 == pytest.approx(12)
+    assert "busiest Mon 09:00 JST" in planner.status_line("tokyo", 12, now=MONDAY_9)
+
+
+def test_no_hour_goes_over_the_per_hour_cap(tmp_path):
+    planner = _planner(tmp_path, releases=8)
+    plan = planner.intervals("tokyo", scrapes_per_hour=12, now=MONDAY_9, max_per_hour=20)
+
+    per_hour = [1800 / plan[b] + 1800 / plan[b + 1] for b in range(0, len(plan), 2)]
+    assert max(per_hour) <= 20 + 1e-6
+    assert plan[bucket_of(MONDAY_9, 30)] == pytest.approx(180)
+    assert sum(1 / interval for interval in plan) / len(plan) * 3600 <= 12 + 1e-6
+
+
+def test_thin_history_keeps_the_flat_interval_and_history_persists(tmp_path):
+    planner = _planner(tmp_path, releases=4)
+    assert planner.interval_for("tokyo", 12, now=MONDAY_9) == 300
+
+    reloaded = ReleaseHistory(str(tmp_path / "history.json"))
+    assert len(reloaded.events("tokyo")) == 4
+
+
+def test_allocation_respects_clamps_when_budget_is_extreme():
+    assert allocate_rates([0.9, 0.1], mean_rate=1.0, min_rate=0.1, max_rate=0.5) == [0.5, 0.5]
+    rates = allocate_rates([1.0, 0.0, 0.0, 0.0], mean_rate=0.2, min_rate=0.1, max_rate=0.5)
+    assert rates[0] == pytest.approx(0.5) and rates[1] == pytest.approx(0.1)
+
+
+def test_retune_keeps_the_grid_and_tightens_from_the_last_due_time():
+    clock = [0.0]
+    schedule = SourceSchedule("tokyo", 300, anchor=0.0, clock=lambda: clock[0])
+    clock[0] = 20.0
+    schedule.started()
+    schedule.finished()
+
+    schedule.retune(60)
+    assert schedule.next_due == 60
+    schedule.retune(900)  # relaxing never pushes the already-planned run later
+    assert schedule.next_due == 60
+
+
+@pytest.mark.asyncio
+async def test_scheduler_records_a_release_only_when_new_slots_appear():
+    bot = SamezuBot()
+    bot._persist_last_notified = lambda: None
+    bot.last_notified["tokyo"] = None
+
+    async def fake_run_check(*args, **kwargs):
+        return CHECK_TOKYO_ARI
+
+    async def no_send(*args, **kwargs):
+        return None
+
+    bot.reservation_checker.run_check = fake_run_check
+    bot._send_notifications_to_subscribers = no_send
+    for _ in range(2):
+        bot.last_scheduled_fingerprint.clear()
+        await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+
+    assert [count for _when, count in bot.release_history.events("tokyo")] == [1]
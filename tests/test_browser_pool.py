@@ -0,0 +1,241 @@
+"""Shared Chromium pool: reuse, recycle, crash relaunch (Playwright mocked)."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from browser_pool import BrowserPool, MemoryRefused, process_memory_mb, process_tree_rss_mb
+from reservation_checker_playwright import ReservationChecker
+
+
+def _mock_browser():
+    browser = MagicMock()
+    browser.is_connected = MagicMock(return_value=True)
+    browser.close = AsyncMock()
+    context = AsyncMock()
+    context.close = AsyncMock()
+    context.on = MagicMock()
+    browser.new_context = AsyncMock(return_value=context)
+    return browser
+
+
+def _playwright_patch(browsers):
+    mock_pw = MagicMock()
+    mock_pw.chromium.launch = AsyncMock(side_effect=browsers)
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=mock_pw)
+    cm.__aexit__ = AsyncMock(return_value=None)
+    return patch("browser_pool.async_playwright", return_value=cm), mock_pw
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_one_browser_across_scrapes():
+    browsers = [_mock_browser()]
+    patcher, mock_pw = _playwright_patch(browsers)
+    pool = BrowserPool(max_scrapes=10)
+    with patcher:
+        for _ in range(3):
+            async with pool.context() as context:
+                assert context is browsers[0].new_context.return_value
+        await pool.close()
+
+    assert mock_pw.chromium.launch.await_count == 1
+    assert pool.pages_served == 3
+    assert browsers[0].new_context.await_count == 3
+    assert browsers[0].new_context.return_value.close.await_count == 3
+    assert pool.last_launch_seconds is not None
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_after_max_scrapes():
+    browsers = [_mock_browser(), _mock_browser()]
+    patcher, mock_pw = _playwright_patch(browsers)
+    pool = BrowserPool(max_scrapes=2)
+    with patcher:
+        for _ in range(3):
+            async with pool.context():
+                pass
+
+    assert mock_pw.chromium.launch.await_count == 2
+    browsers[0].close.assert_awaited_once()
+    assert pool.scrapes_since_launch == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_relaunches_after_crash():
+    browsers = [_mock_browser(), _mock_browser()]
+    patcher, mock_pw = _playwright_patch(browsers)
+    pool = BrowserPool(max_scrapes=0)
+    with patcher:
+        async with pool.context():
+            pass
+        browsers[0].is_connected.return_value = False
+        async with pool.context() as context:
+            assert context is browsers[1].new_context.return_value
+
+    assert mock_pw.chromium.launch.await_count == 2
+    assert pool.launches == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_request_recycle_relaunches_on_next_lease():
+    browsers = [_mock_browser(), _mock_browser()]
+    patcher, mock_pw = _playwright_patch(browsers)
+    pool = BrowserPool(max_scrapes=0)
+    with patcher:
+        async with pool.context():
+            pass
+        pool.request_recycle()
+        async with pool.context():
+            pass
+
+    assert mock_pw.chromium.launch.await_count == 2
+    browsers[0].close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_checker_with_pool_does_not_launch_private_browser():
+    browsers = [_mock_browser()]
+    patcher, _mock_pw = _playwright_patch(browsers)
+    pool = BrowserPool()
+    checker = ReservationChecker(browser_pool=pool)
+    checker.check_all_weeks = AsyncMock(return_value=[])
+
+    with patcher, patch("reservation_checker_playwright.async_playwright") as private, \
+            patch.object(checker, "wait_for_page_load", AsyncMock()):
+        check = await checker.run_check()
+
+    private.assert_not_called()
+    assert not check.is_error
+    assert pool.pages_served == 1
+
+
+def test_process_tree_rss_reports_current_process():
+    rss = process_tree_rss_mb()
+    if rss is None:
+        pytest.skip("/proc not available")
+    assert rss > 0
+
+
+def test_process_memory_splits_bot_from_its_children():
+    memory = process_memory_mb()
+    if memory is None:
+        pytest.skip("/proc not available")
+    bot_mb, tree_mb = memory
+    assert 0 < bot_mb <= tree_mb
+
+
+@pytest.mark.asyncio
+async def test_pool_refuses_lease_above_hard_limit_and_checker_reports_refused():
+    browsers = [_mock_browser()]
+    patcher, _mock_pw = _playwright_patch(browsers)
+    pool = BrowserPool(max_rss_mb=None, refuse_rss_mb=500)
+    checker = ReservationChecker(browser_pool=pool, source_name="kanagawa")
+    checker.invalidate_storage_state = MagicMock()
+
+    with patcher, patch("browser_pool.process_memory_mb", return_value=(150.0, 800.0)):
+        with pytest.raises(MemoryRefused):
+            async with pool.context():
+                pass
+        check = await checker.run_check()
+
+    assert check.is_error
+    assert checker.last_outcome == "refused"
+    checker.invalidate_storage_state.assert_not_called()
+    assert pool.refusals == 2
+    assert "2 refused" in pool.status_line()
+
+
+@pytest.mark.asyncio
+async def test_watchdog_closes_idle_browser_above_soft_limit():
+    browsers = [_mock_browser(), _mock_browser()]
+    patcher, mock_pw = _playwright_patch(browsers)
+    pool = BrowserPool(max_scrapes=0, max_rss_mb=700)
+    with patcher:
+        with patch("browser_pool.process_memory_mb", return_value=(150.0, 400.0)):
+            async with pool.context():
+                pass
+            await pool.check_memory()
+        browsers[0].close.assert_not_awaited()
+
+        with patch("browser_pool.process_memory_mb", return_value=(150.0, 900.0)):
+            await pool.check_memory()
+        browsers[0].close.assert_awaited_once()
+
+        with patch("browser_pool.process_memory_mb", return_value=(150.0, 300.0)):
+            async with pool.context():
+                pass
+
+    assert mock_pw.chromium.launch.await_count == 2
+    assert (pool.memory_recycles, pool.crashes) == (1, 0)
+    assert pool.peak_rss_mb == 900.0
+
+
+@pytest.mark.asyncio
+async def test_scrape_accounts_requests_and_bytes_per_resource_type():
+    checker = ReservationChecker(source_name="tokyo")
+    context = AsyncMock()
+    context.on = MagicMock()
+    await checker._prepare_page(context)
+    block_resource = context.route.await_args.args[1]
+    count_bytes = context.on.call_args.args[1]
+
+    def request(resource_type, body=0):
+        req = MagicMock(resource_type=resource_type)
+        req.sizes = AsyncMock(return_value={'responseBodySize': body, 'responseHeadersSize': 100})
+        return req
+
+    for resource_type in ("document", "script", "script", "image", "font"):
+        route = AsyncMock()
+        await block_resource(route, request(resource_type))
+    await count_bytes(request("document", body=20 * 1024 - 100))
+    await count_bytes(request("script", body=4 * 1024 - 100))
+    await count_bytes(request("script", body=4 * 1024 - 100))
+
+    with patch("reservation_checker_playwright.process_memory_mb", return_value=(120.0, 120.0)):
+        checker._record_resources()
+
+    resources = checker.last_resources
+    assert (resources['requests'], resources['blocked'], resources['bytes']) == (3, 2, 28 * 1024)
+    assert resources['by_type']['script'] == {'requests': 2, 'blocked': 0, 'bytes': 8 * 1024}
+    line = checker.resource_status_line()
+    assert line.startswith("3 request(s), 2 blocked, 28 KB (document 1/20 KB, script 2/8 KB)")
+    assert "RSS bot 120 MB + browser 0 MB" in line
+
+
+@pytest.mark.asyncio
+async def test_late_byte_counts_are_settled_and_charged_to_their_own_scrape():
+    checker = ReservationChecker(source_name="tokyo")
+    context = AsyncMock()
+    context.on = MagicMock()
+    await checker._prepare_page(context)
+    count_bytes = context.on.call_args.args[1]
+    sizes_ready = asyncio.Event()
+
+    def request(body):
+        async def sizes():
+            await sizes_ready.wait()
+            return {'responseBodySize': body, 'responseHeadersSize': 0}
+        return MagicMock(resource_type="document", sizes=sizes)
+
+    # Playwright runs async listeners as tasks; sizes() resolves after the page is done with
+    asyncio.create_task(count_bytes(request(8 * 1024)))
+    await asyncio.sleep(0)
+    asyncio.get_running_loop().call_soon(sizes_ready.set)
+    await checker._settle_byte_counts()
+    with patch("reservation_checker_playwright.process_memory_mb", return_value=None):
+        checker._record_resources()
+    assert checker.last_resources['bytes'] == 8 * 1024
+
+    # A straggler that outlives the settle window still never lands in the next scrape
+    sizes_ready.clear()
+    straggler = asyncio.create_task(count_bytes(request(4 * 1024)))
+    await asyncio.sleep(0)
+    with patch("reservation_checker_playwright.BYTE_COUNT_SETTLE_SECONDS", 0):
+        await checker._settle_byte_counts()
+    with patch("reservation_checker_playwright.process_memory_mb", return_value=None):
+        checker._record_resources()
+    sizes_ready.set()
+    await straggler
+    assert checker._resources == {}
@@ -0,0 +1,192 @@
+"""Learned calendar horizon: one probe per period, adaptive walk limit, growth detection."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from reservation_checker_playwright import PERIOD_STATE_JS, ReservationChecker
+from tests.test_sliced_navigation import LAST_PERIOD, RelativePagingSite, _http_checker
+
+
+class PagedCalendar:
+    """Fake page whose PERIOD_STATE_JS answers come from a calendar of `periods` periods."""
+
+    def __init__(self, periods):
+        self.periods = periods
+        self.position = 0
+        self.probes = 0
+        self.evaluate = AsyncMock(side_effect=self._evaluate)
+        self.click = AsyncMock(side_effect=self._click)
+        self.wait_for_selector = AsyncMock()
+        self.query_selector = AsyncMock()
+
+    async def _evaluate(self, script, arg=None):
+        if script != PERIOD_STATE_JS:
+            return f"fingerprint {self.position}"
+        self.probes += 1
+        last = self.position >= self.periods - 1
+        return {'end': False, 'next': 'disabled' if last else 'enabled', 'lastDate': f"period {self.position}"}
+
+    async def _click(self, selector):
+        self.position += 1
+
+
+def _checker():
+    checker = ReservationChecker()
+    checker.wait_for_page_load = AsyncMock()
+    checker.get_available_dates = AsyncMock(return_value=[])
+    checker._wait_for_calendar_ready = AsyncMock(return_value=True)
+    return checker
+
+
+@pytest.mark.asyncio
+async def test_one_probe_per_period_and_horizon_is_learned():
+    checker = _checker()
+    page = PagedCalendar(periods=5)
+
+    await checker._check_periods(page, "week")
+
+    assert page.probes == 5
+    assert page.click.await_count == 4
+    page.query_selector.assert_not_called()
+    assert checker.horizon.expected("week") == 5
+    assert checker.horizon.last_date["week"] == "period 4"
+    assert "horizon 5 weeks to period 4" in checker.session_status_line()
+
+
+@pytest.mark.asyncio
+async def test_walk_extends_past_limit_when_calendar_grows():
+    checker = _checker()
+    with patch("reservation_checker_playwright.PERIOD_LIMIT", 3), \
+            patch("reservation_checker_playwright.PERIOD_HORIZON_MARGIN", 2):
+        await checker._check_periods(PagedCalendar(periods=5), "week")
+        assert checker.horizon.limit("week") == 7
+        page = PagedCalendar(periods=9)
+        await checker._check_periods(page, "week")
+
+    assert page.probes == 9
+    assert checker.horizon.expected("week") == 9
+
+
+@pytest.mark.asyncio
+async def test_max_limit_stops_a_calendar_that_never_ends():
+    checker = _checker()
+    page = PagedCalendar(periods=1000)
+    with patch("reservation_checker_playwright.PERIOD_LIMIT", 2), \
+            patch("reservation_checker_playwright.PERIOD_MAX_LIMIT", 4):
+        await checker._check_periods(page, "week")
+
+    assert page.probes == 4
+    assert page.click.await_count == 3
+    assert checker.horizon.expected("week") is None  # an unfinished walk teaches nothing
+
+
+@pytest.mark.asyncio
+async def test_http_walk_learns_horizon_without_trailing_request():
+    site = RelativePagingSite()
+    checker = _http_checker(site)
+    with patch("reservation_checker_playwright.PERIOD_LIMIT", 3):
+        check = await checker.run_check()
+
+    assert len(check.slots) == LAST_PERIOD + 1
+    assert checker.horizon.expected("week") == LAST_PERIOD + 1
+    assert [method for method, _sid in site.requests].count("POST") == LAST_PERIOD
+
+
+@pytest.mark.asyncio
+async def test_walk_to_the_end_marks_result_calendar_complete():
+    site = RelativePagingSite()
+    checker = _http_checker(site)
+    complete = await checker.run_check()
+    with patch("reservation_checker_playwright.PERIOD_MAX_LIMIT", 3), \
+            patch("reservation_checker_playwright.PERIOD_LIMIT", 3):
+        checker.horizon = type(checker.horizon)()
+        cut_short = await checker.run_check()
+
+    assert complete.calendar_complete
+    assert complete.covered_through == "11/20"
+    assert not cut_short.calendar_complete
+    assert cut_short.covered_through == "09/11"
+
+
+class SlowCalendar(PagedCalendar):
+    """PagedCalendar whose clicks land only on the next readiness wait (None = never)."""
+
+    def __init__(self, periods, lands_after_waits):
+        super().__init__(periods)
+        self.lands_after_waits = lands_after_waits
+        self.pending = 0
+
+    async def _click(self, selector):
+        self.pending = self.lands_after_waits or 0
+
+    def wait_for_ready(self, *args, **kwargs):
+        if self.lands_after_waits is not None:
+            self.pending -= 1
+            if self.pending == 0:
+                self.position += 1
+        return False  # the transition wait always times out
+
+
+@pytest.mark.asyncio
+async def test_slow_transition_is_rescanned_instead_of_ending_the_walk():
+    checker = _checker()
+    page = SlowCalendar(periods=5, lands_after_waits=2)
+    checker._wait_for_calendar_ready = AsyncMock(side_effect=page.wait_for_ready)
+    checker._begin_deadline()
+
+    await checker._check_periods(page, "week")
+
+    assert page.position == 4 and checker._periods_scanned == 5
+    assert checker.horizon.expected("week") == 5 and checker._calendar_complete
+
+
+class OpenEndedCalendar(PagedCalendar):
+    """PagedCalendar whose last period keeps an enabled next button; clicking it changes nothing."""
+
+    async def _evaluate(self, script, arg=None):
+        state = await super()._evaluate(script, arg)
+        if script == PERIOD_STATE_JS:
+            state['next'] = 'enabled'
+        return state
+
+    async def _click(self, selector):
+        self.position = min(self.position + 1, self.periods - 1)
+
+    def wait_for_ready(self, page, ceiling_ms, previous=None):
+        return previous != f"fingerprint {self.position}"  # times out unless the dates changed
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("readiness_mode", ["event", "fixed"])
+async def test_end_page_with_enabled_next_button_is_the_end(readiness_mode):
+    checker = _checker()
+    page = OpenEndedCalendar(periods=5)
+    page.wait_for_timeout = AsyncMock()
+    if readiness_mode == "event":
+        checker._wait_for_calendar_ready = AsyncMock(side_effect=page.wait_for_ready)
+    else:
+        del checker._wait_for_calendar_ready  # the real fixed sleep, which never observes the dates
+    checker._begin_deadline()
+
+    with patch("reservation_checker_playwright.READINESS_MODE", readiness_mode):
+        await checker._check_periods(page, "week")
+
+    assert checker._periods_scanned == 5
+    assert checker.horizon.expected("week") == 5
+    assert checker._calendar_complete and checker._covered_through == "period 4"
+
+
+@pytest.mark.asyncio
+async def test_transition_that_fails_is_a_navigation_failure_not_the_end():
+    checker = _checker()
+    page = SlowCalendar(periods=5, lands_after_waits=None)
+    page.wait_for_selector = AsyncMock(side_effect=TimeoutError("no table"))
+    checker._wait_for_calendar_ready = AsyncMock(side_effect=page.wait_for_ready)
+    checker._begin_deadline()
+
+    await checker._check_periods(page, "week")
+
+    assert checker._periods_scanned == 1
+    assert checker.horizon.expected("week") is None
+    assert not checker._calendar_complete and checker._covered_through == "period 0"
@@ -0,0 +1,102 @@
+"""Single-round-trip extraction: matrix → Slots matches the DOM walk on saved fixtures."""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from bs4 import BeautifulSoup
+
+from config_template import (
+    KANAGAWA_TARGET_FACILITIES,
+    SAITAMA_TARGET_FACILITIES,
+    TARGET_FACILITIES,
+)
+from reservation_checker_playwright import CALENDAR_MATRIX_JS, ReservationChecker
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+def _matrix_from_html(html: str):
+    """What CALENDAR_MATRIX_JS returns for this markup (textContent ≈ get_text())."""
+    soup = BeautifulSoup(html, 'html.parser')
+    rows = []
+    for tr in soup.find_all('tr'):
+        row = []
+        for cell in tr.find_all(['th', 'td']):
+            svg = cell.find('svg')
+            sr_only = cell.find(class_='sr-only')
+            row.append([
+                cell.name,
+                cell.get_text(),
+                svg.get('aria-label') if svg else None,
+                sr_only.get_text() if sr_only else None,
+            ])
+        rows.append(row)
+    return rows
+
+
+def _checker(facilities, source):
+    return ReservationChecker(target_facilities=facilities, target_slot_types=[], source_name=source)
+
+
+def test_matrix_kanagawa_fixture_finds_rowspan_pm_slots():
+    checker = _checker(KANAGAWA_TARGET_FACILITIES, 'kanagawa')
+    html = (FIXTURES / 'kanagawa_calendar_sample.html').read_text(encoding='utf-8')
+    slots, headers = checker._slots_from_matrix(_matrix_from_html(html))
+
+    assert headers and '08/09' in headers[0]
+    relevant = [s for s in slots if s.applicant_type in ('普通車ＡＭ', '普通車ＰＭ')]
+    assert {(s.applicant_type, s.date[:5]) for s in relevant} == {
+        ('普通車ＡＭ', '08/14'),
+        ('普通車ＰＭ', '08/13'),
+        ('普通車ＰＭ', '08/14'),
+    }
+    assert all(s.facility == '外国免許四輪車' for s in slots)
+
+
+def test_matrix_saitama_fixture_carries_facility_across_rowspan():
+    checker = _checker(SAITAMA_TARGET_FACILITIES, 'saitama')
+    html = (FIXTURES / 'saitama_calendar_sample.html').read_text(encoding='utf-8')
+    slots, _headers = checker._slots_from_matrix(_matrix_from_html(html))
+
+    by_type = {s.applicant_type: s for s in slots}
+    assert set(by_type) == {'【１】１回目（初めて）', '【２】２回目以降', '【３】免除国等'}
+    assert '08/26' in by_type['【１】１回目（初めて）'].date
+
+
+def test_matrix_tokyo_fixture_open_slot():
+    checker = _checker(TARGET_FACILITIES, 'tokyo')
+    html = (FIXTURES / 'tokyo_calendar_sample.html').read_text(encoding='utf-8')
+    slots, _headers = checker._slots_from_matrix(_matrix_from_html(html))
+
+    assert len(slots) == 1
+    assert slots[0].facility == '鮫洲試験場'
+    assert '08/21' in slots[0].date
+
+
+def test_matrix_falls_back_to_sr_only_date_beyond_headers():
+    checker = _checker(['鮫洲試験場'], 'tokyo')
+    rows = [
+        [['th', '鮫洲試験場', None, None], ['th', '住民票のある方', None, None],
+         ['td', '', '予約可能', '2026年06月05日 予約可能']],
+    ]
+    slots, headers = checker._slots_from_matrix(rows)
+    assert headers == []
+    assert slots[0].date == '06/05'
+
+
+@pytest.mark.asyncio
+async def test_evaluate_mode_uses_one_dom_call_per_period():
+    checker = _checker(KANAGAWA_TARGET_FACILITIES, 'kanagawa')
+    html = (FIXTURES / 'kanagawa_calendar_sample.html').read_text(encoding='utf-8')
+    page = AsyncMock()
+    page.evaluate = AsyncMock(return_value=_matrix_from_html(html))
+
+    with patch('reservation_checker_playwright.CALENDAR_EXTRACTION_MODE', 'evaluate'):
+        slots = await checker.get_available_dates(page)
+
+    page.evaluate.assert_awaited_once_with(CALENDAR_MATRIX_JS)
+    page.query_selector_all.assert_not_called()
+    assert checker.last_extraction_stats['dom_calls'] == 1
+    assert checker.last_extraction_stats['mode'] == 'evaluate'
+    assert len([s for s in slots if s.applicant_type.startswith('普通車')]) == 3
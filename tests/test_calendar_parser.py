@@ -0,0 +1,117 @@
+"""CalendarParser (browser-free) against the saved fixtures, for every installed backend."""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from calendar_parser import CalendarParser, available_backends
+from config_template import (
+    KANAGAWA_TARGET_FACILITIES,
+    SAITAMA_TARGET_FACILITIES,
+    TARGET_FACILITIES,
+)
+from reservation_checker_playwright import ReservationChecker
+from tests.test_calendar_matrix import _matrix_from_html
+from tests.test_fixtures import _parse_available_slots
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+FIXTURE_FACILITIES = {
+    'tokyo': TARGET_FACILITIES,
+    'kanagawa': KANAGAWA_TARGET_FACILITIES,
+    'saitama': SAITAMA_TARGET_FACILITIES,
+}
+
+BACKENDS = pytest.mark.parametrize('backend', available_backends())
+
+
+def _html(source):
+    return (FIXTURES / f'{source}_calendar_sample.html').read_text(encoding='utf-8')
+
+
+def _squash(text):
+    return ''.join(text.split())
+
+
+@BACKENDS
+@pytest.mark.parametrize('source', sorted(FIXTURE_FACILITIES))
+def test_parser_matches_evaluate_extraction(backend, source):
+    facilities = FIXTURE_FACILITIES[source]
+    parser = CalendarParser(facilities, backend=backend)
+    checker = ReservationChecker(target_facilities=facilities, target_slot_types=[], source_name=source)
+
+    slots, headers = parser.parse_with_headers(_html(source))
+    expected_slots, expected_headers = checker._slots_from_matrix(_matrix_from_html(_html(source)))
+
+    assert slots
+    assert [_squash(h) for h in headers] == [_squash(h) for h in expected_headers]
+    assert [(_squash(s.date), s.facility, s.applicant_type) for s in slots] == [
+        (_squash(s.date), s.facility, s.applicant_type) for s in expected_slots
+    ]
+
+
+@BACKENDS
+@pytest.mark.parametrize('source', ['kanagawa', 'saitama'])
+def test_parser_matches_fixture_oracle(backend, source):
+    parser = CalendarParser(FIXTURE_FACILITIES[source], backend=backend)
+    slots = parser.parse(_html(source))
+
+    expected = _parse_available_slots(_html(source), FIXTURE_FACILITIES[source])
+    assert sorted((_squash(s.date), s.facility, s.applicant_type) for s in slots) == sorted(
+        (_squash(e['date']), e['facility'], e['applicant_type']) for e in expected
+    )
+
+
+@BACKENDS
+@pytest.mark.parametrize('source', sorted(FIXTURE_FACILITIES))
+def test_parser_matrix_matches_in_page_script_shape(backend, source):
+    parser = CalendarParser(FIXTURE_FACILITIES[source], backend=backend)
+
+    def normalized(rows):
+        # Slot cells carry an inline SVG <style>: textContent (and lxml) include it, bs4 drops it.
+        return [
+            [
+                [tag, None if aria else _squash(text), aria, _squash(sr) if sr else sr]
+                for tag, text, aria, sr in row
+            ]
+            for row in rows
+        ]
+
+    assert normalized(parser.matrix(_html(source))) == normalized(_matrix_from_html(_html(source)))
+
+
+@BACKENDS
+def test_parser_saitama_rowspan_sub_rows(backend):
+    parser = CalendarParser(SAITAMA_TARGET_FACILITIES, backend=backend)
+    slots, headers = parser.parse_with_headers(_html('saitama'))
+
+    assert '08/23' in headers[0]
+    assert {s.applicant_type for s in slots} == {
+        '【１】１回目（初めて）', '【２】２回目以降', '【３】免除国等'
+    }
+    assert all(s.facility == '外免　書類審査' for s in slots)
+
+
+def test_parser_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        CalendarParser(TARGET_FACILITIES, backend='regex')
+
+
+@pytest.mark.asyncio
+async def test_html_mode_uses_one_dom_call_and_parses_off_loop():
+    checker = ReservationChecker(
+        target_facilities=KANAGAWA_TARGET_FACILITIES, target_slot_types=[], source_name='kanagawa'
+    )
+    page = AsyncMock()
+    page.content = AsyncMock(return_value=_html('kanagawa'))
+
+    with patch('reservation_checker_playwright.CALENDAR_EXTRACTION_MODE', 'html'):
+        slots = await checker.get_available_dates(page)
+
+    page.content.assert_awaited_once()
+    page.evaluate.assert_not_called()
+    assert checker.last_extraction_stats == {
+        'mode': 'html', 'dom_calls': 1, 'elapsed_ms': checker.last_extraction_stats['elapsed_ms']
+    }
+    assert len([s for s in slots if s.applicant_type.startswith('普通車')]) == 3
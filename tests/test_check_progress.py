@@ -0,0 +1,145 @@
+"""Progressive /check: periods streamed from the checker, "Checking…" message edited in place."""
+
+import asyncio
+
+import pytest
+
+import run_bot
+from engine_router import EngineRouter
+from reservation_checker_playwright import PeriodSlots, PeriodStream
+from run_bot import SamezuBot
+from tests.test_helpers import check_from_slots, queue_check
+from tests.test_sliced_navigation import LAST_PERIOD, RelativePagingSite, _http_checker
+
+RESULT = check_from_slots(
+    [
+        {"date": "06/05 (Thu)", "facility": "鮫洲試験場", "applicant_type": "住民票のある方"},
+        {"date": "07/10 (Thu)", "facility": "鮫洲試験場", "applicant_type": "住民票のある方"},
+    ],
+    facilities_label=["鮫洲試験場"],
+)
+EARLY, LATE = RESULT.slots[:1], RESULT.slots[1:]
+
+
+@pytest.mark.asyncio
+async def test_checker_streams_each_period_while_run_check_walks():
+    router = EngineRouter({"http": _http_checker(RelativePagingSite())}, mode="http")
+    seen = []
+
+    async def consume(periods):
+        async for period in periods:
+            seen.append(period)
+
+    with PeriodStream(router) as periods:
+        consumer = asyncio.create_task(consume(periods))
+        check = await router.run_check()
+    await consumer
+
+    assert [p.period for p in seen] == list(range(1, LAST_PERIOD + 2))
+    assert len(seen) == check.periods_scanned
+    assert {s for p in seen for s in p.slots} == set(check.slots)
+    assert seen[-1].last_date == check.covered_through
+    assert router.period_listener is None and router.primary.period_listener is None
+
+
+def _scripted_bot(monkeypatch, edit_fails=False):
+    monkeypatch.setattr(run_bot, "CHECK_PROGRESS_EDIT_INTERVAL", 0)
+    bot = SamezuBot()
+    edits, sends = [], []
+
+    async def run_check(*args, **kwargs):
+        for period, slots in enumerate((EARLY, LATE), start=1):
+            await asyncio.sleep(0.01)
+            bot.reservation_checker.period_listener(PeriodSlots("week", 0, period, slots, None))
+        await asyncio.sleep(0.01)
+        return RESULT
+
+    async def edit(chat_id, message_id, text, parse_mode='HTML'):
+        if edit_fails:
+            raise RuntimeError("Message to edit not found")
+        edits.append((message_id, text))
+
+    async def send(chat_id, text, parse_mode='HTML'):
+        sends.append(text)
+
+    bot.reservation_checker.run_check = run_check
+    bot._telegram_edit = edit
+    bot._telegram_send = send
+    return bot, edits, sends
+
+
+@pytest.mark.asyncio
+async def test_check_message_shows_early_dates_then_becomes_the_result(monkeypatch):
+    bot, edits, sends = _scripted_bot(monkeypatch)
+
+    await queue_check(bot, "tokyo", 1, 100, "samezu", message_id=7).task
+
+    assert sends == []
+    assert all(message_id == 7 for message_id, _ in edits)
+    first, final = edits[0][1], edits[-1][1]
+    assert "Still checking" in first and "1 calendar period(s)" in first
+    assert EARLY[0].date in first and LATE[0].date not in first
+    assert "Still checking" not in final
+    assert final == bot._format_check_for_user(RESULT, bot.reservation_checker, False, "samezu")
+
+
+@pytest.mark.asyncio
+async def test_result_is_sent_when_the_check_message_cannot_be_edited(monkeypatch):
+    bot, edits, sends = _scripted_bot(monkeypatch, edit_fails=True)
+
+    await queue_check(bot, "tokyo", 1, 100, message_id=7).task
+
+    assert edits == []
+    assert len(sends) == 1 and "Still checking" not in sends[0]
+
+
+class _Chat:
+    """Message stub: records replies; reply n in chat c gets message id c * 100 + n."""
+
+    def __init__(self, chat_id):
+        self.chat_id = chat_id
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+        return type("Sent", (), {"message_id": self.chat_id * 100 + len(self.replies)})()
+
+
+async def _check(bot, chat):
+    update = type("Update", (), {
+        "message": chat,
+        "effective_chat": type("Chat", (), {"id": chat.chat_id})(),
+        "effective_user": type("User", (), {"id": chat.chat_id, "first_name": "Tester"})(),
+    })()
+    await bot.check_command(update, type("Context", (), {"args": ["samezu"]})())
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_answers_without_a_checking_message(monkeypatch):
+    bot, edits, sends = _scripted_bot(monkeypatch)
+    bot._update_cache_after_scrape(bot.cache, RESULT, use_month_navigation=False)
+    chat = _Chat(1)
+
+    await _check(bot, chat)
+
+    assert len(chat.replies) == 1 and "Using cached result" in chat.replies[0]
+    assert edits == [] and sends == []
+
+
+@pytest.mark.asyncio
+async def test_joined_and_refused_checks_finalise_their_checking_message(monkeypatch):
+    bot, edits, sends = _scripted_bot(monkeypatch)
+    bot.scrape_broker.max_waiters = 2
+    chats = [_Chat(1), _Chat(2), _Chat(3)]
+
+    for chat in chats:
+        await _check(bot, chat)
+    flight = bot.scrape_broker.flights[("tokyo", False)]
+    await flight.task
+
+    assert all(len(chat.replies) == 1 and "Checking" in chat.replies[0] for chat in chats)
+    assert sends == []
+    shown = dict(edits)  # message id -> last text edited in
+    final = bot._format_check_for_user(RESULT, bot.reservation_checker, False, "samezu")
+    assert shown[101] == final and shown[201] == final
+    assert "Too many checks" in shown[301]
@@ -0,0 +1,201 @@
+"""Per-source circuit breaker: state machine, back-off, scheduler skip, /check fallback."""
+
+import asyncio
+import time
+
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from run_bot import SamezuBot
+from tests.test_commands import DummyContext, DummyUpdate
+from tests.test_helpers import CHECK_TOKYO_ARI, check_error, queue_check
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _open_breaker(bot, source="tokyo"):
+    breaker = bot.breakers[source]
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure("timeout")
+    assert breaker.is_open
+    return breaker
+
+
+def test_breaker_opens_after_threshold_and_backs_off_exponentially():
+    clock = Clock()
+    breaker = CircuitBreaker("tokyo", failure_threshold=3, base_backoff=60, max_backoff=200,
+                             jitter=0.5, clock=clock, rng=lambda: 0.5)
+
+    breaker.record_failure("error")
+    breaker.record_failure("timeout")
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure("timeout")
+    assert breaker.state == OPEN and breaker.retry_in() == 60
+    assert not breaker.allow() and breaker.rejected == 1
+
+    clock.now = 60
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # one probe at a time
+    breaker.record_failure("timeout")  # failed probe re-opens at once, doubled
+    assert breaker.state == OPEN and breaker.retry_in() == 120
+
+    clock.now = 180
+    assert breaker.allow()
+    breaker.record_failure("blocked")
+    assert breaker.retry_in() == 200  # capped at max_backoff
+    assert "retry in 3m 20s" in breaker.status_line() and "blocked" in breaker.status_line()
+
+    clock.now = 380
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.openings == 0 and breaker.failures == 0
+
+
+def test_jitter_spreads_the_back_off():
+    breaker = CircuitBreaker("tokyo", failure_threshold=1, base_backoff=100, jitter=0.2,
+                             clock=lambda: 0.0, rng=lambda: 0.0)
+    breaker.record_failure()
+    assert breaker.retry_in() == pytest.approx(80)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_feeds_the_breaker_and_skips_the_source_while_open():
+    bot = SamezuBot()
+    bot.last_notified["tokyo"] = None
+    bot._persist_last_notified = lambda: None
+    scrapes = []
+
+    async def failing_run_check(*args, **kwargs):
+        scrapes.append(1)
+        return check_error("❌ Error during reservation check: Timed out waiting for Cloudflare")
+
+    bot.reservation_checker.run_check = failing_run_check
+    threshold = bot.breakers["tokyo"].failure_threshold
+    for _ in range(threshold + 2):
+        await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+
+    assert len(scrapes) == threshold
+    assert bot.breakers["tokyo"].is_open and bot.breakers["tokyo"].rejected == 2
+    assert bot.breakers["kanagawa"].state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_check_force_is_answered_from_the_last_good_result_while_open():
+    bot = SamezuBot()
+    bot._update_cache_after_scrape(bot.cache, CHECK_TOKYO_ARI, use_month_navigation=False)
+    bot.cache['timestamp'] = time.time() - 600  # expired, and force asks for a fresh scrape anyway
+    _open_breaker(bot)
+
+    async def must_not_scrape(*args, **kwargs):
+        raise AssertionError("scraped while the breaker is open")
+
+    bot.reservation_checker.run_check = must_not_scrape
+    update = DummyUpdate()
+    context = DummyContext()
+    context.args = ["force"]
+    await bot.check_command(update, context)
+
+    text = update.message.last_text
+    assert "site is failing" in text and "timeout" in text
+    assert "Last good result, from 10m" in text
+    assert "鮫洲" in text
+    assert bot.scrape_broker.depth("tokyo") == 0
+
+
+@pytest.mark.asyncio
+async def test_waiters_get_the_last_good_result_when_the_scrape_opens_the_breaker():
+    bot = SamezuBot()
+    bot._update_cache_after_scrape(bot.cache, CHECK_TOKYO_ARI, use_month_navigation=False)
+    breaker = bot.breakers["tokyo"]
+    for _ in range(breaker.failure_threshold - 1):
+        breaker.record_failure("timeout")
+    sent = []
+
+    async def fake_send(chat_id, text, parse_mode='HTML'):
+        sent.append((chat_id, text))
+
+    async def failing_run_check(*args, **kwargs):
+        return check_error("❌ Error during reservation check: timeout")
+
+    bot._telegram_send = fake_send
+    bot.reservation_checker.run_check = failing_run_check
+    await queue_check(bot, "tokyo", 1, 101, "tokyo", force=True).task
+
+    assert breaker.is_open
+    assert [chat_id for chat_id, _text in sent] == [101]
+    assert "Last good result" in sent[0][1]
+    assert "Circuit breakers" in await _status_text(bot)
+
+
+@pytest.mark.asyncio
+async def test_locally_refused_scrapes_do_not_open_the_breaker():
+    bot = SamezuBot()
+    bot.last_notified["tokyo"] = None
+    bot._persist_last_notified = lambda: None
+    checker = bot.reservation_checker
+    breaker = bot.breakers["tokyo"]
+
+    async def refused_run_check(*args, **kwargs):
+        checker.last_outcome = "refused"
+        return check_error("❌ Error during reservation check: browser refused by memory watchdog")
+
+    checker.run_check = refused_run_check
+    for _ in range(breaker.failure_threshold + 1):
+        await bot._run_scheduled_check(checker, bot.cache, "tokyo")
+    assert breaker.state == CLOSED and breaker.failures == 0
+
+    clock = Clock()
+    breaker._clock = clock
+    _open_breaker(bot)
+    clock.now = breaker.open_until
+    await bot._run_scheduled_check(checker, bot.cache, "tokyo")  # the probe is refused locally
+    assert breaker.openings == 1 and breaker.allow() and breaker.state == HALF_OPEN
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_lets_the_next_probe_through():
+    bot = SamezuBot()
+    clock = Clock()
+    breaker = bot.breakers["tokyo"]
+    breaker._clock = clock
+    _open_breaker(bot)
+    clock.now = breaker.open_until
+
+    async def hanging_run_check(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    bot.reservation_checker.run_check = hanging_run_check
+    probe = asyncio.create_task(bot._run_check_through_breaker("tokyo", bot.reservation_checker))
+    await asyncio.sleep(0.01)
+    assert breaker.state == HALF_OPEN
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert breaker.allow() and breaker.state == HALF_OPEN and breaker.openings == 1
+
+
+def test_fallback_message_while_probing_says_retrying_now():
+    bot = SamezuBot()
+    clock = Clock()
+    breaker = bot.breakers["tokyo"]
+    breaker._clock = clock
+    _open_breaker(bot)
+    assert "not checking again for" in bot._breaker_fallback_message("tokyo", None, False)
+
+    clock.now = breaker.open_until
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    text = bot._breaker_fallback_message("tokyo", None, False)
+    assert "retrying now" in text and "0m 0s" not in text
+
+
+async def _status_text(bot):
+    update = DummyUpdate()
+    await bot.status_command(update, DummyContext())
+    return update.message.last_text
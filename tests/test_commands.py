@@ -2,9 +2,9 @@ class DummyApplication:
     def create_task(self, coro):
         return None
 import pytest
-import asyncio
+from dataclasses import replace
 from run_bot import SamezuBot
-from tests.test_helpers import CHECK_KANAGAWA, CHECK_SAITAMA, check_error, check_from_slots
+from tests.test_helpers import CHECK_KANAGAWA, CHECK_SAITAMA, check_error, check_from_slots, queue_check
 
 TOKYO_RESULT = check_from_slots(
     [{"date": "06/05 (Thu)", "facility": "鮫洲試験場", "applicant_type": "住民票のある方"}],
@@ -78,7 +78,6 @@ async def test_check_command_cache_expired():
     bot.cache['result'] = None
     bot.cache['timestamp'] = None
     bot.application = DummyApplication()
-    bot.check_lock = asyncio.Lock()
     await bot.check_command(update, context)
     assert "Checking for available slots" in update.message.last_text
 
@@ -92,7 +91,6 @@ async def test_check_command_force():
     bot.cache['result'] = TOKYO_RESULT
     bot.cache['timestamp'] = time.time()
     bot.application = DummyApplication()
-    bot.check_lock = asyncio.Lock()
     await bot.check_command(update, context)
     assert "Checking for available slots" in update.message.last_text
 
@@ -113,12 +111,25 @@ async def test_check_month_rejects_weekly_cache():
     context = DummyContext()
     bot._update_cache_after_scrape(bot.cache, TOKYO_RESULT, use_month_navigation=False)
     bot.application = DummyApplication()
-    bot.check_lock = asyncio.Lock()
     await bot.check_month_command(update, context)
     assert "Using cached result" not in (update.message.last_text or "")
     assert "month navigation" in update.message.last_text
 
 
+@pytest.mark.asyncio
+async def test_check_month_served_from_weekly_cache_that_reached_calendar_end():
+    bot = SamezuBot()
+    update = DummyUpdate()
+    context = DummyContext()
+    complete = replace(TOKYO_RESULT, covered_through="09/25", calendar_complete=True)
+    bot._update_cache_after_scrape(bot.cache, complete, use_month_navigation=False)
+    await bot.check_month_command(update, context)
+    assert "Using cached result" in update.message.last_text
+
+    await bot.cache_command(update, context)
+    assert "whole calendar to 09/25" in update.message.last_text
+
+
 @pytest.mark.asyncio
 async def test_check_rejects_month_cache():
     bot = SamezuBot()
@@ -126,7 +137,6 @@ async def test_check_rejects_month_cache():
     context = DummyContext()
     bot._update_cache_after_scrape(bot.cache, TOKYO_RESULT, use_month_navigation=True)
     bot.application = DummyApplication()
-    bot.check_lock = asyncio.Lock()
     await bot.check_command(update, context)
     assert "Using cached result" not in (update.message.last_text or "")
     assert "Checking for available slots" in update.message.last_text
@@ -139,7 +149,6 @@ async def test_check_month_command_cache_expired():
     bot.cache['result'] = None
     bot.cache['timestamp'] = None
     bot.application = DummyApplication()
-    bot.check_lock = asyncio.Lock()
     await bot.check_month_command(update, context)
     assert "Checking for available slots using month navigation" in update.message.last_text
 
@@ -153,7 +162,6 @@ async def test_check_month_command_force():
     bot.cache['result'] = TOKYO_RESULT
     bot.cache['timestamp'] = time.time()
     bot.application = DummyApplication()
-    bot.check_lock = asyncio.Lock()
     await bot.check_month_command(update, context)
     assert "Checking for available slots using month navigation" in update.message.last_text
 
@@ -223,11 +231,11 @@ async def test_unsubscribe_command_not_subscribed():
     assert "You are not currently subscribed" in update.message.last_text
 
 
-# --- _background_check_task source-aware filtering ---
+# --- /check flight source-aware filtering ---
 
 
 async def _run_background_check(bot, source, fake_result):
-    """Helper: run _background_check_task with a mocked checker result."""
+    """Helper: run a /check flight with a mocked checker result."""
     messages_sent = []
 
     async def capture_send(chat_id, text, parse_mode='HTML'):
@@ -242,9 +250,7 @@ async def _run_background_check(bot, source, fake_result):
     checker, _cache = bot._checker_and_cache_for_scrape_key(scrape_key)
     checker.run_check = fake_run_check
 
-    bot.waiting_users[scrape_key].add((DummyUser.id, DummyChat.id, source, True, False, False))
-
-    await bot._background_check_task(None, source=source, scrape_key=scrape_key)
+    await queue_check(bot, scrape_key, DummyUser.id, DummyChat.id, source, show_all=True).task
     return messages_sent
 
 
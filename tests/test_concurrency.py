@@ -3,6 +3,7 @@
 import asyncio
 import time
 import unittest.mock as mock
+from dataclasses import replace
 
 import pytest
 from run_bot import SamezuBot
@@ -13,6 +14,7 @@ from tests.test_helpers import (
     CHECK_TOKYO_MIXED,
     check_error,
     check_from_slots,
+    queue_check,
 )
 
 TOKYO_RESULT = check_from_slots(
@@ -36,259 +38,327 @@ def test_scrape_key_maps_samezu_and_fuchu_to_tokyo():
     assert bot._scrape_key_for_check("saitama") == "saitama"
 
 
-@pytest.mark.asyncio
-async def test_deliver_to_waiting_users_applies_per_user_check_source():
-    bot = make_bot()
-    bot._update_cache_after_scrape(bot.cache, CHECK_TOKYO_BOTH, use_month_navigation=False)
+def capture_sends(bot):
     sent = []
 
     async def capture_send(chat_id, text, parse_mode='HTML'):
         sent.append((chat_id, text))
 
     bot._telegram_send = capture_send
-    bot.waiting_users["tokyo"].add((1, 101, "samezu", False, False, False))
-    bot.waiting_users["tokyo"].add((2, 102, "fuchu", False, False, False))
+    return sent
+
+
+def counting_run_check(result, delay=0.0):
+    calls = []
+
+    async def run_check(*args, **kwargs):
+        calls.append(kwargs.get("use_month_navigation", False))
+        await asyncio.sleep(delay)
+        return result
+
+    return run_check, calls
 
-    await bot._deliver_to_waiting_users("tokyo", from_fresh_scrape=True)
 
-    assert len(sent) == 2
-    by_chat = {chat_id: text for chat_id, text in sent}
+@pytest.mark.asyncio
+async def test_flight_answers_each_request_with_its_own_check_source():
+    bot = make_bot()
+    sent = capture_sends(bot)
+    bot.reservation_checker.run_check, calls = counting_run_check(CHECK_TOKYO_BOTH, delay=0.01)
+
+    flight = queue_check(bot, "tokyo", 1, 101, "samezu")
+    assert queue_check(bot, "tokyo", 2, 102, "fuchu") is flight
+    await flight.task
+
+    assert calls == [False]
+    by_chat = dict(sent)
     assert "🏢 <b>鮫洲試験場</b>" in by_chat[101]
     assert "🏢 <b>府中試験場</b>" not in by_chat[101]
     assert "🏢 <b>府中試験場</b>" in by_chat[102]
     assert "🏢 <b>鮫洲試験場</b>" not in by_chat[102]
+    assert flight.future.result() is CHECK_TOKYO_BOTH
+    assert bot.scrape_broker.depth() == 0
 
 
 @pytest.mark.asyncio
-async def test_month_waiter_not_served_from_weekly_fresh_cache():
+async def test_month_request_is_not_answered_by_an_incomplete_weekly_scrape():
     bot = make_bot()
-    bot._update_cache_after_scrape(bot.cache, TOKYO_RESULT, use_month_navigation=False)
-    sent = []
+    sent = capture_sends(bot)
+    bot.reservation_checker.run_check, calls = counting_run_check(TOKYO_RESULT, delay=0.01)
 
-    async def capture_send(chat_id, text, parse_mode='HTML'):
-        sent.append(chat_id)
+    week = queue_check(bot, "tokyo", 1, 100)
+    month = queue_check(bot, "tokyo", 2, 200, use_month_navigation=True)
+    await week.task
+    assert [chat_id for chat_id, _ in sent] == [100]
+    await month.task
 
-    bot._telegram_send = capture_send
-    bot.waiting_users["tokyo"].add((1, 100, None, False, True, False))
-
-    await bot._deliver_to_waiting_users("tokyo", from_fresh_scrape=True)
-
-    assert sent == []
-    assert len(bot.waiting_users["tokyo"]) == 1
+    assert calls == [False, True]
+    assert sorted(chat_id for chat_id, _ in sent) == [100, 200]
 
 
 @pytest.mark.asyncio
-async def test_force_waiter_not_served_from_stale_other_key_cache():
+async def test_force_check_with_stale_cache_starts_a_scrape():
     bot = make_bot()
     bot.kanagawa_cache['result'] = KANAGAWA_RESULT
     bot.kanagawa_cache['timestamp'] = time.time() - 9999
     bot.kanagawa_cache['use_month_navigation'] = False
-    sent = []
-
-    async def capture_send(chat_id, text, parse_mode='HTML'):
-        sent.append(chat_id)
+    bot.kanagawa_checker.run_check, calls = counting_run_check(KANAGAWA_RESULT)
+    created = []
 
-    bot._telegram_send = capture_send
-    bot.waiting_users["kanagawa"].add((2, 200, "kanagawa", False, False, True))
+    def fake_create_task(coro):
+        coro.close()
+        created.append(1)
+        return mock.MagicMock()
 
-    await bot._deliver_to_waiting_users("kanagawa", from_fresh_scrape=False)
+    update = mock.MagicMock()
+    update.message.reply_text = mock.AsyncMock()
+    context = mock.MagicMock(args=["kanagawa", "force"])
+    with mock.patch('run_bot.asyncio.create_task', side_effect=fake_create_task):
+        await bot.check_command(update, context)
 
-    assert sent == []
-    assert len(bot.waiting_users["kanagawa"]) == 1
+    assert created == [1]
+    assert bot.scrape_broker.depth("kanagawa") == 1
 
 
 @pytest.mark.asyncio
-async def test_force_waiter_not_served_from_stale_saitama_cache():
+async def test_requests_for_other_sources_run_their_own_flights():
     bot = make_bot()
-    bot.saitama_cache['result'] = SAITAMA_RESULT
-    bot.saitama_cache['timestamp'] = time.time() - 9999
-    bot.saitama_cache['use_month_navigation'] = False
-    sent = []
+    sent = capture_sends(bot)
+    bot.reservation_checker.run_check, _ = counting_run_check(TOKYO_RESULT, delay=0.01)
+    bot.kanagawa_checker.run_check, _ = counting_run_check(KANAGAWA_RESULT, delay=0.01)
+    bot.saitama_checker.run_check, _ = counting_run_check(SAITAMA_RESULT, delay=0.01)
+
+    flights = [
+        queue_check(bot, "tokyo", 1, 100),
+        queue_check(bot, "kanagawa", 2, 200, "kanagawa"),
+        queue_check(bot, "saitama", 3, 300, "saitama"),
+    ]
+    await asyncio.gather(*(flight.task for flight in flights))
+
+    by_chat = dict(sent)
+    assert "鮫洲試験場" in by_chat[100]
+    assert "普通車ＡＭ" in by_chat[200]
+    assert "【１】１回目（初めて）" in by_chat[300]
 
-    async def capture_send(chat_id, text, parse_mode='HTML'):
-        sent.append(chat_id)
 
-    bot._telegram_send = capture_send
-    bot.waiting_users["saitama"].add((2, 200, "saitama", False, False, True))
+@pytest.mark.asyncio
+async def test_request_during_a_scheduled_scrape_is_answered_by_it():
+    bot = make_bot()
+    bot.last_notified["tokyo"] = None
+    bot._persist_last_notified = lambda: None
+    sent = capture_sends(bot)
+    bot.reservation_checker.run_check, calls = counting_run_check(TOKYO_RESULT, delay=0.05)
 
-    await bot._deliver_to_waiting_users("saitama", from_fresh_scrape=False)
+    scheduled = asyncio.create_task(bot._run_scheduled_source("tokyo"))
+    await asyncio.sleep(0.01)
+    flight = queue_check(bot, "tokyo", 1, 100)
+    await scheduled
+    await flight.task
 
-    assert sent == []
-    assert len(bot.waiting_users["saitama"]) == 1
+    assert calls == [False]
+    assert [chat_id for chat_id, _ in sent] == [100]
 
 
 @pytest.mark.asyncio
-async def test_other_key_waiters_served_from_valid_matching_cache():
+async def test_flight_respects_show_all_per_request():
     bot = make_bot()
-    messages = []
+    sent = capture_sends(bot)
+    bot.reservation_checker.run_check, _ = counting_run_check(CHECK_TOKYO_MIXED)
 
-    async def capture_send(chat_id, text, parse_mode='HTML'):
-        messages.append((chat_id, text))
+    flight = queue_check(bot, "tokyo", 1, 100, show_all=True)
+    queue_check(bot, "tokyo", 2, 200)
+    await flight.task
 
-    bot._telegram_send = capture_send
-    bot._update_cache_after_scrape(bot.kanagawa_cache, KANAGAWA_RESULT, use_month_navigation=False)
-    bot._update_cache_after_scrape(bot.saitama_cache, SAITAMA_RESULT, use_month_navigation=False)
+    by_chat = dict(sent)
+    assert '住民票のない方' in by_chat[100]
+    assert '住民票のない方' not in by_chat[200]
 
-    async def fake_run_check(*args, **kwargs):
-        return TOKYO_RESULT
 
-    bot.reservation_checker.run_check = fake_run_check
-    bot.waiting_users["tokyo"].add((1, 100, None, False, False, False))
-    bot.waiting_users["kanagawa"].add((2, 200, "kanagawa", False, False, False))
-    bot.waiting_users["saitama"].add((3, 300, "saitama", False, False, False))
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_scrape():
+    bot = make_bot()
+    capture_sends(bot)
+    bot.reservation_checker.run_check, calls = counting_run_check(TOKYO_RESULT, delay=0.05)
 
-    await bot._background_check_task(None, source=None, scrape_key="tokyo")
+    flights = {queue_check(bot, "tokyo", user, user, force=user % 2 == 0) for user in range(10)}
+    assert len(flights) == 1
+    await next(iter(flights)).task
 
-    assert len(messages) == 3
-    by_chat = {chat_id: text for chat_id, text in messages}
-    assert "鮫洲試験場" in by_chat[100]
-    assert "普通車ＡＭ" in by_chat[200]
-    assert "【１】１回目（初めて）" in by_chat[300]
-    assert not bot.waiting_users["kanagawa"]
-    assert not bot.waiting_users["saitama"]
+    assert calls == [False]
+    stats = bot.scrape_broker.stats[("tokyo", False)]
+    assert stats.served == 10 and stats.peak == 10 and stats.max_wait >= 0.05
 
 
 @pytest.mark.asyncio
-async def test_chained_scrape_starts_for_waiters_without_cache():
+async def test_waiter_cap_refuses_extra_requests():
     bot = make_bot()
-    bot.waiting_users["kanagawa"].add((2, 200, "kanagawa", True, True, False))
-    created = []
-
-    def fake_create_task(coro):
-        coro.close()
-        created.append(1)
-        return mock.MagicMock()
+    bot.scrape_broker.max_waiters = 2
+    capture_sends(bot)
+    bot.reservation_checker.run_check, _ = counting_run_check(TOKYO_RESULT)
 
-    with mock.patch('run_bot.asyncio.create_task', side_effect=fake_create_task):
-        await bot._start_chained_scrapes_for_remaining_waiters()
+    flight = queue_check(bot, "tokyo", 1, 100)
+    queue_check(bot, "tokyo", 2, 200)
+    assert bot.scrape_broker.attach("tokyo", flight.requests[0][0]) == (None, False)
+    await flight.task
 
-    assert len(created) == 1
+    assert bot.scrape_broker.stats[("tokyo", False)].refused == 1
+    assert "1 refused" in bot.scrape_broker.status_line("tokyo")
 
 
 @pytest.mark.asyncio
-async def test_deliver_respects_show_all_for_queued_user():
+async def test_complete_week_scrape_answers_the_waiting_month_flight():
     bot = make_bot()
-    bot._update_cache_after_scrape(bot.cache, CHECK_TOKYO_MIXED, use_month_navigation=False)
-    sent = []
+    sent = capture_sends(bot)
+    bot.reservation_checker.run_check, calls = counting_run_check(
+        replace(TOKYO_RESULT, covered_through="09/25", calendar_complete=True), delay=0.01
+    )
 
-    async def capture_send(chat_id, text, parse_mode='HTML'):
-        sent.append(text)
+    week = queue_check(bot, "tokyo", 1, 100)
+    month = queue_check(bot, "tokyo", 2, 200, use_month_navigation=True)
+    await asyncio.gather(week.task, month.task)
+
+    assert calls == [False]
+    assert sorted(chat_id for chat_id, _ in sent) == [100, 200]
+    assert bot.scrape_broker.depth("tokyo") == 0
 
-    bot._telegram_send = capture_send
-    bot.waiting_users["tokyo"].add((1, 100, None, True, False, False))
 
-    await bot._deliver_to_waiting_users("tokyo", from_fresh_scrape=True)
+@pytest.mark.asyncio
+async def test_error_scrape_answers_its_flight_and_the_month_flight_still_runs():
+    bot = make_bot()
+    sent = capture_sends(bot)
+    results = iter([check_error("❌ Error during reservation check: timeout"), TOKYO_RESULT])
+
+    async def fail_then_succeed(*args, **kwargs):
+        await asyncio.sleep(0)
+        return next(results)
 
-    assert len(sent) == 1
-    assert '住民票のない方' in sent[0]
+    bot.reservation_checker.run_check = fail_then_succeed
+    week = queue_check(bot, "tokyo", 1, 100)
+    month = queue_check(bot, "tokyo", 2, 200, use_month_navigation=True)
+    await asyncio.gather(week.task, month.task)
+
+    assert sent[0][0] == 100 and "timeout" in sent[0][1]
+    assert sent[1][0] == 200 and "鮫洲試験場" in sent[1][1]
+    assert bot.cache['result'] is TOKYO_RESULT
 
 
 @pytest.mark.asyncio
-async def test_concurrent_reserve_only_starts_one_background_scrape():
+async def test_exception_scrape_answers_its_flight_with_the_error():
     bot = make_bot()
-    run_count = 0
+    sent = capture_sends(bot)
 
-    async def slow_run_check(*args, **kwargs):
-        nonlocal run_count
-        run_count += 1
-        await asyncio.sleep(0.05)
-        return "❌ No slots"
-
-    bot.reservation_checker.run_check = slow_run_check
+    async def explode(*args, **kwargs):
+        raise RuntimeError("browser died")
 
-    reserved = await asyncio.gather(
-        bot._reserve_and_start_background_check(
-            None, use_month_navigation=False, show_all=False, source=None, scrape_key="tokyo"
-        ),
-        bot._reserve_and_start_background_check(
-            None, use_month_navigation=False, show_all=False, source=None, scrape_key="tokyo"
-        ),
-    )
-    await asyncio.sleep(0.2)
+    bot.reservation_checker.run_check = explode
+    week = queue_check(bot, "tokyo", 1, 100)
+    month = queue_check(bot, "tokyo", 2, 200, use_month_navigation=True)
+    await asyncio.gather(week.task, month.task)
 
-    assert sum(reserved) == 1
-    assert run_count == 1
+    assert [chat_id for chat_id, _ in sent] == [100, 200]
+    assert all("browser died" in text for _, text in sent)
 
 
 @pytest.mark.asyncio
-async def test_error_scrape_requeues_incompatible_month_waiter():
+async def test_cancelled_flight_answers_its_requests_and_leaves_the_broker():
     bot = make_bot()
-    sent = []
+    sent = capture_sends(bot)
+    bot.reservation_checker.run_check, _calls = counting_run_check(TOKYO_RESULT, delay=10)
 
-    async def capture_send(chat_id, text, parse_mode='HTML'):
-        sent.append((chat_id, text))
+    flight = queue_check(bot, "tokyo", 1, 100)
+    assert queue_check(bot, "tokyo", 2, 200) is flight
+    await asyncio.sleep(0.01)
+    flight.task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flight.task
 
-    async def fail_weekly(*args, **kwargs):
-        return check_error("❌ Error during reservation check: timeout")
+    assert flight.done and flight.future.result().is_error
+    assert sorted(chat_id for chat_id, _ in sent) == [100, 200]
+    assert all("interrupted" in text for _, text in sent)
+    assert flight.key not in bot.scrape_broker.flights
 
-    bot._telegram_send = capture_send
-    bot.reservation_checker.run_check = fail_weekly
-    bot.waiting_users["tokyo"].add((1, 100, None, False, False, False))
-    bot.waiting_users["tokyo"].add((2, 200, None, False, True, False))
 
-    await bot._background_check_task(None, use_month_navigation=False, scrape_key="tokyo")
+@pytest.mark.asyncio
+async def test_scheduler_skips_only_the_locked_source():
+    bot = SamezuBot()
+    scrape_calls = []
+
+    def fake_run_check_for(source):
+        async def fake_run_check(*args, **kwargs):
+            scrape_calls.append(source)
+            return check_from_slots([])
+        return fake_run_check
 
-    assert len(sent) == 1
-    assert sent[0][0] == 100
-    assert "timeout" in sent[0][1]
-    assert len(bot.waiting_users["tokyo"]) == 1
-    assert next(iter(bot.waiting_users["tokyo"]))[4] is True
+    bot.reservation_checker.run_check = fake_run_check_for("tokyo")
+    bot.kanagawa_checker.run_check = fake_run_check_for("kanagawa")
+    bot.saitama_checker.run_check = fake_run_check_for("saitama")
 
+    await bot.scrape_locks["tokyo"].acquire()
+    try:
+        await bot._run_scheduled_checks()
+    finally:
+        bot.scrape_locks["tokyo"].release()
 
-@pytest.mark.asyncio
-async def test_exception_scrape_requeues_incompatible_month_waiter():
-    bot = make_bot()
-    sent = []
+    assert sorted(scrape_calls) == ["kanagawa", "saitama"]
 
-    async def capture_send(chat_id, text, parse_mode='HTML'):
-        sent.append((chat_id, text))
 
-    async def explode(*args, **kwargs):
-        raise RuntimeError("browser died")
+@pytest.mark.asyncio
+async def test_scheduled_sources_scrape_concurrently():
+    bot = SamezuBot()
+    running = 0
+    peak = 0
 
-    bot._telegram_send = capture_send
-    bot.reservation_checker.run_check = explode
-    bot.waiting_users["tokyo"].add((1, 100, None, False, False, False))
-    bot.waiting_users["tokyo"].add((2, 200, None, False, True, False))
+    async def slow_run_check(*args, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return check_from_slots([])
+
+    bot.reservation_checker.run_check = slow_run_check
+    bot.kanagawa_checker.run_check = slow_run_check
+    bot.saitama_checker.run_check = slow_run_check
 
-    await bot._background_check_task(None, use_month_navigation=False, scrape_key="tokyo")
+    await bot._run_scheduled_checks()
 
-    assert len(sent) == 1
-    assert sent[0][0] == 100
-    assert "browser died" in sent[0][1]
-    assert len(bot.waiting_users["tokyo"]) == 1
+    assert peak == 3
 
 
 @pytest.mark.asyncio
-async def test_scheduler_skips_when_check_lock_held():
+async def test_global_scrape_cap_limits_concurrency():
     bot = SamezuBot()
-    scrape_calls = []
+    bot._scrape_slots = asyncio.Semaphore(1)
+    running = 0
+    peak = 0
 
-    async def fake_run_check(*args, **kwargs):
-        scrape_calls.append(kwargs.get("source") or "check")
-        return "❌ No slots"
+    async def slow_run_check(*args, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return check_from_slots([])
 
-    bot.reservation_checker.run_check = fake_run_check
-    bot.kanagawa_checker.run_check = fake_run_check
-    bot.saitama_checker.run_check = fake_run_check
+    bot.reservation_checker.run_check = slow_run_check
+    bot.kanagawa_checker.run_check = slow_run_check
+    bot.saitama_checker.run_check = slow_run_check
 
-    await bot.check_lock.acquire()
+    await bot._run_scheduled_checks()
 
-    call_count = 0
+    assert peak == 1
 
-    async def fast_sleep(_):
-        nonlocal call_count
-        call_count += 1
-        if call_count >= 2:
-            raise asyncio.CancelledError()
 
-    with mock.patch('asyncio.sleep', fast_sleep):
-        task = asyncio.create_task(bot._scheduler_loop())
-        try:
-            await task
-        except asyncio.CancelledError:
-            pass
+@pytest.mark.asyncio
+async def test_manual_kanagawa_check_not_blocked_by_tokyo_scrape():
+    bot = SamezuBot()
+    sent = capture_sends(bot)
+    bot.kanagawa_checker.run_check, _ = counting_run_check(KANAGAWA_RESULT)
 
-    bot.check_lock.release()
+    await bot.scrape_locks["tokyo"].acquire()
+    try:
+        flight = queue_check(bot, "kanagawa", 2, 200, "kanagawa")
+        await asyncio.wait_for(flight.task, 1)
+    finally:
+        bot.scrape_locks["tokyo"].release()
 
-    assert scrape_calls == []
+    assert [chat_id for chat_id, _ in sent] == [200]
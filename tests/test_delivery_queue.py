@@ -0,0 +1,177 @@
+"""Telegram delivery queue: priorities, pacing, RetryAfter, retries, superseded edits."""
+
+import asyncio
+import time
+import warnings
+from datetime import timedelta
+
+import pytest
+from telegram.error import BadRequest, NetworkError, RetryAfter
+
+from delivery_queue import ALERT, PROGRESS, REPLY, DeliveryQueue
+from run_bot import SamezuBot
+from tests.test_helpers import CHECK_TOKYO_ARI
+
+
+def _flood_control(seconds):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # PTB's notice about retry_after becoming a timedelta
+        return RetryAfter(timedelta(seconds=seconds))
+
+
+def _recorder(sent, failures=None):
+    """send(chat_id, text) factory appending to sent; failures[chat_id] = errors raised first."""
+    failures = failures or {}
+
+    def send(chat_id, text):
+        async def deliver():
+            if failures.get(chat_id):
+                raise failures[chat_id].pop(0)
+            sent.append((chat_id, text, time.monotonic()))
+            return text
+        return deliver
+
+    return send
+
+
+@pytest.mark.asyncio
+async def test_alerts_go_before_replies_before_progress():
+    sent = []
+    send = _recorder(sent)
+    queue = DeliveryQueue(rate=50, burst=1, chat_interval=0)
+
+    await asyncio.gather(
+        queue.submit(1, send(1, "progress"), priority=PROGRESS),
+        queue.submit(2, send(2, "reply"), priority=REPLY),
+        queue.submit(3, send(3, "alert"), priority=ALERT),
+    )
+
+    assert [text for _chat, text, _at in sent] == ["alert", "reply", "progress"]
+    assert queue.stats[ALERT].sent == queue.stats[REPLY].sent == queue.stats[PROGRESS].sent == 1
+
+
+@pytest.mark.asyncio
+async def test_one_chat_is_paced_without_holding_up_the_others():
+    sent = []
+    send = _recorder(sent)
+    queue = DeliveryQueue(chat_interval=0.1)
+
+    await asyncio.gather(
+        queue.submit(1, send(1, "first")),
+        queue.submit(1, send(1, "second")),
+        queue.submit(2, send(2, "other")),
+    )
+
+    at = {text: when for _chat, text, when in sent}
+    assert [text for _chat, text, _at in sent][:2] == ["first", "other"]
+    assert at["second"] - at["first"] >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_the_queue_then_delivers():
+    sent = []
+    send = _recorder(sent, {1: [_flood_control(0.1)]})
+    queue = DeliveryQueue(chat_interval=0)
+    started = time.monotonic()
+
+    alert = asyncio.create_task(queue.submit(1, send(1, "alert"), priority=ALERT))
+    await asyncio.sleep(0.01)
+    reply = await queue.submit(2, send(2, "reply"))  # another chat, queued during the pause
+
+    assert await alert == "alert" and reply == "reply"
+    assert all(when - started >= 0.09 for _chat, _text, when in sent)
+    assert queue.stats[ALERT].retried == 1 and queue.stats[ALERT].failed == 0
+
+
+@pytest.mark.asyncio
+async def test_repeated_flood_control_gives_up_after_max_attempts():
+    sent = []
+    send = _recorder(sent, {1: [_flood_control(0.01) for _ in range(5)]})
+    queue = DeliveryQueue(chat_interval=0, max_attempts=3)
+
+    with pytest.raises(RetryAfter):
+        await queue.submit(1, send(1, "alert"), priority=ALERT)
+
+    assert sent == []
+    assert queue.stats[ALERT].retried == 2 and queue.stats[ALERT].failed == 1
+
+
+@pytest.mark.asyncio
+async def test_delivery_whose_caller_stopped_waiting_is_dropped():
+    sent = []
+    send = _recorder(sent)
+    queue = DeliveryQueue(chat_interval=0.05)
+
+    first = asyncio.create_task(queue.submit(1, send(1, "first")))
+    await asyncio.sleep(0.01)  # sent; the chat is now paced for 50ms
+    abandoned = asyncio.create_task(queue.submit(1, send(1, "abandoned")))
+    await asyncio.sleep(0)
+    abandoned.cancel()
+    await queue.submit(1, send(1, "last"))
+
+    assert await first == "first"
+    assert [text for _chat, text, _at in sent] == ["first", "last"]
+    assert queue.depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_network_errors_back_off_and_bad_requests_fail_at_once():
+    sent = []
+    send = _recorder(sent, {
+        1: [NetworkError("reset"), NetworkError("reset")],
+        2: [BadRequest("Message to edit not found")],
+        3: [NetworkError("down")] * 3,
+    })
+    queue = DeliveryQueue(chat_interval=0, max_attempts=3, base_backoff=0.01)
+
+    results = await asyncio.gather(
+        queue.submit(1, send(1, "flaky")),
+        queue.submit(2, send(2, "gone")),
+        queue.submit(3, send(3, "down")),
+        return_exceptions=True,
+    )
+
+    assert results[0] == "flaky"
+    assert isinstance(results[1], BadRequest) and isinstance(results[2], NetworkError)
+    assert queue.stats[REPLY].retried == 4 and queue.stats[REPLY].failed == 2
+    assert "1 sent, 2 failed, 4 retried" in queue.status_line()
+
+
+@pytest.mark.asyncio
+async def test_newer_edit_of_a_message_supersedes_the_queued_one():
+    sent = []
+    send = _recorder(sent)
+    queue = DeliveryQueue(chat_interval=0.05)
+
+    first = asyncio.create_task(queue.submit(1, send(1, "checking"), priority=PROGRESS, key=(1, 7)))
+    await asyncio.sleep(0.01)  # sent; the chat is now paced for 50ms
+    results = await asyncio.gather(
+        first,
+        queue.submit(1, send(1, "still checking"), priority=PROGRESS, key=(1, 7)),
+        queue.submit(1, send(1, "result"), key=(1, 7)),
+    )
+
+    assert results == ["checking", None, "result"]
+    assert [text for _chat, text, _at in sent] == ["checking", "result"]
+    assert queue.stats[PROGRESS].superseded == 1
+
+
+@pytest.mark.asyncio
+async def test_alert_burst_reaches_every_subscriber_despite_flood_control():
+    bot = SamezuBot()
+    bot.get_subscribers = lambda: [(str(chat_id), "@user|samezu|all") for chat_id in range(1, 41)]
+    bot.delivery_queue = DeliveryQueue(rate=1000, burst=10, chat_interval=0)
+    delivered = []
+    flood = [_flood_control(0.05)]
+
+    async def send(chat_id, text, parse_mode='HTML'):
+        if chat_id == 20 and flood:
+            raise flood.pop()
+        delivered.append(chat_id)
+
+    bot._telegram_send = send
+    await bot._send_notifications_to_subscribers(CHECK_TOKYO_ARI, source="tokyo")
+
+    assert sorted(delivered) == list(range(1, 41))
+    assert bot.delivery_queue.stats[ALERT].retried == 1
+    assert bot.delivery_queue.depth() == 0
@@ -0,0 +1,100 @@
+"""Scheduler early alerts: subscribers hear about new slots on the first period that shows them."""
+
+import asyncio
+
+import pytest
+
+import run_bot
+from reservation_checker_playwright import PeriodSlots
+from run_bot import SamezuBot
+from tests.test_helpers import check_from_slots
+
+SLOTS = [
+    {"date": "06/05 (Thu)", "facility": "鮫洲試験場", "applicant_type": "住民票のある方"},
+    {"date": "07/10 (Thu)", "facility": "鮫洲試験場", "applicant_type": "住民票のある方"},
+]
+RESULT = check_from_slots(SLOTS, facilities_label=["鮫洲試験場"])
+EARLY, LATE = RESULT.slots[:1], RESULT.slots[1:]
+
+
+def _scripted_bot(streamed, result=RESULT):
+    """Bot whose Tokyo run_check streams the given per-period slots, then returns result."""
+    bot = SamezuBot()
+    bot.last_notified["tokyo"] = None
+    bot._persist_last_notified = lambda: None
+    bot.get_subscribers = lambda: [("111", "@alice|samezu|relevant")]
+    sends = []
+
+    async def run_check(*args, **kwargs):
+        for period, slots in enumerate(streamed, start=1):
+            await asyncio.sleep(0)
+            bot.reservation_checker.period_listener(PeriodSlots("week", 0, period, slots, None))
+            await asyncio.sleep(0)
+        return result
+
+    async def send(chat_id, text, parse_mode='HTML'):
+        sends.append(text)
+
+    bot.reservation_checker.run_check = run_check
+    bot._telegram_send = send
+    return bot, sends
+
+
+def _signature(bot, check):
+    return run_bot.scheduler_notify_signature(
+        check, default_slot_types=list(bot.reservation_checker.target_slot_types)
+    )
+
+
+@pytest.mark.asyncio
+async def test_first_period_alerts_early_and_the_final_result_does_not_repeat_it():
+    bot, sends = _scripted_bot([EARLY, ()], result=check_from_slots(SLOTS[:1], facilities_label=["鮫洲試験場"]))
+
+    await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+
+    assert len(sends) == 1
+    assert "Early alert" in sends[0] and EARLY[0].date in sends[0]
+    assert bot.last_notified["tokyo"] == _signature(bot, bot.cache['result'])
+
+    await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+    assert len(sends) == 1
+
+
+@pytest.mark.asyncio
+async def test_final_result_alerts_only_on_slots_later_in_the_walk():
+    bot, sends = _scripted_bot([EARLY, LATE])
+
+    await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+
+    assert len(sends) == 2
+    assert "Early alert" in sends[0] and LATE[0].date not in sends[0]
+    assert "Early alert" not in sends[1] and LATE[0].date in sends[1]
+    assert EARLY[0].date not in sends[1] and "not repeated" in sends[1]
+    assert bot.last_notified["tokyo"] == _signature(bot, RESULT)
+
+
+@pytest.mark.asyncio
+async def test_no_early_alert_when_disabled(monkeypatch):
+    monkeypatch.setattr(run_bot, "EARLY_ALERTS", False)
+    bot, sends = _scripted_bot([EARLY, LATE])
+
+    await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+
+    assert len(sends) == 1 and "Early alert" not in sends[0]
+    assert EARLY[0].date in sends[0] and LATE[0].date in sends[0]
+
+
+@pytest.mark.asyncio
+async def test_more_slots_after_an_early_alert_are_sent_without_the_early_ones():
+    extra = {"date": "08/21 (Thu)", "facility": "鮫洲試験場", "applicant_type": "住民票のある方"}
+    result = check_from_slots(SLOTS + [extra], facilities_label=["鮫洲試験場"])
+    bot, sends = _scripted_bot([EARLY, result.slots[1:]], result=result)
+
+    await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+    await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+
+    assert len(sends) == 2
+    assert EARLY[0].date in sends[0]
+    assert EARLY[0].date not in sends[1]
+    assert all(slot.date in sends[1] for slot in result.slots[1:])
+    assert bot.cache['result'] is result
@@ -0,0 +1,149 @@
+"""Engine selection: fixed modes, auto fallback, score-driven preference, bot wiring."""
+
+from dataclasses import replace
+from unittest.mock import patch
+
+import pytest
+
+from domain import CheckResult, Slot
+from engine_router import EngineRouter
+from run_bot import SamezuBot
+from sources import SOURCES, SourceRegistry
+
+SLOT = Slot(date="08/14", facility="外国免許四輪車", applicant_type="普通車ＡＭ")
+
+
+class FakeEngine:
+    def __init__(self, name, outcomes):
+        self.engine_name = name
+        self.source_name = "kanagawa"
+        self.target_url = "https://example.com"
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.last_outcome = None
+
+    async def run_check(self, send_notifications=False, use_month_navigation=False, show_all=False):
+        self.calls += 1
+        self.last_outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if self.last_outcome == "ok":
+            return CheckResult.from_slots([SLOT])
+        return CheckResult.from_error(f"❌ {self.engine_name} {self.last_outcome}")
+
+    def session_status_line(self):
+        return "no scrapes yet"
+
+
+@pytest.mark.asyncio
+async def test_fixed_mode_uses_only_that_engine():
+    http, playwright = FakeEngine("http", ["blocked"]), FakeEngine("playwright", [])
+    router = EngineRouter({"http": http, "playwright": playwright}, mode="http")
+
+    check = await router.run_check()
+
+    assert check.is_error
+    assert (http.calls, playwright.calls) == (1, 0)
+    assert router.target_url == "https://example.com"
+
+
+@pytest.mark.asyncio
+async def test_auto_tries_http_first_and_falls_back_on_challenge():
+    http, playwright = FakeEngine("http", ["blocked"]), FakeEngine("playwright", [])
+    router = EngineRouter({"http": http, "playwright": playwright}, mode="auto")
+
+    check = await router.run_check()
+
+    assert check.slots == (SLOT,)
+    assert (http.calls, playwright.calls) == (1, 1)
+    assert router.last_engine == "playwright"
+    assert router.last_fallback
+    assert "fallback" in router.status_line()
+
+
+@pytest.mark.asyncio
+async def test_auto_does_not_fall_back_after_a_timeout():
+    http, playwright = FakeEngine("http", ["timeout"]), FakeEngine("playwright", [])
+    router = EngineRouter({"http": http, "playwright": playwright}, mode="auto")
+
+    check = await router.run_check()
+
+    assert check.is_error
+    assert (http.calls, playwright.calls) == (1, 0)
+    assert router.last_outcome == "timeout" and not router.last_fallback
+
+
+@pytest.mark.asyncio
+async def test_fallback_latency_counts_from_the_start_of_the_check():
+    clock = [0.0]
+
+    class TimedEngine(FakeEngine):
+        def __init__(self, name, outcomes, seconds):
+            super().__init__(name, outcomes)
+            self.seconds = seconds
+
+        async def run_check(self, **kwargs):
+            clock[0] += self.seconds
+            return await super().run_check(**kwargs)
+
+    http = TimedEngine("http", ["refused"], seconds=40.0)
+    playwright = TimedEngine("playwright", [], seconds=20.0)
+    router = EngineRouter({"http": http, "playwright": playwright}, mode="auto")
+
+    with patch("engine_router.time.monotonic", lambda: clock[0]):
+        await router.run_check()
+
+    assert router.last_fallback and router.last_seconds == 60.0
+    assert router.scores["playwright"].latency == 60.0
+
+
+@pytest.mark.asyncio
+async def test_auto_demotes_failing_engine_then_probes_it_again():
+    http = FakeEngine("http", ["anomaly"] * 3)
+    playwright = FakeEngine("playwright", [])
+    router = EngineRouter({"http": http, "playwright": playwright}, mode="auto", probe_interval=4)
+
+    await router.run_check()  # http fails → fallback; http now unhealthy
+    assert router.engine_order() == ["playwright", "http"]
+    assert router.engine_order() == ["playwright", "http"]
+    assert router.engine_order() == ["http", "playwright"]  # probe
+
+
+@pytest.mark.asyncio
+async def test_auto_prefers_faster_healthy_engine():
+    router = EngineRouter(
+        {"http": FakeEngine("http", []), "playwright": FakeEngine("playwright", [])}, mode="auto"
+    )
+    router.scores["http"].record(True, 30.0)
+    router.scores["playwright"].record(True, 10.0)
+
+    assert router.engine_order()[0] == "playwright"
+
+
+def test_auto_ranks_untried_engine_after_measured_one_until_probed():
+    router = EngineRouter(
+        {"http": FakeEngine("http", []), "playwright": FakeEngine("playwright", [])},
+        mode="auto", probe_interval=3,
+    )
+    router.scores["playwright"].record(True, 10.0)
+
+    assert router.engine_order() == ["playwright", "http"]
+    assert router.engine_order() == ["playwright", "http"]
+    assert router.engine_order() == ["http", "playwright"]  # probe measures the untried engine
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        EngineRouter({"playwright": FakeEngine("playwright", [])}, mode="http")
+
+
+def test_bot_builds_engines_per_source_from_config():
+    engines = {"kanagawa": "auto", "saitama": "http"}
+    registry = SourceRegistry([replace(spec, engine=engines.get(spec.key)) for spec in SOURCES])
+    with patch("sources.SCRAPE_ENGINE", "playwright"), patch("run_bot.SOURCES", registry):
+        bot = SamezuBot()
+
+    assert list(bot.reservation_checker.engines) == ["playwright"]
+    assert list(bot.kanagawa_checker.engines) == ["http", "playwright"]
+    assert list(bot.saitama_checker.engines) == ["http"]
+    assert bot.http_pool is not None
+    assert bot.kanagawa_checker.engines["http"].http_pool is bot.http_pool
+    assert bot.kanagawa_checker.target_slot_types
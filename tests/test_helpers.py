@@ -1,6 +1,9 @@
 """Shared CheckResult fixtures for bot tests."""
 
+import asyncio
+
 from domain import CheckResult
+from scrape_broker import ScrapeRequest
 
 EXAMPLE_URL = "http://example.com"
 
@@ -13,6 +16,16 @@ def check_error(message: str):
     return CheckResult.from_error(message, target_url=EXAMPLE_URL)
 
 
+def queue_check(bot, scrape_key, user_id, chat_id, check_source=None, show_all=False,
+                use_month_navigation=False, force=False, message_id=None):
+    """Attach a /check request like check_command does; returns its flight."""
+    request = ScrapeRequest(user_id, chat_id, check_source, show_all, use_month_navigation, force, message_id)
+    flight, created = bot.scrape_broker.attach(scrape_key, request)
+    if created:
+        flight.task = asyncio.create_task(bot._flight_task(flight))
+    return flight
+
+
 def check_from_slots(slots, *, facilities_label=()):
     return CheckResult.from_slots(
         slots,
@@ -0,0 +1,127 @@
+"""HTTP scrape engine: form-POST paging, waiting room back-off, challenge / anomaly outcomes."""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from config_template import KANAGAWA_TARGET_FACILITIES, KANAGAWA_TARGET_URL
+from reservation_checker_http import HttpClientPool, HttpReservationChecker
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+KANAGAWA_TABLE = (FIXTURES / 'kanagawa_calendar_sample.html').read_text(encoding='utf-8')
+NAV_PREFIX = "https://dshinsei.e-kanagawa.lg.jp/140007-u/reserve/facilitySelect_dateTrans?movePage="
+
+
+def _page(table, title="施設予約", next_enabled=True, token="t1"):
+    """Wrap a captured calendar in the page's form; the fixture carries its own nav buttons."""
+    if next_enabled:
+        for label in ("2週後＞", "1か月後＞"):
+            table = table.replace(f'value="{label}" disabled=""', f'value="{label}"')
+    return (
+        f"<html><head><title>{title}</title></head><body><form action='#'>"
+        f"<input type='hidden' name='token' value='{token}'>"
+        f"{table}</form></body></html>"
+    )
+
+
+def _checker(handler, pool=None):
+    pool = pool or HttpClientPool(transport=httpx.MockTransport(handler))
+    checker = HttpReservationChecker(
+        target_url=KANAGAWA_TARGET_URL,
+        target_facilities=KANAGAWA_TARGET_FACILITIES,
+        target_slot_types=["普通車ＡＭ", "普通車ＰＭ"],
+        source_name="kanagawa",
+        http_pool=pool,
+    )
+    return checker, pool
+
+
+@pytest.mark.asyncio
+async def test_http_engine_pages_with_form_post_and_returns_check_result():
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        if request.method == "GET":
+            return httpx.Response(200, text=_page(KANAGAWA_TABLE), headers={"set-cookie": "sid=1; Path=/"})
+        second_period = KANAGAWA_TABLE.replace("08/", "09/")
+        return httpx.Response(200, text=_page(second_period, next_enabled=False, token="t2"))
+
+    checker, pool = _checker(handler)
+    check = await checker.run_check(use_month_navigation=False)
+
+    assert not check.is_error
+    assert {s.date[:5] for s in check.slots} == {"08/13", "08/14", "09/13", "09/14"}
+    assert [r.method for r in seen] == ["GET", "POST"]
+    assert str(seen[1].url) == NAV_PREFIX + "next"
+    assert seen[1].content == b"token=t1"
+    assert seen[1].headers["cookie"] == "sid=1"
+    assert checker.last_outcome == "ok"
+    assert checker.last_transfer["requests"] == 2
+    assert pool.client_for(KANAGAWA_TARGET_URL) is pool.client_for(KANAGAWA_TARGET_URL)
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_http_engine_month_navigation_stops_when_dates_repeat():
+    posts = []
+
+    def handler(request):
+        if request.method == "POST":
+            posts.append(str(request.url))
+        return httpx.Response(200, text=_page(KANAGAWA_TABLE))
+
+    checker, pool = _checker(handler)
+    check = await checker.run_check(use_month_navigation=True)
+
+    assert posts == [NAV_PREFIX + "oneMonthLater"]
+    assert len(check.slots) == 3
+    # The repeated end page is the end marker, not a period of its own
+    assert check.periods_scanned == 1 and check.periods_changed == 1
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_http_engine_backs_off_in_waiting_room():
+    responses = iter([
+        _page("", title="Waiting Room", next_enabled=False) + "<p>予想待機時間は 1 分です</p>",
+        _page(KANAGAWA_TABLE, next_enabled=False),
+    ])
+    checker, pool = _checker(lambda request: httpx.Response(200, text=next(responses)))
+
+    with patch("reservation_checker_http.asyncio.sleep", new=AsyncMock()) as sleep:
+        check = await checker.run_check()
+
+    sleep.assert_awaited_once_with(60)
+    assert len(check.slots) == 3
+    assert checker.session_stats["fresh"]["waiting_room_hits"] == 1
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_http_engine_reports_challenge_as_blocked_and_drops_cookies():
+    pool = HttpClientPool(transport=httpx.MockTransport(
+        lambda request: httpx.Response(403, text="<html><head><title>Just a moment...</title></head></html>")
+    ))
+    pool.client_for(KANAGAWA_TARGET_URL).cookies.set("cf_clearance", "stale")
+    checker, _ = _checker(None, pool=pool)
+
+    check = await checker.run_check()
+
+    assert check.is_error
+    assert checker.last_outcome == "blocked"
+    assert not len(pool.client_for(KANAGAWA_TARGET_URL).cookies)
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_http_engine_flags_page_without_calendar_as_anomaly():
+    checker, pool = _checker(lambda request: httpx.Response(200, text=_page("<p>メンテナンス中</p>")))
+
+    check = await checker.run_check()
+
+    assert check.is_error
+    assert checker.last_outcome == "anomaly"
+    await pool.aclose()
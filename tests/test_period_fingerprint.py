@@ -0,0 +1,94 @@
+"""Period fingerprints: reuse of unchanged periods, periods_changed, scheduler short-circuit."""
+
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from calendar_parser import CalendarParser, matrix_fingerprint
+from config_template import KANAGAWA_TARGET_FACILITIES, KANAGAWA_TARGET_URL
+from reservation_checker_http import HttpClientPool, HttpReservationChecker
+from run_bot import SamezuBot
+from tests.test_helpers import CHECK_TOKYO_ARI
+from tests.test_http_engine import _page
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+KANAGAWA_TABLE = (FIXTURES / 'kanagawa_calendar_sample.html').read_text(encoding='utf-8')
+
+
+def test_fingerprint_tracks_slot_markers_and_dates_only():
+    matrix = CalendarParser(KANAGAWA_TARGET_FACILITIES).matrix(KANAGAWA_TABLE)
+    # Whitespace and inline SVG styling (text of labelled cells) differ per backend
+    restyled = [
+        [[tag, "<style/>" if aria else f" {text} ", aria, sr] for tag, text, aria, sr in row] for row in matrix
+    ]
+    booked = [[list(cell) for cell in row] for row in matrix]
+    cell = next(cell for row in booked for cell in row if cell[2] == "予約可能")
+    cell[2] = "空き無"
+    moved = CalendarParser(KANAGAWA_TARGET_FACILITIES).matrix(KANAGAWA_TABLE.replace("08/", "09/"))
+
+    assert matrix_fingerprint(restyled) == matrix_fingerprint(matrix)
+    assert matrix_fingerprint(booked) != matrix_fingerprint(matrix)
+    assert matrix_fingerprint(moved) != matrix_fingerprint(matrix)
+
+
+@pytest.mark.asyncio
+async def test_unchanged_periods_reuse_slots_and_report_zero_changes():
+    tables = {"first": KANAGAWA_TABLE, "second": KANAGAWA_TABLE.replace("08/", "09/")}
+
+    def handler(request):
+        if request.method == "GET":
+            return httpx.Response(200, text=_page(tables["first"]))
+        return httpx.Response(200, text=_page(tables["second"], next_enabled=False))
+
+    pool = HttpClientPool(transport=httpx.MockTransport(handler))
+    checker = HttpReservationChecker(
+        target_url=KANAGAWA_TARGET_URL,
+        target_facilities=KANAGAWA_TARGET_FACILITIES,
+        target_slot_types=["普通車ＡＭ", "普通車ＰＭ"],
+        source_name="kanagawa",
+        http_pool=pool,
+    )
+
+    first = await checker.run_check()
+    with patch.object(checker, "_slots_from_matrix", wraps=checker._slots_from_matrix) as parse:
+        second = await checker.run_check()
+        tables["second"] = tables["second"].replace('aria-label="予約可能"', 'aria-label="空き無"', 1)
+        third = await checker.run_check()
+
+    assert first.periods_changed == 2
+    assert second.periods_changed == 0
+    assert second.slots == first.slots
+    assert second.fingerprint == first.fingerprint
+    assert third.periods_changed == 1
+    assert third.fingerprint != first.fingerprint
+    assert parse.call_count == 1  # only the changed period of the third scrape was parsed
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_short_circuits_when_calendar_fingerprint_repeats():
+    bot = SamezuBot()
+    check = replace(CHECK_TOKYO_ARI, periods_changed=0, fingerprint="f1")
+    sent = []
+
+    async def fake_run_check(*args, **kwargs):
+        return check
+
+    async def fake_send(check, source=None):
+        sent.append(source)
+
+    bot.reservation_checker.run_check = fake_run_check
+    bot._send_notifications_to_subscribers = fake_send
+
+    await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+    first_timestamp = bot.cache['timestamp']
+    with patch("run_bot.scheduler_notify_signature") as signature:
+        await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+
+    assert sent == ["tokyo"]
+    signature.assert_not_called()
+    assert bot.cache['timestamp'] >= first_timestamp
+    assert bot.last_notified["tokyo"] is not None
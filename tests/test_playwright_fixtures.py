@@ -83,3 +83,45 @@ async def test_playwright_parses_tokyo_fixture_open_slot():
     assert slots[0].facility == "鮫洲試験場"
     assert slots[0].applicant_type == "29の国･地域以外の方で、住民票のない方"
     assert "08/21" in slots[0].date
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture,facilities", [
+    ("kanagawa_calendar_sample.html", KANAGAWA_TARGET_FACILITIES),
+    ("saitama_calendar_sample.html", SAITAMA_TARGET_FACILITIES),
+    ("tokyo_calendar_sample.html", TARGET_FACILITIES),
+])
+async def test_evaluate_extraction_matches_dom_walk(fixture, facilities, monkeypatch):
+    checker = ReservationChecker(target_facilities=facilities, target_slot_types=[])
+    html = (FIXTURES / fixture).read_text(encoding="utf-8")
+
+    monkeypatch.setattr("reservation_checker_playwright.CALENDAR_EXTRACTION_MODE", "dom")
+    dom_slots = await _slots_from_fixture_html(checker, html)
+    dom_calls = checker.last_extraction_stats["dom_calls"]
+
+    monkeypatch.setattr("reservation_checker_playwright.CALENDAR_EXTRACTION_MODE", "evaluate")
+    evaluate_slots = await _slots_from_fixture_html(checker, html)
+
+    assert evaluate_slots == dom_slots
+    assert checker.last_extraction_stats["dom_calls"] == 1 < dom_calls
+
+
+@pytest.mark.asyncio
+async def test_calendar_ready_detects_parsable_fixture_and_header_change():
+    checker = ReservationChecker(target_facilities=KANAGAWA_TARGET_FACILITIES)
+    html = (FIXTURES / "kanagawa_calendar_sample.html").read_text(encoding="utf-8")
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        try:
+            page = await browser.new_page()
+            await page.set_content(html, wait_until="domcontentloaded")
+            fingerprint = await checker._calendar_fingerprint(page)
+            assert fingerprint and "08/09" in fingerprint
+
+            assert await checker._wait_for_calendar_ready(page, ceiling_ms=1000) is True
+            # Same calendar still rendered → not "changed" within the ceiling
+            assert await checker._wait_for_calendar_ready(
+                page, ceiling_ms=300, previous=fingerprint
+            ) is False
+        finally:
+            await browser.close()
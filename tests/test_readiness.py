@@ -0,0 +1,72 @@
+"""Event-driven page readiness: fixed waits are only a ceiling."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from reservation_checker_playwright import CALENDAR_READY_JS, ReservationChecker
+
+
+def _page():
+    page = AsyncMock()
+    page.wait_for_function = AsyncMock()
+    page.wait_for_timeout = AsyncMock()
+    return page
+
+
+@pytest.mark.asyncio
+async def test_ready_returns_without_fixed_sleep_when_calendar_changes():
+    checker = ReservationChecker()
+    page = _page()
+
+    with patch("reservation_checker_playwright.READINESS_MODE", "event"):
+        ready = await checker._wait_for_calendar_ready(page, ceiling_ms=3000, previous="08/09|08/10|08/11")
+
+    assert ready is True
+    page.wait_for_function.assert_awaited_once_with(
+        CALENDAR_READY_JS, arg="08/09|08/10|08/11", timeout=3000
+    )
+    page.wait_for_timeout.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ready_falls_back_to_remaining_ceiling_on_timeout():
+    checker = ReservationChecker()
+    page = _page()
+    page.wait_for_function.side_effect = TimeoutError("Timeout 3000ms exceeded")
+
+    with patch("reservation_checker_playwright.READINESS_MODE", "event"):
+        ready = await checker._wait_for_calendar_ready(page, ceiling_ms=3000)
+
+    assert ready is False
+    page.wait_for_timeout.assert_awaited_once()
+    waited = page.wait_for_timeout.await_args.args[0]
+    assert 0 < waited <= 3000
+
+
+@pytest.mark.asyncio
+async def test_fixed_mode_sleeps_full_ceiling():
+    checker = ReservationChecker()
+    page = _page()
+
+    with patch("reservation_checker_playwright.READINESS_MODE", "fixed"):
+        ready = await checker._wait_for_calendar_ready(page, ceiling_ms=2000)
+
+    assert ready is False
+    page.wait_for_function.assert_not_called()
+    page.wait_for_timeout.assert_awaited_once_with(2000)
+
+
+@pytest.mark.asyncio
+async def test_check_periods_records_time_to_ready_per_period():
+    checker = ReservationChecker()
+    page = _page()
+    # Combined period probe: calendar present, no next button → single period
+    page.evaluate = AsyncMock(return_value={'end': False, 'next': 'missing', 'lastDate': '08/22'})
+    checker.wait_for_page_load = AsyncMock()
+    checker.get_available_dates = AsyncMock(return_value=[])
+
+    await checker._check_periods(page, "week", max_periods=5)
+
+    assert len(checker.last_period_ready_ms) == 1
+    assert checker.last_period_ready_ms[0] >= 0
@@ -0,0 +1,101 @@
+"""Replay engine: archived / hand-made calendars through run_check() and the bot pipeline."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import run_bot
+from engine_router import EngineRouter
+from reservation_checker_replay import ReplayRecording, ReplayReservationChecker
+from run_bot import SamezuBot
+from snapshot_archive import SnapshotArchive
+from tests.test_sliced_navigation import (
+    FACILITY,
+    LAST_PERIOD,
+    SLOT_TYPE,
+    RelativePagingSite,
+    _calendar,
+    _http_checker,
+)
+
+FULL = [_calendar(position) for position in range(LAST_PERIOD + 1)]
+BOOKED = [html.replace("予約可能", "空き無") for html in FULL]
+
+
+def _replay(recording, **kwargs):
+    return ReplayReservationChecker(
+        target_facilities=[FACILITY],
+        target_slot_types=[SLOT_TYPE],
+        source_name="tokyo",
+        recording=recording,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_archived_scrapes_replay_with_the_same_results(tmp_path):
+    archive = SnapshotArchive(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    live = _http_checker(RelativePagingSite())
+    live.snapshot_archive = archive
+    recorded = [await live.run_check(), await live.run_check()]
+
+    checker = _replay(ReplayRecording.from_archive(archive, "tokyo"))
+    replayed = [await checker.run_check(), await checker.run_check()]
+    exhausted = await checker.run_check()
+
+    assert [c.slots for c in replayed] == [c.slots for c in recorded]
+    assert [c.fingerprint for c in replayed] == [c.fingerprint for c in recorded]
+    assert replayed[0].calendar_complete and replayed[0].covered_through == recorded[0].covered_through
+    assert replayed[1].periods_changed == 0
+    assert exhausted.is_error and checker.last_outcome == "exhausted"
+
+
+@pytest.mark.asyncio
+async def test_replayed_walk_cut_at_its_limit_is_not_calendar_complete(tmp_path):
+    archive = SnapshotArchive(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    live = _http_checker(RelativePagingSite())
+    live.snapshot_archive = archive
+    with patch("reservation_checker_playwright.PERIOD_MAX_LIMIT", 3), \
+            patch("reservation_checker_playwright.PERIOD_LIMIT", 3):
+        recorded = await live.run_check()
+
+    replayed = await _replay(ReplayRecording.from_archive(archive, "tokyo")).run_check()
+
+    assert not recorded.calendar_complete and not replayed.calendar_complete
+    assert replayed.covered_through == recorded.covered_through
+
+
+@pytest.mark.asyncio
+async def test_time_compressed_replay_serves_the_scrape_current_at_recorded_time():
+    clock = [0.0]
+    recording = ReplayRecording.from_html([BOOKED, FULL, BOOKED], interval=300)
+    checker = _replay(recording, speed=100, clock=lambda: clock[0])
+
+    first = await checker.run_check()
+    clock[0] = 3.5  # 350 recorded seconds later
+    second = await checker.run_check()
+    clock[0] = 60.0
+    last = await checker.run_check()
+
+    assert not first.has_slots
+    assert len(second.slots) == LAST_PERIOD + 1
+    assert not last.has_slots
+    assert checker.last_replayed.scrape_id == "html-2"
+
+
+@pytest.mark.asyncio
+async def test_bot_scheduler_runs_against_a_replayed_day(monkeypatch):
+    monkeypatch.setattr(run_bot, "EARLY_ALERTS", False)  # one alert per scrape that finds new slots
+    bot = SamezuBot()
+    bot._persist_last_notified = lambda: None
+    bot.last_notified["tokyo"] = None
+    recording = ReplayRecording.from_html([BOOKED, FULL, FULL, BOOKED, FULL])
+    bot.reservation_checker = EngineRouter({"replay": _replay(recording)}, mode="replay")
+    bot._send_notifications_to_subscribers = AsyncMock()
+
+    for _ in range(len(recording)):
+        await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+
+    assert bot._send_notifications_to_subscribers.await_count == 2
+    assert bot.cache['result'].has_slots
+    assert bot.reservation_checker.last_engine == "replay"
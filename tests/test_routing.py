@@ -167,6 +167,32 @@ def test_notification_messages_tokyo_skips_saitama_only_subscriber():
     assert messages == []
 
 
+def test_notification_messages_render_once_per_subscription_profile(monkeypatch):
+    import run_bot
+
+    bot = make_bot()
+    subscribers = [(str(1000 + n), f"@user{n}|samezu|relevant") for n in range(50)]
+    subscribers += [(str(2000 + n), f"@fan{n}|samezu,fuchu|all") for n in range(50)]
+    subscribers += [("3000", "@kana|kanagawa|relevant"), ("3001", None)]
+    bot.get_subscribers = lambda: subscribers
+    renders = []
+
+    def counting_format(check, **kwargs):
+        renders.append(kwargs)
+        return format_check_message(check, **kwargs)
+
+    monkeypatch.setattr(run_bot, "format_check_message", counting_format)
+    messages = bot._notification_messages_for_subscribers(CHECK_TOKYO_BOTH, source="tokyo")
+
+    assert len(renders) == 3  # samezu/relevant, samezu+fuchu/all, legacy default profile
+    assert len(messages) == 101
+    by_chat = dict(messages)
+    assert by_chat[1000].startswith("🔔 @user0\n\n") and by_chat[1049].startswith("🔔 @user49\n\n")
+    assert by_chat[1000].split("\n\n", 1)[1] == by_chat[1049].split("\n\n", 1)[1]
+    assert "🏢 <b>府中試験場</b>" in by_chat[2000] and "🏢 <b>府中試験場</b>" not in by_chat[1000]
+    assert not by_chat[3001].startswith("🔔")
+
+
 # --- _apply_check_filters for /check samezu ---
 
 
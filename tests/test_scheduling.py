@@ -0,0 +1,103 @@
+"""Per-source fixed-rate schedules: grid timing, jitter, catch-up, lag, deferred runs."""
+
+import asyncio
+
+import pytest
+
+from run_bot import SamezuBot
+from scheduling import SourceSchedule, build_schedules
+from sources import SOURCES, SourceRegistry, builtin_sources, source_from_config
+from tests.test_helpers import check_from_slots
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _run(schedule, clock, duration):
+    """Wait for the schedule's next due time, 'scrape' for duration, return (start, lag)."""
+    clock.now += schedule.delay()
+    start = clock.now
+    lag = schedule.started()
+    clock.now += duration
+    schedule.finished()
+    return start, lag
+
+
+def test_runs_stay_on_the_fixed_rate_grid_regardless_of_scrape_duration():
+    clock = Clock()
+    schedule = SourceSchedule("tokyo", 300, phase=100, anchor=clock(), clock=clock)
+
+    starts = [_run(schedule, clock, duration)[0] - 1000 for duration in (90, 10, 250)]
+
+    assert starts == [100, 400, 700]
+    assert schedule.missed == 0 and schedule.max_lag == 0
+
+
+def test_jitter_delays_each_run_within_its_bound_without_counting_as_lag():
+    clock = Clock()
+    draws = iter([0.5, 0.0, 0.99, 0.0])
+    schedule = SourceSchedule("tokyo", 300, jitter=20, anchor=clock(), clock=clock, rng=lambda: next(draws))
+
+    starts = [_run(schedule, clock, 5)[0] - 1000 for _ in range(3)]
+
+    assert starts == [10, 300, pytest.approx(619.8)]
+    assert schedule.max_lag == 0
+
+
+def test_overrun_catches_up_once_and_counts_missed_ticks():
+    clock = Clock()
+    schedule = SourceSchedule("tokyo", 300, anchor=clock(), clock=clock)
+
+    _run(schedule, clock, 700)  # runs from 0 to 700: the 300 tick is missed, 600 is overdue
+    start, lag = _run(schedule, clock, 10)
+
+    assert start - 1000 == 700
+    assert lag == 100
+    assert schedule.missed == 1
+    assert schedule.next_due - 1000 == 900
+    assert "1 missed" in schedule.status_line()
+
+
+def test_sources_are_staggered_unless_their_spec_sets_a_phase():
+    extra = source_from_config({
+        "key": "chiba", "url": "https://example.com", "facilities": ["x"], "interval": 600, "phase": 30,
+    })
+    registry = SourceRegistry(builtin_sources() + [extra])
+
+    schedules = build_schedules(registry, default_interval=300, default_jitter=5, anchor=0.0)
+
+    assert [s.phase for s in schedules.values()] == [0, 75, 150, 30]
+    assert schedules["chiba"].interval == 600
+    assert all(s.jitter == 5 for s in schedules.values())
+    assert [s.phase for s in build_schedules(SOURCES, 300, stagger=False).values()] == [0, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_tick_waits_for_a_running_scrape_instead_of_skipping():
+    bot = SamezuBot()
+    bot.last_notified["tokyo"] = None
+    bot._persist_last_notified = lambda: None
+    scrapes = []
+
+    async def fake_run_check(*args, **kwargs):
+        scrapes.append("tokyo")
+        return check_from_slots([])
+
+    bot.reservation_checker.run_check = fake_run_check
+    schedule = SourceSchedule("tokyo", 300)
+
+    await bot.scrape_locks["tokyo"].acquire()
+    tick = asyncio.create_task(bot._run_scheduled_tick(schedule))
+    await asyncio.sleep(0.05)
+    assert scrapes == [] and schedule.deferred == 1
+    bot.scrape_locks["tokyo"].release()
+    await tick
+
+    assert scrapes == ["tokyo"]
+    assert schedule.runs == 1 and schedule.last_lag >= 0.05
+    assert bot.cache["result"] is not None
@@ -0,0 +1,130 @@
+"""Scrape deadlines: phase cancellation, partial results, scheduler / waiter handling."""
+
+import asyncio
+from dataclasses import replace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from domain import format_check_message
+from run_bot import SamezuBot
+from scrape_deadline import ScrapeDeadline, ScrapeDeadlineExceeded
+from tests.test_calendar_horizon import PagedCalendar, _checker
+from tests.test_helpers import CHECK_TOKYO_ARI
+from tests.test_sliced_navigation import RelativePagingSite, _http_checker
+
+
+@pytest.mark.asyncio
+async def test_phase_budget_cancels_the_slow_step():
+    cancelled = asyncio.Event()
+
+    async def stuck():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    deadline = ScrapeDeadline(total_seconds=None, phase_budgets={"navigation": 0.05})
+    assert await deadline.run("period", asyncio.sleep(0, result="ok")) == "ok"
+    with pytest.raises(ScrapeDeadlineExceeded) as excinfo:
+        await deadline.run("navigation", stuck())
+
+    assert cancelled.is_set()
+    assert excinfo.value.phase == "navigation"
+    assert deadline.expired is excinfo.value
+
+
+@pytest.mark.asyncio
+async def test_total_deadline_caps_a_generous_phase_budget():
+    clock = [100.0]
+    deadline = ScrapeDeadline(total_seconds=30, phase_budgets={"waiting_room": 180}, clock=lambda: clock[0])
+    clock[0] = 130.0
+
+    with pytest.raises(ScrapeDeadlineExceeded) as excinfo:
+        await deadline.run("waiting_room", asyncio.sleep(10))
+
+    assert excinfo.value.scope == "scrape"
+    assert "30s scrape budget" in str(excinfo.value)
+
+
+@pytest.mark.asyncio
+async def test_playwright_walk_keeps_periods_scanned_before_a_stalled_transition():
+    checker = _checker()
+    page = PagedCalendar(periods=6)
+
+    async def click(selector):
+        page.position += 1
+        if page.position == 3:
+            await asyncio.sleep(10)  # the site hangs on the third transition
+
+    page.click = AsyncMock(side_effect=click)
+    with patch("reservation_checker_playwright.SCRAPE_PHASE_BUDGETS", {"navigation": 0.05}):
+        checker._begin_deadline()
+        await checker._check_periods(page, "week")
+        check = checker._stamp_coverage(await checker._finish_check([]))
+
+    assert check.partial
+    assert check.periods_scanned == 3
+    assert checker.horizon.expected("week") is None  # an interrupted walk teaches nothing
+
+
+@pytest.mark.asyncio
+async def test_http_scrape_returns_partial_result_and_keeps_session():
+    site = RelativePagingSite()
+
+    async def slow_site(request):
+        if request.method == "POST" and len(site.requests) >= 3:
+            await asyncio.sleep(10)
+        return site(request)
+
+    checker = _http_checker(slow_site)
+    checker.invalidate_storage_state = MagicMock()
+    with patch("reservation_checker_playwright.SCRAPE_PHASE_BUDGETS", {"navigation": 0.05}):
+        check = await checker.run_check()
+
+    assert not check.is_error
+    assert (check.partial, check.periods_scanned, len(check.slots)) == (True, 3, 3)
+    assert checker.last_outcome == "ok"
+    checker.invalidate_storage_state.assert_not_called()
+    assert "Partial result" in format_check_message(check)
+
+
+@pytest.mark.asyncio
+async def test_deadline_before_any_period_is_a_timeout_error():
+    async def stuck_site(request):
+        await asyncio.sleep(10)
+
+    checker = _http_checker(stuck_site)
+    with patch("reservation_checker_playwright.SCRAPE_PHASE_BUDGETS", {"waiting_room": 0.05}):
+        check = await checker.run_check()
+
+    assert check.is_error
+    assert "waiting room" in check.error
+    assert checker.last_outcome == "timeout"
+
+
+@pytest.mark.asyncio
+async def test_scheduler_alerts_only_new_slots_from_partial_check_and_keeps_cache():
+    bot = SamezuBot()
+    bot._persist_last_notified = lambda: None
+    bot.last_notified["tokyo"] = None
+    partial = replace(CHECK_TOKYO_ARI, partial=True, periods_scanned=2)
+    sent = []
+
+    async def fake_send(check, source=None):
+        sent.append(check)
+
+    bot.reservation_checker.run_check = AsyncMock(return_value=partial)
+    bot._send_notifications_to_subscribers = fake_send
+
+    await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+    notified = bot.last_notified["tokyo"]
+    await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+    bot.reservation_checker.run_check.return_value = replace(partial, slots=())
+    await bot._run_scheduled_check(bot.reservation_checker, bot.cache, "tokyo")
+
+    assert sent == [partial]
+    assert bot.cache['result'] is None
+    assert bot.last_notified["tokyo"] == notified is not None
+    assert "tokyo" not in bot.last_scheduled_fingerprint
@@ -20,6 +20,7 @@ def _playwright_patches():
     mock_context = AsyncMock()
     mock_context.new_page = AsyncMock(return_value=mock_page)
     mock_context.route = AsyncMock()
+    mock_context.on = MagicMock()
 
     mock_browser = AsyncMock()
     mock_browser.new_context = AsyncMock(return_value=mock_context)
@@ -0,0 +1,114 @@
+"""Per-source Playwright storage state: reuse, persistence, invalidation, metrics."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import config_template
+from reservation_checker_playwright import ReservationChecker
+
+STATE = {"cookies": [{"name": "cf_clearance", "value": "abc", "domain": "example.com", "path": "/"}], "origins": []}
+
+
+def _patched_playwright(titles=("Calendar",)):
+    page = AsyncMock()
+    page.title = AsyncMock(side_effect=list(titles) + ["Calendar"] * 10)
+    page.url = "https://example.com"
+    page.context.storage_state = AsyncMock(return_value=STATE)
+
+    context = AsyncMock()
+    context.new_page = AsyncMock(return_value=page)
+    context.on = MagicMock()
+    browser = AsyncMock()
+    browser.new_context = AsyncMock(return_value=context)
+
+    mock_pw = MagicMock()
+    mock_pw.chromium.launch = AsyncMock(return_value=browser)
+    mock_pw.__aenter__ = AsyncMock(return_value=mock_pw)
+    mock_pw.__aexit__ = AsyncMock(return_value=None)
+    return patch("reservation_checker_playwright.async_playwright", return_value=mock_pw), browser, page
+
+
+def _checker(tmp_path, monkeypatch):
+    monkeypatch.setattr("reservation_checker_playwright.STORAGE_STATE_DIR", str(tmp_path))
+    checker = ReservationChecker(source_name="kanagawa")
+    checker.check_all_weeks = AsyncMock(return_value=[])
+    return checker
+
+
+@pytest.mark.asyncio
+async def test_state_stays_in_memory_unless_a_directory_is_configured(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("reservation_checker_playwright.STORAGE_STATE_DIR", config_template.STORAGE_STATE_DIR)
+    checker = ReservationChecker(source_name="kanagawa")
+    checker.check_all_weeks = AsyncMock(return_value=[])
+    patcher, browser, _page = _patched_playwright()
+    with patcher, patch.object(checker, "wait_for_page_load", AsyncMock()):
+        await checker.run_check()
+        await checker.run_check()
+
+    assert checker.storage_state_path is None
+    assert not list(tmp_path.rglob("*.json"))
+    assert browser.new_context.await_args_list[1].kwargs == {"storage_state": STATE}
+
+
+@pytest.mark.asyncio
+async def test_state_saved_after_scrape_and_reused_next_time(tmp_path, monkeypatch):
+    checker = _checker(tmp_path, monkeypatch)
+    patcher, browser, _page = _patched_playwright()
+    with patcher, patch.object(checker, "wait_for_page_load", AsyncMock()):
+        await checker.run_check()
+        await checker.run_check()
+
+    saved = json.loads((tmp_path / "kanagawa.json").read_text(encoding="utf-8"))
+    assert saved == STATE
+    first, second = browser.new_context.await_args_list
+    assert first.kwargs == {}
+    assert second.kwargs == {"storage_state": STATE}
+    assert checker.session_stats["fresh"]["scrapes"] == 1
+    assert checker.session_stats["reused"]["scrapes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_state_loaded_from_disk_by_new_checker(tmp_path, monkeypatch):
+    (tmp_path / "kanagawa.json").write_text(json.dumps(STATE), encoding="utf-8")
+    checker = _checker(tmp_path, monkeypatch)
+    patcher, browser, _page = _patched_playwright()
+    with patcher, patch.object(checker, "wait_for_page_load", AsyncMock()):
+        await checker.run_check()
+
+    assert browser.new_context.await_args.kwargs == {"storage_state": STATE}
+
+
+@pytest.mark.asyncio
+async def test_waiting_room_invalidates_saved_state_and_is_counted(tmp_path, monkeypatch):
+    (tmp_path / "kanagawa.json").write_text(json.dumps(STATE), encoding="utf-8")
+    checker = _checker(tmp_path, monkeypatch)
+    checker._load_storage_state()
+    page = AsyncMock()
+    page.title = AsyncMock(side_effect=["Waiting Room", "Calendar"])
+    page.query_selector_all = AsyncMock(return_value=[object()])
+    checker._scrape_reused_state = True
+
+    await checker.wait_for_page_load(page)
+    checker._record_session_metrics()
+
+    assert not (tmp_path / "kanagawa.json").exists()
+    assert checker._load_storage_state() is None
+    assert checker.session_stats["reused"]["waiting_room_hits"] == 1
+    assert checker.session_stats["reused"]["waiting_room_seconds"] == 5.0
+    assert "reused 1/1 waiting room" in checker.session_status_line()
+
+
+@pytest.mark.asyncio
+async def test_scrape_error_invalidates_saved_state(tmp_path, monkeypatch):
+    (tmp_path / "kanagawa.json").write_text(json.dumps(STATE), encoding="utf-8")
+    checker = _checker(tmp_path, monkeypatch)
+    checker.check_all_weeks = AsyncMock(side_effect=RuntimeError("boom"))
+    patcher, _browser, _page = _patched_playwright()
+    with patcher, patch.object(checker, "wait_for_page_load", AsyncMock()):
+        check = await checker.run_check()
+
+    assert check.is_error
+    assert not (tmp_path / "kanagawa.json").exists()
@@ -0,0 +1,217 @@
+"""Sliced period navigation: slice plan, parallel HTTP sessions, Playwright slice merge."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, patch
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import pytest
+
+from domain import Slot
+from reservation_checker_http import HttpClientPool, HttpReservationChecker
+from reservation_checker_playwright import ReservationChecker, plan_period_slices
+
+FACILITY = "鮫洲試験場"
+SLOT_TYPE = "住民票のある方"
+LAST_PERIOD = 7  # calendar horizon: periods 0..7 (16 weeks)
+START = date(2026, 8, 1)
+
+
+def test_plan_week_slices_overlap_and_last_slice_walks_to_the_end():
+    assert plan_period_slices("week", 20, slices=3, slice_months=1) == [(0, 3), (1, 3), (2, 16)]
+
+
+def test_plan_month_slices_and_single_slice_is_sequential():
+    assert plan_period_slices("month", 20, slices=2, slice_months=2) == [(0, 2), (2, 18)]
+    assert plan_period_slices("week", 20, slices=1, slice_months=1) == [(0, 20)]
+
+
+def _calendar(position):
+    """Two-week calendar for `position` with one open slot on its first day."""
+    days = [START + timedelta(days=14 * position + i) for i in range(14)]
+    headers = "".join(f"<td>{d:%m/%d}</td>" for d in days)
+    cells = "<td><svg aria-label='予約可能'></svg></td>" + "<td><svg aria-label='空き無'></svg></td>" * 13
+    week_disabled = " disabled" if position >= LAST_PERIOD else ""
+    month_disabled = " disabled" if position + 2 > LAST_PERIOD else ""
+    return (
+        f"<html><head><title>施設予約</title></head><body><form>"
+        f"<input type='hidden' name='pos' value='{position}'>"
+        f"<input type='button' value='1か月後＞'{month_disabled}>"
+        f"<input type='button' value='2週後＞'{week_disabled}>"
+        f"<table><tr><th>施設名</th><th>予約枠名</th>{headers}</tr>"
+        f"<tr><th>{FACILITY}</th><th>{SLOT_TYPE}</th>{cells}</tr></table>"
+        f"</form></body></html>"
+    )
+
+
+class RelativePagingSite:
+    """Server keeping each session's calendar position; only relative moves exist."""
+
+    def __init__(self):
+        self.positions = {}
+        self.requests = []
+
+    def __call__(self, request):
+        sid = request.headers.get("cookie", "")
+        sid = dict(part.split("=", 1) for part in sid.split("; ") if part).get("sid")
+        self.requests.append((request.method, sid))
+        if request.method == "GET":
+            sid = str(len(self.positions) + 1)
+            self.positions[sid] = 0
+            headers = [("set-cookie", f"sid={sid}; Path=/"), ("set-cookie", "cf_clearance=ok; Path=/")]
+            return httpx.Response(200, text=_calendar(0), headers=headers)
+        move = parse_qs(urlsplit(str(request.url)).query)["movePage"][0]
+        self.positions[sid] = min(self.positions[sid] + (2 if move == "oneMonthLater" else 1), LAST_PERIOD)
+        return httpx.Response(200, text=_calendar(self.positions[sid]))
+
+
+def _http_checker(site):
+    return HttpReservationChecker(
+        target_url="https://www.keishicho-gto.metro.tokyo.lg.jp/keishicho-u/reserve/offerList_detail?tempSeq=445",
+        target_facilities=[FACILITY],
+        target_slot_types=[SLOT_TYPE],
+        source_name="tokyo",
+        http_pool=HttpClientPool(transport=httpx.MockTransport(site)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_sliced_http_navigation_matches_sequential_with_one_session_per_slice():
+    sequential_site, sliced_site = RelativePagingSite(), RelativePagingSite()
+
+    with patch("reservation_checker_http.PERIOD_NAVIGATION", "sequential"):
+        sequential = await _http_checker(sequential_site).run_check()
+    with patch("reservation_checker_http.PERIOD_NAVIGATION", "sliced"), \
+            patch("reservation_checker_playwright.PERIOD_SLICES", 3), \
+            patch("reservation_checker_playwright.PERIOD_SLICE_MONTHS", 1):
+        sliced = await _http_checker(sliced_site).run_check()
+
+    assert len(sequential.slots) == LAST_PERIOD + 1
+    assert set(sliced.slots) == set(sequential.slots)
+    # Three independent site sessions, each walking only its share of the horizon
+    assert len(sliced_site.positions) == 3
+    longest_chain = max(
+        sum(1 for _method, sid in sliced_site.requests if sid == session) for session in sliced_site.positions
+    )
+    assert longest_chain < len(sequential_site.requests)
+
+
+class BrokenMiddleSliceSite(RelativePagingSite):
+    """The session seeded by one month hop gets a page without a calendar on its next move."""
+
+    def __init__(self):
+        super().__init__()
+        self.hops = {}
+
+    def __call__(self, request):
+        sid = dict(part.split("=", 1) for part in request.headers.get("cookie", "").split("; ") if part).get("sid")
+        move = parse_qs(urlsplit(str(request.url)).query).get("movePage", [None])[0]
+        if move == "oneMonthLater":
+            self.hops[sid] = self.hops.get(sid, 0) + 1
+        elif move is not None and self.hops.get(sid) == 1:
+            return httpx.Response(200, text="<html><head><title>施設予約</title></head><body></body></html>")
+        return super().__call__(request)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("site_class, complete", [(RelativePagingSite, True), (BrokenMiddleSliceSite, False)])
+async def test_sliced_result_is_complete_only_when_every_slice_covered_its_range(site_class, complete):
+    with patch("reservation_checker_http.PERIOD_NAVIGATION", "sliced"), \
+            patch("reservation_checker_playwright.PERIOD_SLICES", 3), \
+            patch("reservation_checker_playwright.PERIOD_SLICE_MONTHS", 1):
+        check = await _http_checker(site_class()).run_check()
+
+    assert check.calendar_complete is complete
+    assert check.covered_through == "11/20"  # the furthest slice's last date, not the last to finish
+
+
+@pytest.mark.asyncio
+async def test_session_clients_share_only_cloudflare_cookies():
+    pool = HttpClientPool(transport=httpx.MockTransport(RelativePagingSite()))
+    main = pool.client_for("https://example.com/a")
+    main.cookies.set("sid", "1", domain="example.com")
+    main.cookies.set("cf_clearance", "ok", domain="example.com")
+
+    extra = pool.session_client("https://example.com/a")
+
+    assert extra.cookies.get("cf_clearance") == "ok"
+    assert extra.cookies.get("sid") is None
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sliced_http_check_closes_its_session_clients_but_not_the_pool():
+    site = RelativePagingSite()
+    checker = _http_checker(site)
+    opened = []
+    session_client = checker.http_pool.session_client
+
+    def tracking_session_client(url):
+        opened.append(session_client(url))
+        return opened[-1]
+
+    checker.http_pool.session_client = tracking_session_client
+    with patch("reservation_checker_http.PERIOD_NAVIGATION", "sliced"), \
+            patch("reservation_checker_playwright.PERIOD_SLICES", 3), \
+            patch("reservation_checker_playwright.PERIOD_SLICE_MONTHS", 1):
+        await checker.run_check()
+
+    assert len(opened) == 2 and all(client.is_closed for client in opened)
+    # The shared transport survives: the next check still reaches the site
+    check = await checker.run_check()
+    assert not check.is_error and len(check.slots) == LAST_PERIOD + 1
+
+
+@pytest.mark.asyncio
+async def test_sliced_playwright_navigation_merges_slices():
+    checker = ReservationChecker(target_facilities=[FACILITY], target_slot_types=[SLOT_TYPE])
+    pages = []
+
+    @asynccontextmanager
+    async def fake_scrape_page():
+        page = AsyncMock()
+        pages.append(page)
+        yield page
+
+    shared = Slot(date="08/29", facility=FACILITY, applicant_type=SLOT_TYPE)
+    checker._scrape_page = fake_scrape_page
+    checker._open_calendar = AsyncMock()
+    checker._hop_months = AsyncMock(side_effect=lambda page, hops: hops < 2)
+    checker._check_periods = AsyncMock(side_effect=[
+        [Slot(date="08/01", facility=FACILITY, applicant_type=SLOT_TYPE), shared],
+        [shared],
+    ])
+
+    with patch("reservation_checker_playwright.PERIOD_NAVIGATION", "sliced"), \
+            patch("reservation_checker_playwright.PERIOD_SLICES", 3), \
+            patch("reservation_checker_playwright.PERIOD_SLICE_MONTHS", 1):
+        check = await checker.run_check()
+
+    assert len(pages) == 3
+    assert [call.kwargs["max_periods"] for call in checker._check_periods.await_args_list] == [3, 3]
+    assert [s.date for s in check.slots] == ["08/01", "08/29"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_slices_keep_their_own_extraction_stats():
+    checker = ReservationChecker(target_facilities=[FACILITY], target_slot_types=[SLOT_TYPE])
+
+    async def evaluate(round_trips):
+        for _ in range(round_trips):
+            await checker._dom_call(asyncio.sleep(0))
+        return []
+
+    async def extract(round_trips):
+        await checker.get_available_dates(round_trips)
+        return checker.last_extraction_stats['dom_calls']
+
+    checker._get_available_dates_evaluate = evaluate
+    with patch("reservation_checker_playwright.CALENDAR_EXTRACTION_MODE", "evaluate"):
+        assert await asyncio.gather(extract(1), extract(3)) == [1, 3]
+
+    checker._walk_stats = {1: ([30.0], 3, 2.0), 0: ([10.0, 20.0], 2, 1.0)}
+    checker._merge_walk_stats()
+    assert checker.last_period_ready_ms == [10.0, 20.0, 30.0]
+    assert checker.last_extraction_stats['dom_calls'] == 5 and checker.last_extraction_stats['elapsed_ms'] == 3.0
@@ -0,0 +1,78 @@
+"""Snapshot archive: compressed pack + index, dedupe of unchanged periods, ring buffer."""
+
+import pytest
+
+from calendar_parser import CalendarParser
+from snapshot_archive import PeriodSnapshot, SnapshotArchive
+from tests.test_calendar_horizon import PagedCalendar, _checker
+from tests.test_sliced_navigation import FACILITY, LAST_PERIOD, RelativePagingSite, _http_checker
+
+
+def _periods(*htmls):
+    return [PeriodSnapshot("week", 0, i + 1, html) for i, html in enumerate(htmls)]
+
+
+def test_scrape_round_trip_and_unchanged_periods_are_stored_once(tmp_path):
+    archive = SnapshotArchive(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    table = "<table>" + "<tr><td>空き無</td></tr>" * 200 + "</table>"
+    first = archive.write_scrape("tokyo", "s1", _periods(table, table.replace("空き無", "予約可能", 1)))
+    second = archive.write_scrape("tokyo", "s2", _periods(table, table), meta={"engine": "http"})
+
+    assert 0 < first < len(table.encode()) * 2
+    assert second == 0
+    assert archive.blobs_reused == 2
+    assert [r["scrape_id"] for r in archive.scrapes("tokyo")] == ["s1", "s2"]
+    loaded = archive.load("tokyo", "s1")
+    assert [meta["period"] for meta, _html in loaded] == [1, 2]
+    assert loaded[1][1] == table.replace("空き無", "予約可能", 1)
+    assert archive.scrapes("tokyo")[1]["engine"] == "http"
+    with pytest.raises(KeyError):
+        archive.load("kanagawa", "s1")
+
+
+def test_ring_buffer_drops_oldest_segments(tmp_path):
+    archive = SnapshotArchive(str(tmp_path), max_bytes=3 * 2000, segments=3, level=0)
+    for n in range(10):
+        archive.write_scrape("tokyo", f"s{n}", _periods(f"<table>{n}</table>" + "x" * 2000))
+
+    kept = [r["scrape_id"] for r in archive.scrapes("tokyo")]
+    assert kept == ["s7", "s8", "s9"]
+    assert archive.disk_bytes("tokyo") < 4 * 2100
+    assert archive.load("tokyo", "s9")[0][1].startswith("<table>9</table>")
+
+
+@pytest.mark.asyncio
+async def test_http_scrape_archives_every_period_page(tmp_path):
+    archive = SnapshotArchive(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    checker = _http_checker(RelativePagingSite())
+    checker.snapshot_archive = archive
+
+    check = await checker.run_check()
+    loaded = archive.load("tokyo", checker.last_snapshot_id)
+
+    assert len(loaded) == LAST_PERIOD + 1
+    assert {meta["kind"] for meta, _html in loaded} == {"page"}
+    parser = CalendarParser([FACILITY])
+    rows = parser.matrix(loaded[-1][1])
+    assert len(check.slots) == LAST_PERIOD + 1
+    assert rows and any(FACILITY in cell[1] for row in rows for cell in row)
+
+
+@pytest.mark.asyncio
+async def test_playwright_walk_captures_tables_only_when_archiving(tmp_path):
+    checker = _checker()
+    page = PagedCalendar(periods=3)
+    await checker._check_periods(page, "week")
+    plain_calls = page.evaluate.await_count
+
+    checker.snapshot_archive = SnapshotArchive(str(tmp_path), max_bytes=1024 * 1024)
+    checker._begin_snapshots()
+    page = PagedCalendar(periods=3)
+    await checker._check_periods(page, "week")
+    await checker._archive_snapshots()
+
+    assert page.evaluate.await_count == plain_calls + 3
+    loaded = checker.snapshot_archive.load("tokyo", checker.last_snapshot_id)
+    assert [(meta["period"], html) for meta, html in loaded] == [
+        (1, "fingerprint 0"), (2, "fingerprint 1"), (3, "fingerprint 2"),
+    ]
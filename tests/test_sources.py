@@ -0,0 +1,68 @@
+"""Source registry: keyword lookups and a config-only extra source wired through the bot."""
+
+from unittest.mock import patch
+
+import pytest
+
+from run_bot import SamezuBot
+from sources import SOURCES, SourceRegistry, builtin_sources, source_from_config
+from tests.test_commands import DummyContext, DummyUpdate
+from tests.test_helpers import check_from_slots
+
+CHIBA = {
+    "key": "chiba",
+    "label": "Chiba",
+    "url": "https://example.com/offerList_detail?tempSeq=1",
+    "facilities": ["外国免許切替"],
+    "slot_types": ["知識確認"],
+    "type_filters": {"skill": ["技能確認"]},
+}
+CHECK_CHIBA = check_from_slots(
+    [
+        {"date": "07/01 (Tue)", "facility": "外国免許切替", "applicant_type": "知識確認"},
+        {"date": "07/02 (Wed)", "facility": "外国免許切替", "applicant_type": "技能確認"},
+    ],
+    facilities_label=["外国免許切替"],
+)
+
+
+def _registry_with_chiba():
+    return SourceRegistry(builtin_sources() + [source_from_config(CHIBA)])
+
+
+def test_builtin_keywords_resolve_through_lookup_tables():
+    assert SOURCES.for_alias("samezu").key == "tokyo"
+    assert SOURCES.for_alias(None) is SOURCES.default
+    assert SOURCES.facility_filter("fuchu") == ["府中試験場"]
+    assert SOURCES.facility_filter("kanagawa") is None
+    assert SOURCES.type_keywords["ない方"] == "nai"
+    assert SOURCES.default_subscription == ["samezu", "fuchu", "kanagawa"]
+    assert SOURCES["tokyo"].facility_filter(["samezu", "fuchu"]) is None
+
+
+def test_duplicate_alias_is_rejected():
+    clash = dict(CHIBA, aliases={"kanagawa": None})
+    with pytest.raises(ValueError):
+        SourceRegistry(builtin_sources() + [source_from_config(clash)])
+
+
+@pytest.mark.asyncio
+async def test_extra_source_gets_checker_cache_lock_and_notifications(tmp_path, monkeypatch):
+    with patch("run_bot.SOURCES", _registry_with_chiba()):
+        bot = SamezuBot()
+        monkeypatch.setattr(bot, "SUBSCRIBERS_FILE", str(tmp_path / "subscribers.txt"))
+        assert bot.checkers["chiba"].target_url == CHIBA["url"]
+        assert "chiba" in bot.caches and "chiba" in bot.scrape_locks
+        assert bot.last_notified["chiba"] is None
+        assert bot._scrape_key_for_check("chiba") == "chiba"
+
+        update, context = DummyUpdate(), DummyContext()
+        context.args = ["chiba", "skill"]
+        await bot.subscribe_command(update, context)
+        assert "技能確認 only (Chiba)" in update.message.last_text
+        bot.upsert_subscriber(2, "@bob|samezu|relevant")
+
+        messages = bot._notification_messages_for_subscribers(CHECK_CHIBA, source="chiba")
+
+    assert [chat_id for chat_id, _text in messages] == [DummyUpdate.effective_chat.id]
+    assert "技能確認" in messages[0][1] and "知識確認" not in messages[0][1]